@@ -9,7 +9,8 @@ which can be customized through environment variables.
 """
 
 from api.v1.views import app_views
-from flask import Blueprint, Flask, jsonify
+from api.v1.views.compression import compress
+from flask import Blueprint, Flask, jsonify, request
 from flask_cors import CORS
 from models import storage
 from os import getenv
@@ -25,6 +26,34 @@ api_host = getenv("HBNB_API_HOST", "0.0.0.0")
 api_port = getenv("HBNB_API_PORT", 5000)
 
 
+@app.before_request
+def begin_unit_of_work():
+    """Defers the storage saves of the request to a single one at its end."""
+    storage.begin()
+    request.environ["hbnb.unit_of_work"] = True
+
+
+@app.after_request
+def end_unit_of_work(response):
+    """Writes the saves of a successful request, discards a failed one's."""
+    if request.environ.pop("hbnb.unit_of_work", False):
+        storage.end(commit=response.status_code < 400)
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """Compresses a large response with an encoding the client accepts."""
+    return compress(response)
+
+
+@app.teardown_request
+def abort_unit_of_work(error):
+    """Discards the saves of a request that failed before it ended."""
+    if request.environ.pop("hbnb.unit_of_work", False):
+        storage.end(commit=False)
+
+
 @app.teardown_appcontext
 def teardown(self):
     """Closes the database storage connection."""
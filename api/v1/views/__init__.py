@@ -19,3 +19,10 @@ from api.v1.views.users import *
 from api.v1.views.places import *
 from api.v1.views.places_reviews import *
 from api.v1.views.places_amenities import *
+from api.v1.views.places_stats import *
+from api.v1.views.batch import *
+from api.v1.views.bulk import *
+from api.v1.views.ingest import *
+from api.v1.views.search import *
+from api.v1.views.autocomplete import *
+from api.v1.views.changes import *
@@ -15,28 +15,34 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.paging import get_deleted, get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
 
 
 @app_views.route("/amenities", strict_slashes=False, methods=["GET"])
+@cached("Amenity")
 def get_amenities():
     """Retrieve all amenities.
 
     Returns:
         A JSON response containing a list of all amenities.
+
+    Raises:
+        400: If limit is not a positive integer or after is unknown.
     """
-    amenities = storage.all("Amenity")
     amenities_list = []
-    for amenity in amenities.values():
+    for amenity in get_page("Amenity"):
         amenities_list.append(amenity.to_dict())
-    return jsonify(amenities_list)
+    return jsonify(get_deleted("Amenity") + amenities_list)
 
 
 @app_views.route("/amenities/<amenity_id>",
                  strict_slashes=False,
                  methods=["GET"])
+@cached("Amenity", id_arg="amenity_id")
 def get_amenity(amenity_id):
     """Retrieve a specific amenity by ID.
 
@@ -58,6 +64,7 @@ def get_amenity(amenity_id):
 @app_views.route("/amenities/<amenity_id>",
                  strict_slashes=False,
                  methods=["DELETE"])
+@matched("Amenity", "amenity_id")
 def delete_amenity(amenity_id):
     """Delete an amenity.
 
@@ -106,6 +113,7 @@ def post_amenity():
 @app_views.route("amenities/<amenity_id>",
                  strict_slashes=False,
                  methods=["PUT"])
+@matched("Amenity", "amenity_id")
 def put_amenity(amenity_id):
     """Update an existing amenity.
 
@@ -128,8 +136,8 @@ def put_amenity(amenity_id):
         abort(400, "Not a JSON")
 
     for key, value in amenity_data.items():
-        if key in ["id", "created_at", "updated_at"]:
+        if key in ["id", "created_at", "updated_at", "version"]:
             continue
         setattr(amenity, key, value)
-    storage.save()
+    amenity.save()
     return jsonify(amenity.to_dict())
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""API Routes for Autocompletion.
+
+This module defines the API route for completing the name of a state,
+a city or an amenity from the first letters typed by a user, so that
+pickers do not need to load every object.
+The matches are read from a prefix index on the names with file storage
+and from the index on the name column with db storage.
+
+Routes:
+- GET /autocomplete: Retrieve the objects whose name starts with a prefix.
+"""
+
+from api.v1.views import app_views
+from api.v1.views.caching import cached
+from api.v1.views.paging import get_limit
+from flask import abort, jsonify, request
+from models import storage
+
+# values of the type parameter and the class each one completes
+autocomplete_types = {"amenity": "Amenity", "city": "City", "state": "State"}
+
+
+@app_views.route("/autocomplete", strict_slashes=False, methods=["GET"])
+@cached("Amenity", "City", "State")
+def get_autocomplete():
+    """Retrieve the objects whose name starts with a prefix.
+
+    The class is given by the type query string parameter, one of
+    amenity, city or state, and the first letters by prefix, compared
+    without case. The number of matches can be set with limit
+    (10 by default).
+
+    Returns:
+        A JSON response containing the list of the matching objects,
+        sorted by name.
+
+    Raises:
+        400: If type is unknown, prefix is missing
+             or limit is not a positive integer.
+    """
+    cls = autocomplete_types.get(request.args.get("type"))
+    if cls is None:
+        abort(400, "Invalid type")
+
+    prefix = request.args.get("prefix", "")
+    if not prefix:
+        abort(400, "Missing prefix")
+
+    limit = get_limit() or 10
+    return jsonify([obj.to_dict() for obj in
+                    storage.complete(cls, prefix, limit)])
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""API Routes for Batches.
+
+This module defines the API route for running many API operations
+in a single request.
+Each operation is dispatched to the view function that would have handled
+it as a request of its own, and all of their storage saves are written
+once, when the batch ends.
+
+Routes:
+- POST /batch: Run a list of operations in one round trip.
+"""
+
+from api.v1.views import app_views
+from flask import abort, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+MAX_OPERATIONS = 1000
+
+
+def run_operation(operation):
+    """Run a single operation of a batch through its view function.
+
+    Args:
+        operation: A dictionary with the method, path and body
+                   of the operation.
+
+    Returns:
+        A dictionary with the status code and JSON body of the response.
+    """
+    method = str(operation.get("method", "GET")).upper()
+    path = str(operation.get("path", ""))
+    if not path.startswith(app_views.url_prefix + "/"):
+        path = app_views.url_prefix + "/" + path.lstrip("/")
+
+    with current_app.test_request_context(path, method=method,
+                                          json=operation.get("body")):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            if request.url_rule.endpoint == "app_views.post_batch":
+                abort(400, "Nested batch")
+            view = current_app.view_functions[request.url_rule.endpoint]
+            response = current_app.make_response(view(**request.view_args))
+        except HTTPException as error:
+            response = current_app.handle_http_exception(error)
+            if isinstance(response, HTTPException):
+                response = jsonify({"error": response.description})
+                response.status_code = error.code
+            else:
+                response = current_app.make_response(response)
+        return {"status": response.status_code,
+                "body": response.get_json(silent=True)}
+
+
+@app_views.route("/batch", strict_slashes=False, methods=["POST"])
+def post_batch():
+    """Run a list of operations in one round trip.
+
+    The request body holds the list of operations, each with a method,
+    a path relative to /api/v1 and an optional JSON body. When atomic is
+    true, the batch stops at the first failing operation and none of its
+    changes are kept.
+
+    Returns:
+        A JSON response containing the status and body
+        of each operation, in order.
+
+    Raises:
+        400: If the request data is not a valid JSON, the operations
+             are missing or there are too many of them.
+        409: If the batch is atomic and one of its operations failed.
+    """
+    batch_data = request.get_json(force=True, silent=True)
+    if type(batch_data) is list:
+        batch_data = {"operations": batch_data}
+    if type(batch_data) is not dict:
+        abort(400, "Not a JSON")
+
+    operations = batch_data.get("operations")
+    if type(operations) is not list:
+        abort(400, "Missing operations")
+    if len(operations) > MAX_OPERATIONS:
+        abort(400, "Too many operations")
+    atomic = bool(batch_data.get("atomic", False))
+
+    results = []
+    for operation in operations:
+        if type(operation) is not dict:
+            result = {"status": 400, "body": {"error": "Not a JSON"}}
+        else:
+            result = run_operation(operation)
+        results.append(result)
+        if atomic and result["status"] >= 400:
+            # a failed response ends the request's unit of work
+            # with a rollback, discarding the earlier operations
+            return jsonify({"results": results}), 409
+    return jsonify({"results": results})
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""API Routes for Bulk Mutations.
+
+This module defines the API routes for updating or deleting every object
+of a collection that matches a filter, in one request.
+A filter maps attribute names to the value they must equal or to a list of
+the values they may take. Places can also be filtered by state_id, and
+reviews by city_id or state_id.
+
+Routes:
+- PUT /bulk/<collection>: Update the objects that match a filter.
+- DELETE /bulk/<collection>: Delete the objects that match a filter.
+"""
+
+from api.v1.views import app_views
+from flask import abort, jsonify, request
+from models import storage
+
+collections = {"amenities": "Amenity", "cities": "City", "places": "Place",
+               "reviews": "Review", "states": "State", "users": "User"}
+
+# attributes a patch may not change, as in the single object PUT routes
+protected = {"Place": ["user_id", "city_id"],
+             "Review": ["user_id", "place_id"],
+             "User": ["email", "password"]}
+
+
+def get_filter(bulk_data):
+    """Extract the filter of a bulk request.
+
+    Args:
+        bulk_data: The JSON body of the request.
+
+    Returns:
+        The filter dictionary.
+
+    Raises:
+        400: If the body is not a JSON object or the filter is missing.
+    """
+    if type(bulk_data) is not dict:
+        abort(400, "Not a JSON")
+    filters = bulk_data.get("filter")
+    if type(filters) is not dict or not filters:
+        abort(400, "Missing filter")
+    return filters
+
+
+@app_views.route("/bulk/<collection>", strict_slashes=False, methods=["PUT"])
+def put_bulk(collection):
+    """Update every object of a collection that matches a filter.
+
+    Args:
+        collection: The name of the collection, such as places.
+
+    Returns:
+        A JSON response containing the number of updated objects.
+
+    Raises:
+        404: If the collection does not exist.
+        400: If the request data is not a valid JSON, the filter or the
+             patch is missing, or they name an unknown attribute.
+    """
+    if collection not in collections:
+        abort(404)
+    cls = collections[collection]
+
+    bulk_data = request.get_json(force=True, silent=True)
+    filters = get_filter(bulk_data)
+    patch = bulk_data.get("patch")
+    if type(patch) is not dict or not patch:
+        abort(400, "Missing patch")
+
+    values = {}
+    for key, value in patch.items():
+        if key in ["id", "created_at", "updated_at", "version"] + \
+                protected.get(cls, []):
+            continue
+        values[key] = value
+
+    try:
+        count = storage.update_where(cls, filters, values) if values else 0
+    except ValueError as error:
+        abort(400, str(error))
+    return jsonify({"updated": count})
+
+
+@app_views.route("/bulk/<collection>",
+                 strict_slashes=False, methods=["DELETE"])
+def delete_bulk(collection):
+    """Delete every object of a collection that matches a filter.
+
+    Args:
+        collection: The name of the collection, such as reviews.
+
+    Returns:
+        A JSON response containing the number of deleted objects.
+
+    Raises:
+        404: If the collection does not exist.
+        400: If the request data is not a valid JSON, the filter is
+             missing, or it names an unknown attribute.
+    """
+    if collection not in collections:
+        abort(404)
+
+    filters = get_filter(request.get_json(force=True, silent=True))
+    try:
+        count = storage.delete_where(collections[collection], filters)
+    except ValueError as error:
+        abort(400, str(error))
+    return jsonify({"deleted": count})
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""Response cache and conditional requests for the API routes.
+
+Read-only routes decorated with cached() keep their successful responses
+in an LRU cache, keyed on the request and on the stored data and versions
+of the classes they read, and answer a matching If-None-Match with 304.
+Routes changing a single object, decorated with matched(), answer a stale
+If-Match with 412.
+
+The cache is enabled by HBNB_RESPONSE_CACHE_SIZE and bounded by
+HBNB_RESPONSE_CACHE_MAX_BYTES and HBNB_RESPONSE_CACHE_TTL.
+"""
+
+from api.v1.views.compression import compress, tag_variants
+from flask import Response, abort, make_response, request
+from functools import wraps
+import hashlib
+from models import storage
+from models.engine.cache import LRUCache, MISSING
+from models.engine.db_storage import classes
+from os import getenv
+
+size = int(getenv("HBNB_RESPONSE_CACHE_SIZE", 0))
+max_bytes = int(getenv("HBNB_RESPONSE_CACHE_MAX_BYTES", 1 << 20))
+responses = None
+if size > 0:
+    responses = LRUCache(size, float(getenv("HBNB_RESPONSE_CACHE_TTL", 60)))
+
+
+def get_key(names):
+    """Build the cache key of the current request.
+
+    Args:
+        names: The names of the classes the route reads.
+
+    Returns:
+        A tuple of the method, path, query string, body hash, fingerprints
+        of the stored classes and versions of the classes of the request.
+        The fingerprints follow the writes of every process, the versions
+        count those of this process that a fingerprint may miss.
+    """
+    if "with_counts" in request.args or "expand" in request.args:
+        names = classes
+    names = sorted(names)
+    body = None
+    if request.method == "POST":
+        body = hashlib.sha256(request.get_data()).hexdigest()
+    versions = tuple(storage.changes.version(name) for name in names)
+    return (request.method, request.path, request.query_string, body,
+            storage.fingerprint(names), versions)
+
+
+def find_tag(etags, etag):
+    """Find the variant of an ETag listed by a conditional header.
+
+    Args:
+        etags: The ETags of the If-None-Match or If-Match header.
+        etag: The ETag of the uncompressed response.
+
+    Returns:
+        The first variant of etag listed, or None if there is none.
+    """
+    for variant in tag_variants(etag):
+        if etags.contains(variant):
+            return variant
+    return None
+
+
+def get_tag(obj):
+    """Build the ETag of a single object.
+
+    Args:
+        obj: The object.
+
+    Returns:
+        The ETag, derived from the class, ID and version of the object,
+        which each update increments.
+    """
+    return hashlib.sha256("{}.{}.{}".format(
+        obj.__class__.__name__, obj.id, obj.version).encode()).hexdigest()
+
+
+def get_etag(names, key, id_arg, kwargs):
+    """Build the ETag of the response to the current GET request.
+
+    Args:
+        names: The names of the classes the route reads.
+        key: The cache key of the request.
+        id_arg: The name of the route argument holding the ID of the
+                object of the first class the route returns, or None if
+                it returns several objects.
+        kwargs: The arguments of the route.
+
+    Returns:
+        The ETag, or None if the request is not a GET, the object does
+        not exist or the unit of work of the request holds changes not
+        committed yet.
+    """
+    if request.method != "GET" or storage.pending():
+        return None
+    if id_arg is None or "expand" in request.args:
+        # the versions are left out, as they differ between processes
+        return hashlib.sha256(repr(key[:-1]).encode()).hexdigest()
+    obj = storage.get(classes[names[0]], kwargs[id_arg])
+    if obj is None:
+        return None
+    return get_tag(obj)
+
+
+def cached(*names, id_arg=None):
+    """Cache the successful responses of a route reading some classes and
+    answer its conditional GET requests.
+
+    Args:
+        names: The names of the classes the route reads.
+        id_arg: The name of the route argument holding the ID of the
+                object of the first class the route returns, or None if
+                it returns several objects.
+
+    Returns:
+        A decorator applied to the view function of the route, below its
+        route decorator.
+    """
+    def decorator(view):
+        """Wrap a view function with the response cache."""
+        @wraps(view)
+        def cached_view(*args, **kwargs):
+            """Serve the response from the cache or store it there."""
+            key = get_key(names)
+            etag = get_etag(names, key, id_arg, kwargs)
+            if etag is not None:
+                variant = find_tag(request.if_none_match, etag)
+                if variant is not None:
+                    response = Response(status=304)
+                    response.set_etag(variant)
+                    response.vary.add("Accept-Encoding")
+                    return response
+            # the versions only move on commit, so a request that wrote
+            # anything, as a batch may, reads past the cache
+            use_cache = responses is not None and not storage.pending()
+            entry = MISSING
+            if use_cache:
+                entry = responses.get(key)
+            if entry is not MISSING:
+                body, mimetype, encoded = entry
+                response = Response(body, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+            else:
+                response = make_response(view(*args, **kwargs))
+                encoded = None
+                if use_cache:
+                    if response.status_code == 200 and \
+                            not response.is_streamed and \
+                            response.content_length is not None and \
+                            response.content_length <= max_bytes:
+                        encoded = {}
+                        responses.set(key, (response.get_data(),
+                                            response.mimetype, encoded))
+                    response.headers["X-Cache"] = "MISS"
+            if etag is not None and response.status_code == 200:
+                response.set_etag(etag)
+            return compress(response, encoded)
+        return cached_view
+    return decorator
+
+
+def matched(name, id_arg):
+    """Check the If-Match header of the requests of a route changing a
+    single object.
+
+    Args:
+        name: The name of the class of the object.
+        id_arg: The name of the route argument holding the ID of the
+                object.
+
+    Returns:
+        A decorator applied to the view function of the route, below its
+        route decorator.
+
+    Raises:
+        412: If If-Match does not list the current ETag of the object.
+    """
+    def decorator(view):
+        """Wrap a view function with the If-Match check."""
+        @wraps(view)
+        def matched_view(*args, **kwargs):
+            """Run the view if the object matches, and tag its update."""
+            obj = storage.get(classes[name], kwargs[id_arg])
+            if obj is not None and request.if_match and \
+                    not request.if_match.star_tag and \
+                    find_tag(request.if_match, get_tag(obj)) is None:
+                abort(412)
+            response = make_response(view(*args, **kwargs))
+            if obj is not None and request.method == "PUT" and \
+                    response.status_code == 200:
+                response.set_etag(get_tag(obj))
+            return response
+        return matched_view
+    return decorator
+
+
+def cache_info():
+    """Retrieve the counters of the response cache.
+
+    Returns:
+        The hits, misses, hit rate and size of the cache, or None if the
+        cache is disabled.
+    """
+    if responses is None:
+        return None
+    return responses.info()
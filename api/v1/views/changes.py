@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""API Route for the Change Feed.
+
+This module defines the API route streaming the changes saved by the
+storage engine as Server-Sent Events, read from the change log it keeps
+in memory, so clients learn about them without polling the lists.
+
+Routes:
+- GET /changes: Stream the changes saved to the storage.
+
+Each change is sent as a "change" event whose id is its offset in the
+log and whose data is the JSON {"offset", "class", "id", "operation",
+"version"} dictionary, where operation is "new", "update" or "delete"
+and version counts the changes of the class. The stream starts after
+the offset given by the Last-Event-ID header, which browsers send when
+they reconnect, or by the optional query string parameter offset, and
+by default with the next change saved. With class=<class name>, only
+the changes of that class are sent.
+
+The log only keeps the last changes of the running process. If some of
+the changes after the offset were dropped from it, or if the offset is
+past the last change, as after a restart, a "reset" event is sent
+first, so the client can reload what it keeps before applying the next
+ones. A comment is sent when no change was saved for keep_alive
+seconds, so proxies keep the connection open.
+"""
+
+from api.v1.views import app_views
+from flask import Response, abort, json, request, stream_with_context
+from models import storage
+from models.engine.db_storage import classes
+
+# seconds waited for a change before sending a comment
+keep_alive = 15
+
+
+def get_offset():
+    """Retrieve the offset the stream starts after.
+
+    Returns:
+        The offset of the Last-Event-ID header or of the query string,
+        or the offset of the last change saved if there is none.
+
+    Raises:
+        400: If the offset is not a non-negative integer.
+    """
+    offset = request.headers.get("Last-Event-ID",
+                                 request.args.get("offset"))
+    if offset is None:
+        return storage.changes.offset()
+    try:
+        offset = int(offset)
+    except ValueError:
+        abort(400, "Invalid offset")
+    if offset < 0:
+        abort(400, "Invalid offset")
+    return offset
+
+
+def stream(changes, offset, name=None):
+    """Generate the events of the changes saved after an offset.
+
+    Args:
+        changes: The change log of the storage engine.
+        offset: The offset the stream starts after.
+        name: The name of the class of the changes sent, or None for all.
+
+    Yields:
+        The text of each event.
+    """
+    if offset > changes.offset():
+        offset = changes.offset()
+        yield "event: reset\ndata: {}\n\n".format(
+            json.dumps({"offset": offset}))
+    while True:
+        new_changes, complete = changes.since(offset, keep_alive)
+        if not complete:
+            yield "event: reset\ndata: {}\n\n".format(
+                json.dumps({"offset": offset}))
+        if not new_changes:
+            yield ": keep-alive\n\n"
+            continue
+        for change in new_changes:
+            if name is None or change["class"] == name:
+                yield "id: {}\nevent: change\ndata: {}\n\n".format(
+                    change["offset"], json.dumps(change))
+        offset = new_changes[-1]["offset"]
+
+
+@app_views.route("/changes", strict_slashes=False, methods=["GET"])
+def get_changes():
+    """Stream the changes saved to the storage as Server-Sent Events.
+
+    Returns:
+        A text/event-stream response sending each change as it is saved.
+
+    Raises:
+        400: If the offset is invalid or the class is unknown.
+    """
+    name = request.args.get("class")
+    if name is not None and name not in classes:
+        abort(400, "Unknown class {}".format(name))
+    offset = get_offset()
+    return Response(stream_with_context(stream(storage.changes, offset,
+                                               name)),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache",
+                             "X-Accel-Buffering": "no"})
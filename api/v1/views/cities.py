@@ -15,6 +15,9 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.expansion import expand
+from api.v1.views.paging import add_counts, get_deleted, get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
@@ -22,6 +25,7 @@ from models.engine.db_storage import classes
 
 @app_views.route("states/<state_id>/cities",
                  strict_slashes=False, methods=["GET"])
+@cached("City", "State")
 def get_cities(state_id):
     """Retrieve all cities for a specific state.
 
@@ -33,6 +37,7 @@ def get_cities(state_id):
         of all cities for the specified state.
 
     Raises:
+        400: If limit is not a positive integer or after is unknown.
         404: If the state with the specified ID does not exist.
     """
     state = storage.get(classes["State"], state_id)
@@ -40,12 +45,14 @@ def get_cities(state_id):
         abort(404)
 
     cities_list = []
-    for city in state.cities:
+    for city in get_page("City", {"state_id": state_id}):
         cities_list.append(city.to_dict())
-    return jsonify(cities_list)
+    return jsonify(get_deleted("City") +
+                   expand("City", add_counts("City", cities_list)))
 
 
 @app_views.route("/cities/<city_id>", strict_slashes=False, methods=["GET"])
+@cached("City", id_arg="city_id")
 def get_city(city_id):
     """Retrieve a specific city by ID.
 
@@ -56,16 +63,18 @@ def get_city(city_id):
         A JSON response containing the details of the specified city.
 
     Raises:
+        400: If expand is invalid or too large.
         404: If the city with the specified ID does not exist.
     """
     city = storage.get(classes["City"], city_id)
     if city is None:
         abort(404)
-    return jsonify(city.to_dict())
+    return jsonify(expand("City", [city.to_dict()])[0])
 
 
 @app_views.route("/cities/<city_id>",
                  strict_slashes=False, methods=["DELETE"])
+@matched("City", "city_id")
 def del_city(city_id):
     """Delete a city.
 
@@ -121,6 +130,7 @@ def post_city(state_id):
 
 
 @app_views.route("/cities/<city_id>", strict_slashes=False, methods=["PUT"])
+@matched("City", "city_id")
 def put_city(city_id):
     """Update an existing city.
 
@@ -143,9 +153,9 @@ def put_city(city_id):
         abort(400, "Not a JSON")
 
     for key, value in city_data.items():
-        if key in ["id", "created_at", "updated_at"]:
+        if key in ["id", "created_at", "updated_at", "version"]:
             continue
         setattr(city, key, value)
 
-    storage.save()
+    city.save()
     return jsonify(city.to_dict())
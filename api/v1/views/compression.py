@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""Compression helper for the API routes.
+
+The JSON and text responses of the API whose body holds at least
+min_bytes bytes are compressed with the encoding the client prefers
+among those it accepts in its Accept-Encoding header: brotli (br) if
+the brotli module is installed, and gzip. Such responses vary on
+Accept-Encoding, and the strong ETag of a compressed response gets the
+suffix -<encoding>, as its bytes differ from the uncompressed ones.
+
+The compression is configured with the environment variables:
+- HBNB_COMPRESS_MIN_BYTES: The size of the smallest body compressed,
+  1024 by default.
+- HBNB_COMPRESS_LEVEL: The gzip compression level, from 1 to 9, 6 by
+  default.
+- HBNB_BROTLI_QUALITY: The brotli quality, from 0 to 11, 5 by default.
+
+The response cache stores the compressed bodies of the responses it
+keeps, so a response served from the cache is compressed only once per
+encoding.
+"""
+
+from flask import request
+import gzip
+from os import getenv
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+min_bytes = int(getenv("HBNB_COMPRESS_MIN_BYTES", 1024))
+level = int(getenv("HBNB_COMPRESS_LEVEL", 6))
+quality = int(getenv("HBNB_BROTLI_QUALITY", 5))
+
+# compression functions by encoding, preferred encoding first
+encoders = {}
+if brotli is not None:
+    encoders["br"] = lambda body: brotli.compress(body, quality=quality)
+encoders["gzip"] = lambda body: gzip.compress(body, level, mtime=0)
+
+
+def is_compressible(response):
+    """Tell whether a response may be compressed.
+
+    Args:
+        response: The response.
+
+    Returns:
+        True if the response is a successful JSON or text response that
+        is neither streamed nor encoded already.
+    """
+    return 200 <= response.status_code < 300 and \
+        response.status_code != 204 and \
+        not response.is_streamed and \
+        not response.direct_passthrough and \
+        "Content-Encoding" not in response.headers and \
+        (response.mimetype == "application/json" or
+         response.mimetype.startswith("text/"))
+
+
+def get_encoding():
+    """Retrieve the encoding to compress the response to the current
+    request with.
+
+    Returns:
+        The encoding the client prefers among the supported ones, or None
+        if it accepts none of them.
+    """
+    return request.accept_encodings.best_match(list(encoders))
+
+
+def compress(response, encoded=None):
+    """Compress a response to the current request if it is large enough
+    and the client accepts a supported encoding.
+
+    Args:
+        response: The response, compressed in place.
+        encoded: The dictionary of the compressed bodies of the response
+                 by encoding, filled with the body compressed here, or
+                 None.
+
+    Returns:
+        The response.
+    """
+    if not is_compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    if response.content_length is None or \
+            response.content_length < min_bytes:
+        return response
+    encoding = get_encoding()
+    if encoding is None:
+        return response
+    body = None
+    if encoded is not None:
+        body = encoded.get(encoding)
+    if body is None:
+        body = encoders[encoding](response.get_data())
+        if encoded is not None:
+            encoded[encoding] = body
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None:
+        response.set_etag("{}-{}".format(etag, encoding), weak)
+    return response
+
+
+def tag_variants(etag):
+    """List the ETags of the representations of a response.
+
+    Args:
+        etag: The ETag of the uncompressed response.
+
+    Returns:
+        The ETag followed by its compressed variants.
+    """
+    return [etag] + ["{}-{}".format(etag, encoding) for encoding in encoders]
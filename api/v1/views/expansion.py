@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+"""Expansion helper for the API routes.
+
+The GET routes of states, cities, places and users accept an optional
+expand query string parameter listing, separated by commas, the paths of
+the related objects to nest in the returned objects, such as
+expand=cities.places.amenities. Each level of a path is loaded with one
+batched storage query for all the objects of the level above it.
+
+The relations that can be expanded are:
+- State: cities
+- City: places
+- Place: reviews, amenities
+- User: places, reviews
+
+A path can hold at most max_depth relations and a response at most
+max_objects expanded objects.
+"""
+
+from flask import abort, request
+from models import storage
+from models.engine.query import counted
+
+# relations expanded through the ids listed by an attribute of the objects:
+# {class: {relation: (linked class, attribute)}}
+linked = {"Place": {"amenities": ("Amenity", "amenity_ids")}}
+# maximum number of relations in a path
+max_depth = 3
+# maximum number of objects expanded in a response
+max_objects = 1000
+
+
+def get_relations(cls):
+    """Parse the expand parameter of the query string.
+
+    Args:
+        cls: The name of the class of the objects to expand.
+
+    Returns:
+        The tree of the relations to expand, as a dictionary mapping
+        each relation to the tree of its own relations.
+
+    Raises:
+        400: If a relation is unknown or a path is too deep.
+    """
+    tree = {}
+    for path in request.args.get("expand", "").split(","):
+        if not path.strip():
+            continue
+        names = path.strip().split(".")
+        if len(names) > max_depth:
+            abort(400, "Expansion deeper than {}".format(max_depth))
+        node, current = tree, cls
+        for name in names:
+            if name in counted.get(current, {}):
+                current = counted[current][name][0]
+            elif name in linked.get(current, {}):
+                current = linked[current][name][0]
+            else:
+                abort(400, "Unknown relation {}".format(name))
+            node = node.setdefault(name, {})
+    return tree
+
+
+def expand(cls, dicts):
+    """Nest the related objects requested by the query string in the
+    dictionaries of some objects.
+
+    Args:
+        cls: The name of the class of the objects.
+        dicts: The list of the dictionaries of the objects.
+
+    Returns:
+        The list of the dictionaries.
+
+    Raises:
+        400: If a relation is unknown, a path is too deep or more than
+             max_objects objects would be expanded.
+    """
+    tree = get_relations(cls)
+    if tree:
+        expand_level(cls, dicts, tree, [max_objects])
+    return dicts
+
+
+def expand_level(cls, dicts, tree, budget):
+    """Nest the relations of a tree in the dictionaries of some objects,
+    loading each relation for all of them at once.
+
+    Args:
+        cls: The name of the class of the objects.
+        dicts: The list of the dictionaries of the objects.
+        tree: The tree of the relations to expand.
+        budget: A list holding the number of objects that can still be
+                expanded, shared by all the levels.
+
+    Raises:
+        400: If more than max_objects objects would be expanded.
+    """
+    ids = [obj_dict["id"] for obj_dict in dicts]
+    for name, subtree in tree.items():
+        if name in counted.get(cls, {}):
+            child, key = counted[cls][name]
+            objs = storage.query(child, {key: ids}, limit=budget[0] + 1)
+            groups = {id: [] for id in ids}
+            for obj in objs:
+                groups[getattr(obj, key)].append(obj.to_dict())
+            children = [child_dict for group in groups.values()
+                        for child_dict in group]
+        else:
+            child, attr = linked[cls][name]
+            held = storage.linked(cls, attr, ids)
+            wanted = {id for values in held.values() for id in values}
+            objs = storage.query(child, {"id": list(wanted)},
+                                 limit=budget[0] + 1)
+            found = {obj.id: obj.to_dict() for obj in objs}
+            groups = {id: [found[value] for value in held[id]
+                           if value in found] for id in ids}
+            children = list(found.values())
+        if len(objs) > budget[0]:
+            abort(400, "Expansion larger than {} objects".format(
+                max_objects))
+        budget[0] -= len(objs)
+        for obj_dict in dicts:
+            obj_dict[name] = groups[obj_dict["id"]]
+        if subtree:
+            expand_level(child, children, subtree, budget)
@@ -9,11 +9,14 @@ Each route is responsible for a specific endpoint or functionality of the app.
 Routes:
 - GET /status: Returns the status of the API.
 - GET /stats: Retrieves the number of each object by type.
+- GET /stats/cache: Retrieves the hit and miss counters of the storage cache
+  and of the response cache.
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cache_info
 from flask import Response, jsonify
-from models import storage
+from models import storage, storage_t
 from models.engine.db_storage import classes
 
 
@@ -35,3 +38,13 @@ def num_objs():
         "users": storage.count(classes["User"]),
     }
     return jsonify(objects)
+
+
+@app_views.route("/stats/cache")
+def cache_stats():
+    """Retrieves the hit and miss counters of the storage object cache and
+    of the response cache."""
+    if storage_t != "db":
+        return jsonify({"storage": None, "responses": cache_info()})
+    return jsonify({"storage": storage.cache_info(),
+                    "responses": cache_info()})
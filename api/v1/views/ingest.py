@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""API Routes for Imports.
+
+This module defines the API route for importing objects
+from a NDJSON request body.
+The body is read and validated one line at a time while the objects are
+written in batches, each saved on its own, so it can be sent with chunked
+transfer encoding and is never held in memory as a whole.
+
+Routes:
+- POST /import: Import the objects of a NDJSON body.
+"""
+
+from api.v1.views import app_views
+from flask import abort, jsonify, request
+from models import storage
+from models.engine import ndjson
+
+MAX_ERRORS = 100
+
+
+@app_views.route("/import", strict_slashes=False, methods=["POST"])
+def post_import():
+    """Import the objects of a NDJSON body.
+
+    Each line holds one object dictionary with its __class__,
+    as written by the export command. Passwords are expected to be
+    hashed already. The batch size can be set with ?batch_size=.
+    The batches already saved are kept if a later one fails, and the
+    lines the storage rejects, such as duplicate ids, are skipped.
+
+    Returns:
+        A JSON response containing the number of imported objects,
+        the number of skipped lines and why the first of them
+        were skipped.
+
+    Raises:
+        400: If batch_size is not a positive integer.
+    """
+    batch_size = request.args.get("batch_size", 1000, type=int)
+    if batch_size is None or batch_size < 1:
+        abort(400, "Invalid batch_size")
+
+    # each batch is saved on its own instead of at the end of the request
+    if request.environ.pop("hbnb.unit_of_work", False):
+        storage.end()
+    count, skipped, errors = ndjson.load(request.stream, batch_size,
+                                         storage, MAX_ERRORS)
+    return jsonify({"imported": count, "skipped": skipped,
+                    "errors": [{"line": number, "error": reason}
+                               for number, reason in errors]})
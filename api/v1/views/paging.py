@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""Paging helper for the API routes.
+
+The routes that return a list read it through storage.query, so only the
+objects of the requested page are loaded, by default in the order of
+their IDs.
+A page is selected with the optional query string parameters:
+- limit: The maximum number of objects to return.
+- after: The ID of the last object of the previous page.
+
+With with_counts=1, each object of a page also gets the counters of its
+children kept by the storage engine, such as the number of reviews of a
+place, under "counts".
+
+With updated_since=<ISO 8601 timestamp>, a list only holds the objects
+updated after that time, in the order of their updated_at, so a client
+can sync a collection by downloading what changed. The first page of
+such a list starts with the objects of the class deleted since then,
+as {"__class__", "id", "updated_at", "deleted": true} dictionaries read
+from the tombstones the storage engines record on each deletion. They
+are all the deleted objects of the class, whether or not they belonged
+to the listed collection. As the tombstones are pruned after
+HBNB_TOMBSTONE_DAYS days, 30 by default, an older updated_since is
+answered with 410, and the client must download the collection again.
+"""
+
+from datetime import datetime, timezone
+from flask import abort, request
+from models import storage
+from models.base_model import time
+from models.tombstone import max_age
+
+
+def get_limit():
+    """Retrieve the limit of the query string.
+
+    Returns:
+        The limit as an integer, or None if there is none.
+
+    Raises:
+        400: If limit is not a positive integer.
+    """
+    limit = request.args.get("limit", type=int)
+    if "limit" in request.args and (limit is None or limit < 1):
+        abort(400, "Invalid limit")
+    return limit
+
+
+def get_since():
+    """Retrieve the updated_since timestamp of the query string.
+
+    Returns:
+        The timestamp as a naive UTC datetime, or None if there is none.
+
+    Raises:
+        400: If updated_since is not an ISO 8601 timestamp.
+    """
+    since = request.args.get("updated_since")
+    if since is None:
+        return None
+    try:
+        since = datetime.fromisoformat(since)
+    except ValueError:
+        abort(400, "Invalid updated_since")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def get_deleted(cls):
+    """Retrieve the objects of a class deleted since updated_since.
+
+    Args:
+        cls: The name of the class of the objects.
+
+    Returns:
+        The list of the dictionaries of the deleted objects, oldest
+        deletion first, empty without updated_since or after the first
+        page.
+
+    Raises:
+        400: If updated_since is not an ISO 8601 timestamp.
+        410: If updated_since is older than the tombstones kept, so that
+             the client must download the whole collection again.
+    """
+    since = get_since()
+    if since is None or "after" in request.args:
+        return []
+    if since < datetime.utcnow() - max_age:
+        abort(410, "updated_since is older than the deletions kept")
+    deleted_list = []
+    for tombstone in storage.deleted(cls, since):
+        deleted_list.append({"__class__": cls, "id": tombstone.id,
+                             "updated_at": tombstone.updated_at.strftime(
+                                 time),
+                             "deleted": True})
+    return deleted_list
+
+
+def get_page(cls, filters=None, order_by=None):
+    """Retrieve the page of objects requested by the query string.
+
+    Args:
+        cls: The name of the class of the objects.
+        filters: The filter dictionary the objects must satisfy.
+        order_by: The attribute the objects are sorted by before their IDs,
+                  prefixed with - to sort in descending order.
+
+    Returns:
+        The list of the objects of the page.
+
+    Raises:
+        400: If limit is not a positive integer, after is unknown
+             or updated_since is not a timestamp.
+    """
+    limit = get_limit()
+    since = get_since()
+    if since is not None:
+        filters = dict(filters or {}, updated_at={"gt": since})
+        order_by = "updated_at"
+    try:
+        return storage.query(cls, filters, order_by, limit,
+                             request.args.get("after"))
+    except ValueError as error:
+        abort(400, str(error))
+
+
+def add_counts(cls, dicts):
+    """Add the counters of their children to the dictionaries of a page
+    of objects if the query string asks for them with with_counts=1.
+
+    Args:
+        cls: The name of the class of the objects.
+        dicts: The list of the dictionaries of the objects.
+
+    Returns:
+        The list of the dictionaries.
+    """
+    if request.args.get("with_counts") not in ("1", "true"):
+        return dicts
+    counts = storage.counts(cls, [obj_dict["id"] for obj_dict in dicts])
+    for obj_dict in dicts:
+        obj_dict["counts"] = counts[obj_dict["id"]]
+    return dicts
@@ -8,22 +8,81 @@ updating an existing place, and deleting a place.
 
 Routes:
 - GET /cities/<city_id>/places: Retrieve all places in a city.
+- GET /states/<state_id>/places: Retrieve all places in a state.
+- GET /users/<user_id>/places: Retrieve all places of a user.
 - GET /places/<place_id>: Retrieve a specific place by ID.
 - DELETE /places/<place_id>: Delete a place.
 - POST /cities/<city_id>/places: Create a new place in a city.
 - POST /places_search: Search for places based on
                        states, cities, and amenities.
+- GET /places_nearby: Retrieve the places near a point, nearest first.
+- GET /places/<place_id>/similar: Retrieve the places most like a place.
 - PUT /places/<place_id>: Update an existing place.
+
+The place listings, GET /cities/<city_id>/places, /states/<state_id>/places,
+/users/<user_id>/places and POST /places_search, can be narrowed down
+with min_price and max_price (price_by_night), min_rooms (number_rooms)
+and max_guest (the number of guests the place must be able to host), and
+sorted with sort=price or sort=-price.
+They are read from the query string and from the JSON body respectively.
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.expansion import expand
+from api.v1.views.paging import add_counts, get_deleted, get_limit
+from api.v1.views.paging import get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
+from models.engine.geo import haversine
+import math
+
+# range parameters of the place listings: {name: (attribute, operator)}
+place_ranges = {"min_price": ("price_by_night", "gte"),
+                "max_price": ("price_by_night", "lte"),
+                "min_rooms": ("number_rooms", "gte"),
+                "max_guest": ("max_guest", "gte")}
+# values of the sort parameter of the place listings
+place_sorts = {"price": "price_by_night", "-price": "-price_by_night"}
+# share of locality in the score of a similar place, the rest being the
+# Jaccard similarity of the amenities
+locality_weight = 0.25
+# number of places of closest amenities ranked for each similar place asked
+similar_pool = 5
+
+
+def get_place_options(params, filters):
+    """Read the range and sort parameters of a place listing.
+
+    Args:
+        params: The query string or JSON body holding the parameters.
+        filters: The filter dictionary the ranges are added to.
+
+    Returns:
+        The order_by argument of storage.query, or None.
+
+    Raises:
+        400: If a range is not an integer or sort is unknown.
+    """
+    for name, (attr, op) in place_ranges.items():
+        if name not in params:
+            continue
+        try:
+            value = int(params[name])
+        except (TypeError, ValueError):
+            abort(400, "Invalid {}".format(name))
+        filters.setdefault(attr, {})[op] = value
+
+    sort = params.get("sort")
+    if sort is not None and sort not in place_sorts:
+        abort(400, "Invalid sort")
+    return place_sorts.get(sort)
 
 
 @app_views.route("/cities/<city_id>/places",
                  strict_slashes=False, methods=["GET"])
+@cached("City", "Place")
 def get_places(city_id):
     """Retrieve all places in a city.
 
@@ -34,19 +93,91 @@ def get_places(city_id):
         A JSON response containing a list of all places in the city.
 
     Raises:
+        400: If a range or sort is invalid, limit is not
+             a positive integer or after is unknown.
         404: If the city with the specified ID does not exist.
     """
     city = storage.get(classes["City"], city_id)
     if city is None:
         abort(404)
 
+    filters = {"city_id": city_id}
+    order_by = get_place_options(request.args, filters)
+
     places_list = []
-    for place in city.places:
+    for place in get_page("Place", filters, order_by):
         places_list.append(place.to_dict())
-    return jsonify(places_list)
+    return jsonify(get_deleted("Place") +
+                   expand("Place", add_counts("Place", places_list)))
+
+
+@app_views.route("/states/<state_id>/places",
+                 strict_slashes=False, methods=["GET"])
+@cached("City", "Place", "State")
+def get_state_places(state_id):
+    """Retrieve all places in a state.
+
+    The places are selected through the cities of the state by storage,
+    in a single query.
+
+    Args:
+        state_id: The ID of the state.
+
+    Returns:
+        A JSON response containing a list of all places in the state.
+
+    Raises:
+        400: If a range or sort is invalid, limit is not
+             a positive integer or after is unknown.
+        404: If the state with the specified ID does not exist.
+    """
+    state = storage.get(classes["State"], state_id)
+    if state is None:
+        abort(404)
+
+    filters = {"state_id": state_id}
+    order_by = get_place_options(request.args, filters)
+
+    places_list = []
+    for place in get_page("Place", filters, order_by):
+        places_list.append(place.to_dict())
+    return jsonify(get_deleted("Place") +
+                   expand("Place", add_counts("Place", places_list)))
+
+
+@app_views.route("/users/<user_id>/places",
+                 strict_slashes=False, methods=["GET"])
+@cached("Place", "User")
+def get_user_places(user_id):
+    """Retrieve all places of a user.
+
+    Args:
+        user_id: The ID of the user.
+
+    Returns:
+        A JSON response containing a list of all places of the user.
+
+    Raises:
+        400: If a range or sort is invalid, limit is not
+             a positive integer or after is unknown.
+        404: If the user with the specified ID does not exist.
+    """
+    user = storage.get(classes["User"], user_id)
+    if user is None:
+        abort(404)
+
+    filters = {"user_id": user_id}
+    order_by = get_place_options(request.args, filters)
+
+    places_list = []
+    for place in get_page("Place", filters, order_by):
+        places_list.append(place.to_dict())
+    return jsonify(get_deleted("Place") +
+                   expand("Place", add_counts("Place", places_list)))
 
 
 @app_views.route("/places/<place_id>", strict_slashes=False, methods=["GET"])
+@cached("Place", id_arg="place_id")
 def get_place(place_id):
     """Retrieve a specific place by ID.
 
@@ -57,16 +188,18 @@ def get_place(place_id):
         A JSON response containing the details of the place.
 
     Raises:
+        400: If expand is invalid or too large.
         404: If the place with the specified ID does not exist.
     """
     place = storage.get(classes["Place"], place_id)
     if place is None:
         abort(404)
-    return jsonify(place.to_dict())
+    return jsonify(expand("Place", [place.to_dict()])[0])
 
 
 @app_views.route("/places/<place_id>",
                  strict_slashes=False, methods=["DELETE"])
+@matched("Place", "place_id")
 def delete_place(place_id):
     """Delete a place.
 
@@ -128,6 +261,7 @@ def post_place(city_id):
 
 
 @app_views.route("/places_search", strict_slashes=False, methods=["POST"])
+@cached("Amenity", "City", "Place", "State")
 def post_place_search():
     """Search for places based on states, cities, and amenities.
 
@@ -136,46 +270,168 @@ def post_place_search():
         places that match the search criteria.
 
     Raises:
-        400: If the request data is not in JSON format.
+        400: If the request data is not in JSON format, a range or
+             sort is invalid, limit is not a positive integer
+             or after is unknown.
     """
-    if request.get_json() is None:
+    search_data = request.get_json(silent=True)
+    if type(search_data) is not dict:
         return jsonify({"error": "Not a JSON"}), 400
 
-    states = request.get_json().get("states", [])
-    cities = request.get_json().get("cities", [])
-    amenities = request.get_json().get("amenities", [])
+    states = search_data.get("states", [])
+    cities = search_data.get("cities", [])
+    amenities = search_data.get("amenities", [])
 
-    amenities_list = []
-    for amenity_id in amenities:
-        amenity = storage.get("Amenity", amenity_id)
-        if amenity:
-            amenities_list.append(amenity)
+    filters = {}
+    if states or cities:
+        city_ids = set(cities)
+        for city in storage.query("City", {"state_id": list(states)}):
+            city_ids.add(city.id)
+        filters["city_id"] = list(city_ids)
 
-    if states == cities == []:
-        places = storage.all("Place").values()
-    else:
-        places = []
-        for state_id in states:
-            state = storage.get("State", state_id)
-            for city in state.cities:
-                if city.id not in cities:
-                    cities.append(city.id)
-        for city_id in cities:
-            city = storage.get("City", city_id)
-            for place in city.places:
-                places.append(place)
+    amenity_ids = []
+    for amenity in storage.query("Amenity", {"id": list(amenities)}):
+        amenity_ids.append(amenity.id)
+    if amenity_ids:
+        filters["amenity_ids"] = amenity_ids
+
+    order_by = get_place_options(search_data, filters)
 
     places_list = []
-    for place in places:
+    for place in get_page("Place", filters, order_by):
         places_list.append(place.to_dict())
-        for amenity in amenities_list:
-            if amenity not in place.amenities:
-                places_list.pop()
-                break
+    return jsonify(get_deleted("Place") +
+                   expand("Place", add_counts("Place", places_list)))
+
+
+def get_number(name, default=None):
+    """Read a number of the query string.
+
+    Args:
+        name: The name of the parameter.
+        default: The value of the parameter when it is missing.
+
+    Returns:
+        The parameter as a float, or default if it is missing.
+
+    Raises:
+        400: If the parameter is not a finite number.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = float(value)
+    except ValueError:
+        abort(400, "Invalid {}".format(name))
+    if not math.isfinite(value):
+        abort(400, "Invalid {}".format(name))
+    return value
+
+
+@app_views.route("/places_nearby", strict_slashes=False, methods=["GET"])
+@cached("Place")
+def get_places_nearby():
+    """Retrieve the places near a point, nearest first.
+
+    The point is given by the lat and lng query string parameters,
+    in degrees, and the search radius by radius_km (10 by default).
+    The number of places can be capped with limit.
+
+    Returns:
+        A JSON response containing the list of the places within
+        the radius, each with its distance_km from the point.
+
+    Raises:
+        400: If lat or lng is missing, not a number or out of range,
+             or if radius_km or limit is not a positive number.
+    """
+    lat = get_number("lat")
+    if lat is None or not -90 <= lat <= 90:
+        abort(400, "Invalid lat")
+    lng = get_number("lng")
+    if lng is None or not -180 <= lng <= 180:
+        abort(400, "Invalid lng")
+
+    radius_km = get_number("radius_km", 10.0)
+    if not radius_km > 0:
+        abort(400, "Invalid radius_km")
+
+    places_list = []
+    for place, distance in storage.nearby(lat, lng, radius_km, get_limit()):
+        place_dict = place.to_dict()
+        place_dict["distance_km"] = round(distance, 3)
+        places_list.append(place_dict)
+    return jsonify(places_list)
+
+
+def get_locality(place, other):
+    """Compute how close two places are, from 0 to 1.
+
+    Args:
+        place: The place of reference.
+        other: The place compared to it.
+
+    Returns:
+        1 for places of the same city, otherwise a value decreasing
+        with their distance (1 / (1 + km / 10)), or 0 if one of them
+        has no coordinates.
+    """
+    if place.city_id == other.city_id:
+        return 1.0
+    if None in (place.latitude, place.longitude,
+                other.latitude, other.longitude):
+        return 0.0
+    distance = haversine(place.latitude, place.longitude,
+                         other.latitude, other.longitude)
+    return 1 / (1 + distance / 10)
+
+
+@app_views.route("/places/<place_id>/similar",
+                 strict_slashes=False, methods=["GET"])
+@cached("Amenity", "City", "Place")
+def get_similar_places(place_id):
+    """Retrieve the places most like a place.
+
+    The places sharing the most amenities with the place, by Jaccard
+    similarity, are ranked by a score mixing that similarity with
+    their locality. The number of places, 10 by default, can be
+    changed with limit.
+
+    Args:
+        place_id: The ID of the place.
+
+    Returns:
+        A JSON response containing the list of the similar places,
+        best first, each with its similarity and score.
+
+    Raises:
+        404: If the place with the specified ID does not exist.
+        400: If limit is not a positive integer.
+    """
+    place = storage.get(classes["Place"], place_id)
+    if place is None:
+        abort(404)
+
+    limit = get_limit() or 10
+    ranked = []
+    for other, similarity in storage.similar(place, limit * similar_pool):
+        score = (1 - locality_weight) * similarity + \
+            locality_weight * get_locality(place, other)
+        ranked.append((-score, other.id, other, similarity))
+    ranked.sort()
+
+    places_list = []
+    for score, id, other, similarity in ranked[:limit]:
+        place_dict = other.to_dict()
+        place_dict["similarity"] = round(similarity, 3)
+        place_dict["score"] = round(-score, 3)
+        places_list.append(place_dict)
     return jsonify(places_list)
 
 
 @app_views.route("/places/<place_id>", strict_slashes=False, methods=["PUT"])
+@matched("Place", "place_id")
 def put_place(place_id):
     """Update an existing place.
 
@@ -197,9 +453,10 @@ def put_place(place_id):
         abort(400, "Not a JSON")
 
     for key, value in place_data.items():
-        if key in ["id", "user_id", "city_id", "created_at", "updated_at"]:
+        if key in ["id", "user_id", "city_id", "created_at", "updated_at",
+                   "version"]:
             continue
         setattr(place, key, value)
 
-    storage.save()
+    place.save()
     return jsonify(place.to_dict())
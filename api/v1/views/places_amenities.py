@@ -13,13 +13,15 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached
 from flask import abort, jsonify, request
-from models import storage
+from models import storage, storage_t
 from models.engine.db_storage import classes
 
 
 @app_views.route("/places/<place_id>/amenities",
                  strict_slashes=False, methods=["GET"])
+@cached("Amenity", "Place")
 def get_amenities_place(place_id):
     """Get all amenities for a place.
 
@@ -68,8 +70,11 @@ def delete_amenity_place(place_id, amenity_id):
     if amenity not in place.amenities:
         abort(404)
 
-    storage.delete(amenity)
-    storage.save()
+    if storage_t == "db":
+        place.amenities.remove(amenity)
+    else:
+        place.amenity_ids.remove(amenity.id)
+    place.save()
     return jsonify({})
 
 
@@ -99,4 +104,10 @@ def post_amenity_place(place_id, amenity_id):
 
     if amenity in place.amenities:
         return jsonify(amenity.to_dict())
+
+    if storage_t == "db":
+        place.amenities.append(amenity)
+    else:
+        place.amenity_ids.append(amenity.id)
+    place.save()
     return jsonify(amenity.to_dict()), 201
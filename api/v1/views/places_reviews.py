@@ -8,6 +8,7 @@ and updating an existing review.
 
 Routes:
 - GET /places/<place_id>/reviews: Retrieve all reviews for a place.
+- GET /users/<user_id>/reviews: Retrieve all reviews written by a user.
 - GET /reviews/<review_id>: Retrieve a specific review by ID.
 - DELETE /reviews/<review_id>: Delete a review.
 - POST /places/<place_id>/reviews: Create a new review for a place.
@@ -15,6 +16,8 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.paging import get_deleted, get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
@@ -22,6 +25,7 @@ from models.engine.db_storage import classes
 
 @app_views.route("places/<place_id>/reviews",
                  strict_slashes=False, methods=["GET"])
+@cached("Place", "Review")
 def get_reviews(place_id):
     """Retrieve all reviews for a place.
 
@@ -32,6 +36,7 @@ def get_reviews(place_id):
         A JSON response containing a list of all reviews for the place.
 
     Raises:
+        400: If limit is not a positive integer or after is unknown.
         404: If the place with the specified ID does not exist.
     """
     place = storage.get(classes["Place"], place_id)
@@ -39,13 +44,40 @@ def get_reviews(place_id):
         abort(404)
 
     reviews_list = []
-    for review in place.reviews:
+    for review in get_page("Review", {"place_id": place_id}):
         reviews_list.append(review.to_dict())
-    return jsonify(reviews_list)
+    return jsonify(get_deleted("Review") + reviews_list)
+
+
+@app_views.route("/users/<user_id>/reviews",
+                 strict_slashes=False, methods=["GET"])
+@cached("Review", "User")
+def get_user_reviews(user_id):
+    """Retrieve all reviews written by a user.
+
+    Args:
+        user_id (str): The ID of the user.
+
+    Returns:
+        A JSON response containing a list of all reviews of the user.
+
+    Raises:
+        400: If limit is not a positive integer or after is unknown.
+        404: If the user with the specified ID does not exist.
+    """
+    user = storage.get(classes["User"], user_id)
+    if user is None:
+        abort(404)
+
+    reviews_list = []
+    for review in get_page("Review", {"user_id": user_id}):
+        reviews_list.append(review.to_dict())
+    return jsonify(get_deleted("Review") + reviews_list)
 
 
 @app_views.route("/reviews/<review_id>",
                  strict_slashes=False, methods=["GET"])
+@cached("Review", id_arg="review_id")
 def get_review(review_id):
     """Retrieve a specific review by ID.
 
@@ -66,6 +98,7 @@ def get_review(review_id):
 
 @app_views.route("/reviews/<review_id>",
                  strict_slashes=False, methods=["DELETE"])
+@matched("Review", "review_id")
 def delete_review(review_id):
     """Delete a review by ID.
 
@@ -128,6 +161,7 @@ def post_review(place_id):
 
 @app_views.route("/reviews/<review_id>",
                  strict_slashes=False, methods=["PUT"])
+@matched("Review", "review_id")
 def put_review(review_id):
     """Update an existing review.
 
@@ -150,9 +184,10 @@ def put_review(review_id):
         abort(400, "Not a JSON")
 
     for key, value in review_data.items():
-        if key in ["id", "user_id", "place_id", "created_at", "updated_at"]:
+        if key in ["id", "user_id", "place_id", "created_at", "updated_at",
+                   "version"]:
             continue
         setattr(review, key, value)
 
-    storage.save()
+    review.save()
     return jsonify(review.to_dict())
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""API Routes for Place Statistics.
+
+This module defines the API routes summarizing the places of a state or
+of a city, read from the aggregates kept by the storage engine instead of
+the places themselves.
+
+Routes:
+- GET /states/<state_id>/places/stats: Summarize the places of a state.
+- GET /cities/<city_id>/places/stats: Summarize the places of a city.
+
+Each summary holds the number of places, the minimum, 25th, 50th, 75th
+and 90th nearest rank percentiles, maximum and average of their
+price_by_night, their average number of rooms and guests, and the number
+of their reviews.
+"""
+
+from api.v1.views import app_views
+from api.v1.views.caching import cached
+from flask import abort, jsonify
+from models import storage
+from models.engine.db_storage import classes
+
+
+def get_stats(city_ids):
+    """Summarize the places of some cities.
+
+    Args:
+        city_ids: The IDs of the cities.
+
+    Returns:
+        A JSON response containing the summary, with the averages
+        rounded to two decimals.
+    """
+    stats = storage.place_stats(city_ids)
+    price = stats["price_by_night"]
+    if price["avg"] is not None:
+        price["avg"] = round(price["avg"], 2)
+    for name in ["avg_rooms", "avg_guests"]:
+        if stats[name] is not None:
+            stats[name] = round(stats[name], 2)
+    return jsonify(stats)
+
+
+@app_views.route("/states/<state_id>/places/stats",
+                 strict_slashes=False, methods=["GET"])
+@cached("City", "Place", "Review", "State")
+def get_state_stats(state_id):
+    """Summarize the places of a state.
+
+    Args:
+        state_id: The ID of the state.
+
+    Returns:
+        A JSON response containing the summary of the places.
+
+    Raises:
+        404: If the state with the specified ID does not exist.
+    """
+    state = storage.get(classes["State"], state_id)
+    if state is None:
+        abort(404)
+
+    cities = storage.query("City", {"state_id": state_id})
+    return get_stats([city.id for city in cities])
+
+
+@app_views.route("/cities/<city_id>/places/stats",
+                 strict_slashes=False, methods=["GET"])
+@cached("City", "Place", "Review")
+def get_city_stats(city_id):
+    """Summarize the places of a city.
+
+    Args:
+        city_id: The ID of the city.
+
+    Returns:
+        A JSON response containing the summary of the places.
+
+    Raises:
+        404: If the city with the specified ID does not exist.
+    """
+    city = storage.get(classes["City"], city_id)
+    if city is None:
+        abort(404)
+
+    return get_stats([city_id])
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""API Routes for Full-Text Search.
+
+This module defines the API route for searching the descriptions of the
+places and the texts of the reviews for words.
+The results are ranked by relevance: BM25 over an in-memory inverted index
+with file storage, and the FULLTEXT indexes of MySQL with db storage.
+
+Routes:
+- GET /search: Search places and reviews for the words of a query.
+"""
+
+from api.v1.views import app_views
+from api.v1.views.caching import cached
+from api.v1.views.paging import get_limit
+from flask import abort, jsonify, request
+from models import storage
+
+# values of the type parameter and the class each one searches
+search_types = {"place": "Place", "review": "Review"}
+
+
+@app_views.route("/search", strict_slashes=False, methods=["GET"])
+@cached("Place", "Review")
+def get_search():
+    """Search places and reviews for the words of a query.
+
+    The words are given by the q query string parameter. The search
+    can be restricted to one type, place or review, with type, and
+    the number of results set with limit (20 by default).
+
+    Returns:
+        A JSON response containing the list of the matching objects,
+        best first, each with its relevance score.
+
+    Raises:
+        400: If q is missing, type is unknown
+             or limit is not a positive integer.
+    """
+    text = request.args.get("q", "")
+    if not text.strip():
+        abort(400, "Missing q")
+
+    names = None
+    if "type" in request.args:
+        if request.args["type"] not in search_types:
+            abort(400, "Invalid type")
+        names = [search_types[request.args["type"]]]
+
+    limit = get_limit() or 20
+    results = []
+    for obj, score in storage.search(text, names, limit):
+        obj_dict = obj.to_dict()
+        obj_dict["score"] = round(score, 4)
+        results.append(obj_dict)
+    return jsonify(results)
@@ -15,26 +15,34 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.expansion import expand
+from api.v1.views.paging import add_counts, get_deleted, get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
 
 
 @app_views.route("/states", strict_slashes=False, methods=["GET"])
+@cached("State")
 def get_states():
     """Retrieve all states.
 
     Returns:
         A JSON response containing a list of all states.
+
+    Raises:
+        400: If limit is not a positive integer or after is unknown.
     """
-    states = storage.all("State")
     states_list = []
-    for state in states.values():
+    for state in get_page("State"):
         states_list.append(state.to_dict())
-    return jsonify(states_list)
+    return jsonify(get_deleted("State") +
+                   expand("State", add_counts("State", states_list)))
 
 
 @app_views.route("/states/<state_id>", strict_slashes=False, methods=["GET"])
+@cached("State", id_arg="state_id")
 def get_state(state_id):
     """Retrieve a specific state by ID.
 
@@ -45,16 +53,18 @@ def get_state(state_id):
         A JSON response containing the details of the specified state.
 
     Raises:
+        400: If expand is invalid or too large.
         404: If the state with the specified ID does not exist.
     """
     state = storage.get(classes["State"], state_id)
     if state is None:
         abort(404)
-    return jsonify(state.to_dict())
+    return jsonify(expand("State", [state.to_dict()])[0])
 
 
 @app_views.route("/states/<state_id>",
                  strict_slashes=False, methods=["DELETE"])
+@matched("State", "state_id")
 def delete_state(state_id):
     """Delete a state.
 
@@ -101,6 +111,7 @@ def post_state():
 
 
 @app_views.route("/states/<state_id>", strict_slashes=False, methods=["PUT"])
+@matched("State", "state_id")
 def put_state(state_id):
     """Update an existing state.
 
@@ -123,9 +134,9 @@ def put_state(state_id):
         abort(400, "Not a JSON")
 
     for key, value in data_json.items():
-        if key in ["id", "created_at", "updated_at"]:
+        if key in ["id", "created_at", "updated_at", "version"]:
             continue
         setattr(state, key, value)
 
-    storage.save()
+    state.save()
     return jsonify(state.to_dict())
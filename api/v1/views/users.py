@@ -15,26 +15,34 @@ Routes:
 """
 
 from api.v1.views import app_views
+from api.v1.views.caching import cached, matched
+from api.v1.views.expansion import expand
+from api.v1.views.paging import add_counts, get_deleted, get_page
 from flask import abort, jsonify, request
 from models import storage
 from models.engine.db_storage import classes
 
 
 @app_views.route("/users", strict_slashes=False, methods=["GET"])
+@cached("User")
 def get_users():
     """Retrieve all users.
 
     Returns:
         A JSON response containing a list of all users.
+
+    Raises:
+        400: If limit is not a positive integer or after is unknown.
     """
-    users = storage.all("User")
     users_list = []
-    for user in users.values():
+    for user in get_page("User"):
         users_list.append(user.to_dict())
-    return jsonify(users_list)
+    return jsonify(get_deleted("User") +
+                   expand("User", add_counts("User", users_list)))
 
 
 @app_views.route("/users/<user_id>", strict_slashes=False, methods=["GET"])
+@cached("User", id_arg="user_id")
 def get_user(user_id):
     """Retrieve a specific user by ID.
 
@@ -45,15 +53,17 @@ def get_user(user_id):
         A JSON response containing the details of the specified user.
 
     Raises:
+        400: If expand is invalid or too large.
         404: If the user with the specified ID does not exist.
     """
     user = storage.get(classes["User"], user_id)
     if user is None:
         abort(404)
-    return jsonify(user.to_dict())
+    return jsonify(expand("User", [user.to_dict()])[0])
 
 
 @app_views.route("/users/<user_id>", strict_slashes=False, methods=["DELETE"])
+@matched("User", "user_id")
 def delete_user(user_id):
     """Delete a user.
 
@@ -102,6 +112,7 @@ def post_user():
 
 
 @app_views.route("/users/<user_id>", strict_slashes=False, methods=["PUT"])
+@matched("User", "user_id")
 def put_user(user_id):
     """Update an existing user.
 
@@ -124,9 +135,9 @@ def put_user(user_id):
         abort(400, "Not a JSON")
 
     for key, value in user_data.items():
-        if key in ["id", "email", "created_at", "updated_at"]:
+        if key in ["id", "email", "created_at", "updated_at", "version"]:
             continue
         setattr(user, key, value)
 
-    storage.save()
+    user.save()
     return jsonify(user.to_dict())
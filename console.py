@@ -6,12 +6,15 @@ from datetime import datetime
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel
+from models.engine import ndjson
+from models.engine.unit_of_work import unit_of_work
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 import shlex  # for splitting the line along spaces except in double quotes
+from time import perf_counter
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -21,6 +24,11 @@ class HBNBCommand(cmd.Cmd):
     """ HBNH console """
     prompt = '(hbnb) '
 
+    def onecmd(self, line):
+        """Runs a command as a single unit of work"""
+        with unit_of_work():
+            return super().onecmd(line)
+
     def do_EOF(self, arg):
         """Exits console"""
         return True
@@ -94,9 +102,9 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
         elif args[0] in classes:
             if len(args) > 1:
-                key = args[0] + "." + args[1]
-                if key in models.storage.all():
-                    models.storage.all().pop(key)
+                obj = models.storage.get(classes[args[0]], args[1])
+                if obj is not None:
+                    models.storage.delete(obj)
                     models.storage.save()
                 else:
                     print("** no instance found **")
@@ -108,18 +116,18 @@ class HBNBCommand(cmd.Cmd):
     def do_all(self, arg):
         """Prints string representations of instances"""
         args = shlex.split(arg)
-        obj_list = []
         if len(args) == 0:
-            obj_dict = models.storage.all()
+            batches = models.storage.iter()
         elif args[0] in classes:
-            obj_dict = models.storage.all(classes[args[0]])
+            batches = models.storage.iter(classes[args[0]])
         else:
             print("** class doesn't exist **")
             return False
-        for key in obj_dict:
-            obj_list.append(str(obj_dict[key]))
+        separator = ""
         print("[", end="")
-        print(", ".join(obj_list), end="")
+        for batch in batches:
+            print(separator + ", ".join(str(obj) for obj in batch), end="")
+            separator = ", "
         print("]")
 
     def do_update(self, arg):
@@ -160,5 +168,51 @@ class HBNBCommand(cmd.Cmd):
         else:
             print("** class doesn't exist **")
 
+    def do_export(self, arg):
+        """Writes instances to a NDJSON file, one per line
+        Usage: export <file> [<class name> ...]"""
+        args = shlex.split(arg)
+        if len(args) == 0:
+            print("** file name missing **")
+            return False
+        for name in args[1:]:
+            if name not in classes:
+                print("** class doesn't exist **")
+                return False
+        start = perf_counter()
+        try:
+            with open(args[0], "w") as f:
+                count = ndjson.dump(f, args[1:])
+        except OSError:
+            print("** can't write file **")
+            return False
+        print(ndjson.report("Exported", count, perf_counter() - start))
+
+    def do_import(self, arg):
+        """Creates the instances stored in a NDJSON file, in batches
+        Usage: import <file>"""
+        args = shlex.split(arg)
+        if len(args) == 0:
+            print("** file name missing **")
+            return False
+        start = perf_counter()
+        try:
+            with open(args[0], "r") as f:
+                count, skipped, errors = ndjson.load(f)
+        except OSError:
+            print("** file doesn't exist **")
+            return False
+        for number, reason in errors:
+            print("** line {}: {} **".format(number, reason))
+        print(ndjson.report("Imported", count, perf_counter() - start))
+
+    def do_migrate(self, arg):
+        """Creates the indexes missing from an existing database"""
+        if models.storage_t != "db":
+            print("** migrate requires db storage **")
+            return False
+        for name in models.storage.migrate():
+            print(name)
+
 if __name__ == '__main__':
     HBNBCommand().cmdloop()
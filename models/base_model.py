@@ -7,7 +7,7 @@ from datetime import datetime
 import models
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Integer
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 from hashlib import md5
@@ -25,7 +25,11 @@ class BaseModel:
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+        version = Column(Integer, nullable=False, default=1,
+                         server_default="1")
+    else:
+        version = 1
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -54,8 +58,13 @@ class BaseModel:
                                          self.__dict__)
 
     def save(self):
-        """updates the attribute 'updated_at' with the current datetime"""
+        """updates the attribute 'updated_at' with the current datetime
+        and increments the attribute 'version'"""
         self.updated_at = datetime.utcnow()
+        version = self.version
+        if not isinstance(version, int):
+            version = 0
+        self.version = version + 1
         models.storage.new(self)
         models.storage.save()
 
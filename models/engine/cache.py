@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Contains the class LRUCache
+"""
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+
+MISSING = object()
+
+
+class LRUCache:
+    """bounded mapping that evicts the least recently used entries first
+    and forgets entries older than ttl seconds"""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """Instantiate a LRUCache object"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """returns the value stored for key, or default on a miss"""
+        with self.__lock:
+            entry = self.__data.get(key)
+            if entry is not None and self.ttl and entry[0] < monotonic():
+                del self.__data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """stores value for key, evicting the oldest entries if full"""
+        expires = monotonic() + self.ttl if self.ttl else None
+        with self.__lock:
+            self.__data[key] = (expires, value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def pop(self, key):
+        """forgets the value stored for key"""
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self):
+        """forgets every value"""
+        with self.__lock:
+            self.__data.clear()
+
+    def __len__(self):
+        """returns the number of stored values"""
+        return len(self.__data)
+
+    def info(self):
+        """returns the hit and miss counters, the hit rate and the size of
+        the cache"""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "size": len(self.__data), "maxsize": self.maxsize,
+                "ttl": self.ttl}
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Contains the class ChangeLog
+"""
+
+from collections import deque
+from itertools import islice
+import threading
+
+
+class ChangeLog:
+    """ring buffer of the last changes made to the objects of a storage
+    engine, each numbered by its offset in the log and by the version of
+    its class it produced
+
+    A change is a dictionary {"offset", "class", "id", "operation",
+    "version"} where operation is "new", "update" or "delete". Readers
+    resume after the offset of the last change they got, and can wait
+    for the next changes to be recorded.
+    """
+
+    def __init__(self, size=10000):
+        """Instantiate a ChangeLog object"""
+        self.size = size
+        self.__changes = deque(maxlen=size)
+        self.__offset = 0
+        self.__versions = {}
+        self.__condition = threading.Condition()
+
+    def record(self, changes):
+        """appends the (class name, id, operation) triples of changes and
+        wakes up the readers waiting for them"""
+        with self.__condition:
+            for name, id, operation in changes:
+                self.__offset += 1
+                self.__versions[name] = self.__versions.get(name, 0) + 1
+                self.__changes.append({"offset": self.__offset,
+                                       "class": name, "id": id,
+                                       "operation": operation,
+                                       "version": self.__versions[name]})
+            if changes:
+                self.__condition.notify_all()
+
+    def offset(self):
+        """returns the offset of the last change recorded"""
+        with self.__condition:
+            return self.__offset
+
+    def version(self, name):
+        """returns the number of changes recorded for the class name"""
+        with self.__condition:
+            return self.__versions.get(name, 0)
+
+    def since(self, offset, timeout=None):
+        """returns the changes recorded after offset, waiting up to timeout
+        seconds for one if there is none yet, and whether none of them
+        was dropped from the log in between"""
+        with self.__condition:
+            if offset >= self.__offset and timeout:
+                self.__condition.wait_for(lambda: offset < self.__offset,
+                                          timeout)
+            first = self.__offset - len(self.__changes)
+            changes = list(islice(self.__changes, max(0, offset - first),
+                                  None))
+            return changes, offset >= first
@@ -3,18 +3,35 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, time
+from models.engine.cache import LRUCache, MISSING
+from models.engine.changes import ChangeLog
+from models.engine.geo import bounding_box, haversine
+from models.engine.query import bounds, children, counted, is_many, is_range
+from models.engine.query import links, parents, parse_order, searchable
+from models.engine.query import percentiles, rank, tokenize
 from models.city import City
 from models.place import Place
 from models.review import Review
 from models.state import State
+from models.tombstone import Tombstone, max_age
 from models.user import User
+from itertools import count
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, delete, insert, or_, select
+from sqlalchemy import Float, case, cast, event, func, union_all, update
+from sqlalchemy.dialects.mysql import match as fulltext_match
+from sqlalchemy.orm import make_transient_to_detached, object_session
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.schema import CreateColumn
+import threading
+import uuid
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -24,6 +41,8 @@ class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    __replicas = []
+    __cache = None
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -32,59 +51,658 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        HBNB_DB_URL = getenv('HBNB_DB_URL')
+        if HBNB_DB_URL is None:
+            HBNB_DB_URL = 'mysql+mysqldb://{}:{}@{}/{}'.format(
+                HBNB_MYSQL_USER, HBNB_MYSQL_PWD,
+                HBNB_MYSQL_HOST, HBNB_MYSQL_DB)
+        self.__engine = create_engine(HBNB_DB_URL)
+        HBNB_DB_REPLICAS = getenv('HBNB_DB_REPLICAS', '')
+        self.__replica_engines = [create_engine(url.strip()) for url
+                                  in HBNB_DB_REPLICAS.split(',')
+                                  if url.strip()]
+        self.__turn = count()
+        self.__local = threading.local()
+        self.changes = ChangeLog()
+        HBNB_CACHE_SIZE = int(getenv('HBNB_CACHE_SIZE', 0))
+        if HBNB_CACHE_SIZE > 0:
+            ttl = float(getenv('HBNB_CACHE_TTL', 60))
+            self.__cache = LRUCache(HBNB_CACHE_SIZE, ttl)
+            self.__cached = getenv('HBNB_CACHE_CLASSES',
+                                   'Amenity,State').split(',')
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
+    def __reader(self):
+        """returns the session read-only operations should go through
+
+        Reads stay on one replica for the whole request, and move to the
+        primary for good once the request has written anything so that
+        it always reads its own writes."""
+        if not self.__replicas or getattr(self.__local, "primary", False):
+            return self.__session
+        replica = getattr(self.__local, "replica", None)
+        if replica is None:
+            replica = self.__replicas[next(self.__turn) % len(self.__replicas)]
+            self.__local.replica = replica
+        return replica
+
+    def __writer(self, obj=None):
+        """pins the request to the primary and moves obj into its session
+        if it was loaded from a replica
+
+        The first write of a request moves every object loaded from its
+        replica, so that the objects obj refers to, such as the amenities
+        appended to a place, are written along with it."""
+        if not getattr(self.__local, "primary", False):
+            self.__local.primary = True
+            replica = getattr(self.__local, "replica", None)
+            if replica is not None and replica.registry.has():
+                loaded = list(replica.identity_map.values())
+                replica.expunge_all()
+                for other in loaded:
+                    if identity_key(instance=other) not in \
+                            self.__session.identity_map:
+                        self.__session.add(other)
+        self.__forget(obj)
+        session = object_session(obj) if obj is not None else None
+        if session is not None and session is not self.__session():
+            session.expunge(obj)
+            self.__session.add(obj)
+
+    def __forget(self, obj):
+        """drops obj from the object cache"""
+        if self.__cache is not None and obj is not None:
+            self.__cache.pop(obj.__class__.__name__ + '.' + obj.id)
+
     def all(self, cls=None):
         """query on the current database session"""
         new_dict = {}
+        session = self.__reader()
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = session.query(classes[clss]).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter(self, cls=None, batch_size=1000):
+        """yields the objects of cls, or of every class, in lists of at
+        most batch_size objects ordered by class name and id
+
+        Rows are fetched through a server side cursor batch_size at a time
+        instead of being loaded all at once."""
+        session = self.__reader()
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls == clss:
+                query = select(classes[clss]).order_by(classes[clss].id). \
+                    execution_options(yield_per=batch_size)
+                for batch in session.execute(query).scalars().partitions():
+                    yield batch
+
     def new(self, obj):
         """add the object to the current database session"""
+        self.__writer(obj)
         self.__session.add(obj)
 
     def save(self):
         """commit all changes of the current database session"""
+        self.__writer()
+        for replica in self.__replicas:
+            if replica.registry.has():
+                for obj in list(replica.dirty):
+                    self.__writer(obj)
+        if getattr(self.__local, "depth", 0):
+            self.__local.pending = True
+            return
+        changed = list(self.__session.new) + list(self.__session.dirty) + \
+            list(self.__session.deleted)
         self.__session.commit()
+        for obj in changed:
+            self.__forget(obj)
+        self.changes.record(getattr(self.__local, "changes", []))
+        self.__local.changes = []
+        if self.__cache is not None and getattr(self.__local, "bulk", False):
+            self.__cache.clear()
+        self.__local.bulk = False
+
+    def __flushing(self, session, context, instances):
+        """notes the objects about to be written by a flush of session"""
+        for operation, objs in [("new", session.new),
+                                ("update", session.dirty),
+                                ("delete", session.deleted)]:
+            for obj in objs:
+                if operation != "update" or session.is_modified(obj):
+                    self.__track(obj.__class__, [obj.id], operation)
+
+    def __track(self, cls, ids, operation):
+        """notes the change of the objects of cls whose ids are given until
+        the next commit records it in the change log"""
+        if cls is Tombstone:
+            return
+        if not hasattr(self.__local, "changes"):
+            self.__local.changes = []
+        self.__local.changes.extend((cls.__name__, id, operation)
+                                    for id in ids)
+
+    def begin(self):
+        """starts a unit of work, deferring save() until the matching end()
+        so that it commits only once"""
+        self.__local.depth = getattr(self.__local, "depth", 0) + 1
+
+    def pending(self):
+        """returns True if the current unit of work holds changes that are
+        not committed yet"""
+        return bool(getattr(self.__local, "pending", False) or
+                    getattr(self.__local, "changes", None) or
+                    self.__session.new or self.__session.dirty or
+                    self.__session.deleted)
+
+    def end(self, commit=True):
+        """ends a unit of work, committing or rolling back its deferred
+        save()"""
+        self.__local.depth -= 1
+        if self.__local.depth or not getattr(self.__local, "pending", False):
+            return
+        self.__local.pending = False
+        if commit:
+            self.save()
+        else:
+            self.rollback()
+
+    def rollback(self):
+        """discards the changes made since the last save()"""
+        self.__local.changes = []
+        self.__session.rollback()
 
     def delete(self, obj=None):
-        """delete from the current database session obj if not None"""
+        """delete from the current database session obj if not None, with
+        a Tombstone for it and for each object its deletion cascades to"""
         if obj is not None:
+            self.__writer(obj)
+            deleted = set(self.__session.deleted)
             self.__session.delete(obj)
+            for gone in set(self.__session.deleted) - deleted:
+                self.__session.merge(Tombstone(
+                    id=gone.id, class_name=gone.__class__.__name__))
+            self.__prune()
+
+    def __prune(self):
+        """deletes the tombstones older than their retention"""
+        self.__session.execute(delete(Tombstone).where(
+            Tombstone.updated_at < datetime.utcnow() - max_age))
+
+    def deleted(self, cls, since):
+        """returns the tombstones of the objects of cls deleted after
+        since, oldest deletion first"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.__reader().scalars(
+            select(Tombstone).where(Tombstone.class_name == name,
+                                    Tombstone.updated_at > since).
+            order_by(Tombstone.updated_at, Tombstone.id)).all()
+
+    def fingerprint(self, names):
+        """returns, for each class name of names, the number of its rows,
+        the sum of their versions and their latest updated_at, in a single
+        query, so that a write to the class by any process changes it"""
+        rows = self.__reader().execute(union_all(*[
+            select(sqlalchemy.literal(name), func.count(classes[name].id),
+                   func.coalesce(func.sum(classes[name].version), 0),
+                   func.max(classes[name].updated_at))
+            for name in names])).all()
+        found = {row[0]: tuple(row[1:]) for row in rows}
+        return tuple(found[name] for name in names)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "before_flush", self.__flushing)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        self.__replicas = [scoped_session(sessionmaker(bind=engine,
+                                                       expire_on_commit=False))
+                           for engine in self.__replica_engines]
+
+    def migrate(self):
+        """creates the tables, columns and indexes missing from the
+        database
+
+        create_all() only creates missing tables, so the columns and the
+        indexes declared on the models are added separately to tables
+        that already exist. Indexes declared for another database, such as
+        the MySQL FULLTEXT ones, are skipped. Returns the names of the
+        columns, as <table>.<column>, and of the indexes created."""
+        Base.metadata.create_all(self.__engine)
+        created = []
+        inspector = sqlalchemy.inspect(self.__engine)
+        for table in Base.metadata.sorted_tables:
+            existing = [column["name"]
+                        for column in inspector.get_columns(table.name)]
+            with self.__engine.begin() as conn:
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    conn.exec_driver_sql("ALTER TABLE {} ADD COLUMN {}".format(
+                        table.name, CreateColumn(column).compile(
+                            dialect=self.__engine.dialect)))
+                    created.append(table.name + "." + column.name)
+            existing = self.__index_names(table)
+            missing = [index for index in table.indexes
+                       if index.name not in existing]
+            for index in missing:
+                index.create(self.__engine)
+            if missing:
+                existing = self.__index_names(table)
+                created.extend(index.name for index in missing
+                               if index.name in existing)
+        return created
+
+    def __index_names(self, table):
+        """returns the names of the indexes of table in the database"""
+        inspector = sqlalchemy.inspect(self.__engine)
+        return [index["name"] for index in inspector.get_indexes(table.name)]
+
+    def __criteria(self, cls, filters):
+        """compiles filters into SQL criteria on the columns of cls"""
+        criteria = []
+        derived = parents.get(cls.__name__, {})
+        for name, value in filters.items():
+            if name in derived:
+                key, parent = derived[name]
+                parent = classes[parent]
+                column = getattr(cls, key)
+                value = select(parent.id).where(
+                    *self.__criteria(parent, {name: value}))
+            elif name in links.get(cls.__name__, {}):
+                values = set(value) if is_many(value) else {value}
+                if values:
+                    criteria.append(cls.id.in_(self.__holding(
+                        links[cls.__name__][name], values)))
+                continue
+            elif name in cls.__table__.columns:
+                column = getattr(cls, name)
+            else:
+                raise ValueError("Unknown attribute {}".format(name))
+            if isinstance(value, sqlalchemy.sql.Select):
+                criteria.append(column.in_(value))
+            elif is_range(value):
+                for op, bound in value.items():
+                    criteria.append(bounds[op](column, bound))
+            elif is_many(value):
+                criteria.append(column.in_(list(value)))
+            else:
+                criteria.append(column == value)
+        return criteria
+
+    def query(self, cls, filters=None, order_by=None, limit=None,
+              after=None):
+        """returns the objects of cls that satisfy filters
+
+        They are ordered by the order_by attribute, descending if it is
+        prefixed with -, then by id. Only the objects that come after the
+        object whose id is after are returned, and at most limit of them.
+        """
+        cls = classes.get(cls, cls)
+        if cls not in classes.values():
+            return []
+        attr, descending = parse_order(order_by)
+        if attr not in cls.__table__.columns:
+            raise ValueError("Unknown attribute {}".format(attr))
+        column = getattr(cls, attr)
+        statement = select(cls).where(*self.__criteria(cls, filters or {}))
+        if after is not None:
+            last = self.get(cls, after)
+            if last is None:
+                raise ValueError("Unknown after")
+            statement = statement.where(self.__after(
+                column, cls.id, getattr(last, attr), last.id, descending))
+        if descending:
+            statement = statement.order_by(column.desc(), cls.id.desc())
+        else:
+            statement = statement.order_by(column, cls.id)
+        return list(self.__reader().scalars(statement.limit(limit)))
+
+    def nearby(self, lat, lng, radius_km, limit=None):
+        """returns (place, distance in km) pairs for the places within
+        radius_km of a point, nearest first and at most limit of them"""
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng,
+                                                          radius_km)
+        found = []
+        for obj in self.query(Place, {
+                "latitude": {"gte": min_lat, "lte": max_lat},
+                "longitude": {"gte": min_lng, "lte": max_lng}}):
+            distance = haversine(lat, lng, obj.latitude, obj.longitude)
+            if distance <= radius_km:
+                found.append((distance, obj.id, obj))
+        found.sort()
+        return [(obj, distance) for distance, id, obj in found[:limit]]
+
+    def similar(self, place, limit=None):
+        """returns (place, similarity) pairs for the other places sharing
+        amenities with place, by decreasing Jaccard similarity of their
+        amenities then id, and at most limit of them
+
+        The similarities are exact, counted by joining the link table to
+        itself on the amenities of place through its amenity_id index."""
+        table, key, other = links["Place"]["amenity_ids"]
+        table = Base.metadata.tables[table]
+        session = self.__reader()
+        held = select(table.c[other]).where(table.c[key] == place.id)
+        size = session.scalar(select(func.count()).select_from(
+            held.subquery()))
+        if not size:
+            return []
+        shared = select(table.c[key].label("id"),
+                        func.count().label("shared")). \
+            where(table.c[other].in_(held), table.c[key] != place.id). \
+            group_by(table.c[key]).subquery()
+        sizes = select(table.c[key].label("id"),
+                       func.count().label("size")). \
+            where(table.c[key].in_(select(shared.c.id))). \
+            group_by(table.c[key]).subquery()
+        similarity = cast(shared.c.shared, Float) / \
+            (sizes.c.size + size - shared.c.shared)
+        statement = select(Place, similarity). \
+            join(shared, Place.id == shared.c.id). \
+            join(sizes, Place.id == sizes.c.id). \
+            order_by(similarity.desc(), Place.id).limit(limit)
+        return [(obj, float(value))
+                for obj, value in session.execute(statement)]
+
+    def counts(self, cls, ids):
+        """returns {id: {counter: number}} for the objects of cls whose ids
+        are given, with the number of children of each kind in counted
+
+        Each counter is one GROUP BY query answered from the index on the
+        foreign key of the children, without loading any of them."""
+        cls = classes.get(cls, cls)
+        found = {id: {} for id in ids}
+        session = self.__reader()
+        for counter, (child, key) in counted.get(cls.__name__, {}).items():
+            column = getattr(classes[child], key)
+            numbers = dict(session.execute(
+                select(column, func.count()).where(column.in_(list(found))).
+                group_by(column)).all())
+            for id in found:
+                found[id][counter] = numbers.get(id, 0)
+        return found
+
+    def linked(self, cls, attr, ids):
+        """returns {id: [linked ids]} for the objects of cls whose ids are
+        given, with the ids linked to them through the link table of attr,
+        read in a single query"""
+        cls = classes.get(cls, cls)
+        table, key, other = links[cls.__name__][attr]
+        table = Base.metadata.tables[table]
+        found = {id: [] for id in ids}
+        statement = select(table.c[key], table.c[other]). \
+            where(table.c[key].in_(list(found))).order_by(table.c[other])
+        for id, linked_id in self.__reader().execute(statement):
+            found[id].append(linked_id)
+        return found
+
+    def place_stats(self, city_ids):
+        """returns the number of places in the cities of city_ids, the
+        minimum, percentiles, maximum and average of their price_by_night,
+        the averages of their number_rooms and max_guest and the number of
+        their reviews
+
+        The counts, extremes and averages come from one aggregate query,
+        and each percentile from one indexed query at its rank."""
+        session = self.__reader()
+        where = Place.city_id.in_(list(set(city_ids)))
+        price = Place.price_by_night
+        count, low, high, average, rooms, guests = session.execute(
+            select(func.count(), func.min(price), func.max(price),
+                   func.avg(price), func.avg(Place.number_rooms),
+                   func.avg(Place.max_guest)).where(where)).one()
+        prices = {"min": low}
+        for name, percent in percentiles.items():
+            prices[name] = session.scalar(
+                select(price).where(where).order_by(price).
+                offset(rank(percent, count)).limit(1)) if count else None
+        prices["max"] = high
+        prices["avg"] = None if average is None else float(average)
+        reviews = session.scalar(select(func.count(Review.id)).where(
+            Review.place_id.in_(select(Place.id).where(where))))
+        return {"places": count,
+                "price_by_night": prices,
+                "avg_rooms": None if rooms is None else float(rooms),
+                "avg_guests": None if guests is None else float(guests),
+                "reviews": reviews}
+
+    def search(self, text, names=None, limit=None):
+        """returns (object, score) pairs for the objects whose searchable
+        text uses words of text, of the classes in names if given, best
+        first and at most limit of them
+
+        MySQL ranks the rows with its FULLTEXT indexes, other databases
+        by the number of words of text each row contains."""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        session = self.__reader()
+        found = []
+        for name, attrs in searchable.items():
+            if names is not None and name not in names:
+                continue
+            cls = classes[name]
+            for attr in attrs:
+                score = self.__relevance(getattr(cls, attr), terms)
+                statement = select(cls, score).where(score > 0). \
+                    order_by(score.desc(), cls.id).limit(limit)
+                for obj, value in session.execute(statement):
+                    found.append((float(value), obj.id, obj))
+        found.sort(key=lambda item: (-item[0], item[1]))
+        return [(obj, score) for score, id, obj in found[:limit]]
+
+    def __relevance(self, column, terms):
+        """returns the SQL expression of the relevance of column to the
+        words in terms"""
+        if self.__engine.dialect.name == "mysql":
+            return fulltext_match(column, against=" ".join(terms)). \
+                in_natural_language_mode()
+        return sum(case((func.lower(column).like(
+            "%{}%".format(self.__escape(term)), escape="\\"), 1),
+            else_=0) for term in terms)
+
+    def __escape(self, text):
+        """returns text with the LIKE wildcards escaped by a backslash"""
+        for char in "\\%_":
+            text = text.replace(char, "\\" + char)
+        return text
+
+    def complete(self, cls, prefix, limit=None, attr="name"):
+        """returns the objects of cls whose attr starts with prefix,
+        ignoring case, in the order of attr and at most limit of them"""
+        cls = classes.get(cls, cls)
+        column = getattr(cls, attr)
+        statement = select(cls).where(column.like(
+            self.__escape(prefix) + "%", escape="\\")). \
+            order_by(column, cls.id).limit(limit)
+        return list(self.__reader().scalars(statement))
+
+    def __after(self, column, id_column, value, id, descending):
+        """returns the criterion selecting the rows that come after the
+        row (value, id) in the order of column then id, NULL first"""
+        if descending:
+            if value is None:
+                return and_(column.is_(None), id_column < id)
+            return or_(column < value,
+                       and_(column == value, id_column < id),
+                       column.is_(None))
+        if value is None:
+            return or_(column.isnot(None),
+                       and_(column.is_(None), id_column > id))
+        return or_(column > value, and_(column == value, id_column > id))
+
+    def __holding(self, link, values):
+        """returns the query of the keys linked to every one of values in
+        a (table, key, linked key) link table"""
+        table, key, other = link
+        table = Base.metadata.tables[table]
+        return select(table.c[key]).where(table.c[other].in_(values)). \
+            group_by(table.c[key]). \
+            having(func.count(table.c[other].distinct()) == len(values))
+
+    def update_where(self, cls, filters, values):
+        """sets values on every object of cls that satisfies filters with a
+        single UPDATE statement, and returns how many were updated"""
+        cls = classes.get(cls, cls)
+        for name in values:
+            if name not in cls.__table__.columns:
+                raise ValueError("Unknown attribute {}".format(name))
+        criteria = self.__criteria(cls, filters)
+        self.__writer()
+        self.__local.bulk = True
+        self.__track(cls, self.__session.scalars(
+            select(cls.id).where(*criteria)).all(), "update")
+        result = self.__session.execute(
+            update(cls).where(*criteria).values(updated_at=datetime.utcnow(),
+                                                version=cls.version + 1,
+                                                **values))
+        self.save()
+        return result.rowcount
+
+    def insert_many(self, cls, records):
+        """inserts a row of cls for each record dictionary with a single
+        executemany, and returns how many were inserted
+
+        Passwords in the records are expected to be hashed already, and the
+        amenity_ids of place records are inserted as place_amenity rows.
+        The rows are inserted within a savepoint. Raises ValueError, after
+        rolling back to it, if the database rejects a row, as it does a
+        duplicate id, so the earlier writes of a unit of work are kept."""
+        cls = classes.get(cls, cls)
+        columns = cls.__table__.columns
+        rows = []
+        links = []
+        for record in records:
+            row = {}
+            for key, value in record.items():
+                if key not in columns:
+                    continue
+                if isinstance(columns[key].type, sqlalchemy.DateTime) and \
+                        isinstance(value, str):
+                    value = datetime.strptime(value, time)
+                row[key] = value
+            row.setdefault("id", str(uuid.uuid4()))
+            rows.append(row)
+            if cls is Place:
+                links.extend({"place_id": row["id"], "amenity_id": amenity_id}
+                             for amenity_id in record.get("amenity_ids", []))
+        self.__writer()
+        savepoint = self.__session.begin_nested()
+        try:
+            if rows:
+                self.__session.execute(insert(cls), rows)
+            if links:
+                self.__session.execute(
+                    insert(Base.metadata.tables["place_amenity"]), links)
+            savepoint.commit()
+        except sqlalchemy.exc.IntegrityError as error:
+            savepoint.rollback()
+            raise ValueError(str(error.orig))
+        self.__track(cls, [row["id"] for row in rows], "new")
+        self.save()
+        return len(rows)
+
+    def delete_where(self, cls, filters):
+        """deletes every object of cls that satisfies filters, along with
+        the objects that cascade from them, with one DELETE statement per
+        table, and returns how many objects of cls were deleted"""
+        cls = classes.get(cls, cls)
+        criteria = self.__criteria(cls, filters)
+        self.__writer()
+        self.__local.bulk = True
+        self.__delete_children(cls, select(cls.id).where(*criteria))
+        self.__bury(cls, criteria)
+        self.__prune()
+        result = self.__session.execute(delete(cls).where(*criteria))
+        self.save()
+        return result.rowcount
+
+    def __delete_children(self, cls, ids):
+        """deletes the rows that cascade from the objects of cls whose id
+        is selected by ids"""
+        for child, key in children.get(cls.__name__, []):
+            child = classes[child]
+            criteria = getattr(child, key).in_(ids)
+            self.__delete_children(child, select(child.id).where(criteria))
+            self.__bury(child, [criteria])
+            self.__session.execute(delete(child).where(criteria))
+        link = {"Place": "place_id", "Amenity": "amenity_id"}
+        if cls.__name__ in link:
+            table = Base.metadata.tables["place_amenity"]
+            self.__session.execute(
+                delete(table).where(table.c[link[cls.__name__]].in_(ids)))
+
+    def __bury(self, cls, criteria):
+        """records a Tombstone and a change for each object of cls about to
+        be deleted for satisfying criteria"""
+        ids = select(cls.id).where(*criteria)
+        self.__track(cls, self.__session.scalars(ids).all(), "delete")
+        now = sqlalchemy.literal(datetime.utcnow(), sqlalchemy.DateTime)
+        self.__session.execute(delete(Tombstone).where(Tombstone.id.in_(ids)))
+        self.__session.execute(insert(Tombstone).from_select(
+            ["id", "class_name", "created_at", "updated_at"],
+            select(cls.id, sqlalchemy.literal(cls.__name__), now, now).
+            where(*criteria)))
 
     def get(self, cls, id):
         """Returns an object based on the class and its ID"""
-        objs = self.all(cls)
-        for obj in objs.values():
-            if id == obj.id:
-                return obj
-        return
+        cls = classes.get(cls, cls)
+        if cls not in classes.values() or id is None:
+            return
+        session = self.__reader()
+        if self.__cache is None or cls.__name__ not in self.__cached:
+            return session.get(cls, id)
+        obj = session.identity_map.get(identity_key(cls, id))
+        if obj is not None:
+            return obj
+        key = cls.__name__ + '.' + id
+        values = self.__cache.get(key)
+        if values is MISSING:
+            obj = session.get(cls, id)
+            if obj is None:
+                self.__cache.set(key, None)
+            else:
+                self.__cache.set(key, {attr.key: getattr(obj, attr.key)
+                                       for attr in sqlalchemy.inspect(cls).
+                                       column_attrs})
+            return obj
+        if values is None:
+            return
+        obj = cls.__mapper__.class_manager.new_instance()
+        for name, value in values.items():
+            set_committed_value(obj, name, value)
+        make_transient_to_detached(obj)
+        return session.merge(obj, load=False)
+
+    def cache_info(self):
+        """Returns the hit and miss counters of the object cache, or None
+        if the cache is disabled"""
+        if self.__cache is None:
+            return
+        return self.__cache.info()
 
     def count(self, cls=None):
         """Returns the number of objects in storage matching the given class.
         If no class is passed, returns the count of all objects in storage."""
-        objs = self.all(cls)
-        return len(objs)
+        session = self.__reader()
+        total = 0
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls == clss:
+                total += session.query(classes[clss]).count()
+        return total
 
     def close(self):
         """call remove() method on the private session attribute"""
+        self.__local.changes = []
         self.__session.remove()
+        for replica in self.__replicas:
+            replica.remove()
+        self.__local.primary = False
+        self.__local.replica = None
@@ -3,18 +3,48 @@
 Contains the FileStorage class
 """
 
+from datetime import datetime
+import heapq
 import json
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine.changes import ChangeLog
+from models.engine.geo import bounding_box, haversine
+from models.engine.indexes import AggregateIndex, BitsetIndex, GridIndex
+from models.engine.indexes import HashIndex, MinHashIndex, PrefixIndex
+from models.engine.indexes import SortedIndex, TextIndex
+from models.engine.indexes import select_ranks
+from models.engine.query import children, completable, counted, is_many
+from models.engine.query import is_range, links, match, parents, percentiles
+from models.engine.query import rank
+from models.engine.query import parse_order, searchable, sort_key, tokenize
 from models.place import Place
 from models.review import Review
 from models.state import State
+from models.tombstone import Tombstone, max_age
 from models.user import User
+import os
+import threading
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# attributes of each class with a hash index, to look children up by parent
+hashed = {"City": ["state_id"], "Place": ["city_id", "user_id"],
+          "Review": ["place_id", "user_id"]}
+# numeric attributes of each class with a sorted index, for ranges and order
+ordered = {"Place": ["price_by_night", "number_rooms", "max_guest"]}
+# datetime attributes of every class with a sorted index, for the changes
+dated = ["updated_at"]
+# attributes listing ids with a bitset index, to match several ids at once
+bitsets = {"Place": ["amenity_ids"]}
+# attributes listing ids with a MinHash index, to find similar lists of ids
+minhashed = {"Place": ["amenity_ids"]}
+# numeric attributes aggregated by group: {class: {grouping attribute: [...]}}
+aggregated = {"Place": {"city_id": ["price_by_night", "number_rooms",
+                                    "max_guest"]}}
+
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
@@ -23,55 +53,575 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # per thread depth of the current unit of work
+    __local = threading.local()
+    # dictionary - the set of the keys in __objects of each class name
+    __keys = {}
+    # dictionary - the secondary indexes of each class name
+    __indexes = {name: [HashIndex(attr) for attr in hashed.get(name, [])] +
+                 [SortedIndex(attr) for attr in ordered.get(name, [])] +
+                 [SortedIndex(attr, (datetime,)) for attr in dated] +
+                 [BitsetIndex(attr) for attr in bitsets.get(name, [])] +
+                 [MinHashIndex(attr) for attr in minhashed.get(name, [])] +
+                 [AggregateIndex(attr, fields)
+                  for attr, fields in aggregated.get(name, {}).items()] +
+                 [TextIndex(attr) for attr in searchable.get(name, [])] +
+                 [PrefixIndex(attr) for attr in completable.get(name, [])]
+                 for name in classes}
+    __indexes["Place"].append(GridIndex("latitude", "longitude"))
+    # dictionary - the Tombstone of each deleted id of each class name
+    __tombstones = {}
+    # the changes saved to the file, for the readers of the change feed
+    changes = ChangeLog()
+    # (modification time, size) of the JSON file when it was last read or
+    # written, to tell whether close() has anything to reload
+    __stat = None
+
+    def __class_keys(self, cls):
+        """returns a snapshot of the keys of the objects of cls"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        return list(self.__keys.get(name, ()))
 
     def all(self, cls=None):
         """returns the dictionary __objects"""
         if cls is not None:
             new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
+            for key in self.__class_keys(cls):
+                value = self.__objects.get(key)
+                if value is not None:
                     new_dict[key] = value
             return new_dict
         return self.__objects
 
+    def iter(self, cls=None, batch_size=1000):
+        """yields the objects of cls, or of every class, in lists of at
+        most batch_size objects ordered by class name and id
+
+        Only a snapshot of the keys is taken up front, objects deleted
+        during the iteration are skipped."""
+        names = sorted(self.__keys) if cls is None else [cls]
+        for name in names:
+            keys = sorted(self.__class_keys(name))
+            for start in range(0, len(keys), batch_size):
+                batch = []
+                for key in keys[start:start + batch_size]:
+                    obj = self.__objects.get(key)
+                    if obj is not None:
+                        batch.append(obj)
+                if batch:
+                    yield batch
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__track(obj, "update" if key in self.__objects else "new")
+            self.__store(key, obj)
+
+    def __store(self, key, obj):
+        """sets obj in __objects under key and in the indexes of its
+        class"""
+        self.__objects[key] = obj
+        self.__keys.setdefault(obj.__class__.__name__, set()).add(key)
+        for index in self.__indexes.get(obj.__class__.__name__, ()):
+            index.add(key, obj)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
+        """serializes __objects to the JSON file (path: __file_path)
+
+        Objects are written one at a time instead of building the whole
+        JSON document in memory first."""
+        if getattr(self.__local, "depth", 0):
+            self.__local.pending = True
+            return
         with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+            f.write("{")
+            separator = ""
+            for key, obj in list(self.__objects.items()):
+                f.write(separator + json.dumps(key) + ": " +
+                        json.dumps(obj.to_dict()))
+                separator = ", "
+            self.__prune()
+            for tombstones in list(self.__tombstones.values()):
+                for obj in list(tombstones.values()):
+                    f.write(separator + json.dumps("Tombstone." + obj.id) +
+                            ": " + json.dumps(obj.to_dict()))
+                    separator = ", "
+            f.write("}")
+            f.flush()
+            FileStorage.__stat = self.__file_stat(f)
+        self.changes.record(getattr(self.__local, "changes", []))
+        self.__local.changes = []
+
+    def __prune(self):
+        """forgets the tombstones older than their retention"""
+        oldest = datetime.utcnow() - max_age
+        for tombstones in self.__tombstones.values():
+            for id, obj in list(tombstones.items()):
+                if obj.updated_at < oldest:
+                    del tombstones[id]
+
+    def __track(self, obj, operation):
+        """notes the change of obj until the next save() records it in the
+        change log"""
+        if not hasattr(self.__local, "changes"):
+            self.__local.changes = []
+        self.__local.changes.append((obj.__class__.__name__, obj.id,
+                                     operation))
+
+    def fingerprint(self, names):
+        """returns, for each class name of names, the number of its objects
+        and the modification time and size of the JSON file they were last
+        read from or written to, which a save by any process changes"""
+        return tuple((len(self.__keys.get(name, ())), self.__stat)
+                     for name in names)
+
+    def __file_stat(self, f=None):
+        """returns the modification time and size of the open file f, or
+        of the JSON file if f is None, or None if there is no file"""
+        try:
+            stat = os.stat(self.__file_path) if f is None else \
+                os.fstat(f.fileno())
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
     def reload(self):
         """deserializes the JSON file to __objects"""
         try:
             with open(self.__file_path, 'r') as f:
+                FileStorage.__stat = self.__file_stat(f)
                 jo = json.load(f)
             for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+                if jo[key]["__class__"] == "Tombstone":
+                    obj = Tombstone(**jo[key])
+                    self.__tombstones.setdefault(obj.class_name,
+                                                 {})[obj.id] = obj
+                    continue
+                self.__store(key, classes[jo[key]["__class__"]](**jo[key]))
         except:
             pass
 
+    def begin(self):
+        """starts a unit of work, deferring save() until the matching end()
+        so that it writes the file only once"""
+        self.__local.depth = getattr(self.__local, "depth", 0) + 1
+
+    def pending(self):
+        """returns True if the current unit of work holds changes that are
+        not written yet"""
+        return bool(getattr(self.__local, "pending", False) or
+                    getattr(self.__local, "changes", None))
+
+    def end(self, commit=True):
+        """ends a unit of work, writing or discarding its deferred save()"""
+        self.__local.depth -= 1
+        if self.__local.depth or not getattr(self.__local, "pending", False):
+            return
+        self.__local.pending = False
+        if commit:
+            self.save()
+        else:
+            self.rollback()
+
+    def rollback(self):
+        """discards the changes made since the last save()"""
+        self.__local.changes = []
+        self.__objects.clear()
+        self.__keys.clear()
+        self.__tombstones.clear()
+        for indexes in self.__indexes.values():
+            for index in indexes:
+                index.clear()
+        self.reload()
+
     def delete(self, obj=None):
-        """delete obj from __objects if it’s inside"""
+        """delete obj from __objects if it’s inside, leaving a Tombstone
+        in its place"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
             if key in self.__objects:
                 del self.__objects[key]
+                self.__track(obj, "delete")
+                name = obj.__class__.__name__
+                self.__tombstones.setdefault(name, {})[obj.id] = \
+                    Tombstone(id=obj.id, class_name=name)
+            self.__keys.get(obj.__class__.__name__, set()).discard(key)
+            for index in self.__indexes.get(obj.__class__.__name__, ()):
+                index.remove(key)
+
+    def deleted(self, cls, since):
+        """returns the tombstones of the objects of cls deleted after
+        since, oldest deletion first"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        return sorted((obj for obj in
+                       self.__tombstones.get(name, {}).values()
+                       if obj.updated_at > since),
+                      key=lambda obj: (obj.updated_at, obj.id))
+
+    def __resolve(self, name, filters):
+        """returns filters with the ones on an attribute of a parent class
+        replaced by a filter on the ids of the matching parents"""
+        derived = parents.get(name, {})
+        resolved = {}
+        for attr, value in filters.items():
+            if attr in derived:
+                key, parent = derived[attr]
+                value = {obj.id for obj in self.__select(parent,
+                                                         {attr: value})}
+                attr = key
+            if attr in resolved:
+                known = resolved[attr]
+                value = (set(known) if is_many(known) else {known}) & \
+                    (set(value) if is_many(value) else {value})
+            resolved[attr] = value
+        return resolved
+
+    def __candidates(self, name, filters):
+        """returns the set of the keys of the objects of the class name that
+        may satisfy resolved filters, intersecting the lookups of the
+        indexes that cover them, or None if no index covers any filter"""
+        keys = None
+        for attr, value in filters.items():
+            if is_range(value):
+                index = self.__index(name, SortedIndex, attr)
+                if index is None or \
+                        not all(map(index.accepts, value.values())):
+                    continue
+                found = index.range(value)
+            elif attr == "id":
+                values = value if is_many(value) else [value]
+                found = {"{}.{}".format(name, id) for id in values}
+            elif is_many(value) and self.__index(name, BitsetIndex, attr):
+                found = self.__index(name, BitsetIndex, attr).lookup(value)
+            else:
+                index = self.__index(name, HashIndex, attr)
+                if index is None:
+                    continue
+                found = index.lookup(value if is_many(value) else [value])
+            keys = found if keys is None else keys & found
+        return keys
+
+    def __select(self, cls, filters):
+        """returns the objects of cls that satisfy filters, narrowing the
+        candidates down with the indexes when they cover a filter"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        filters = self.__resolve(name, filters or {})
+        keys = self.__candidates(name, filters)
+        if keys is None:
+            keys = self.__class_keys(name)
+        objs = []
+        for key in keys:
+            obj = self.__objects.get(key)
+            if obj is not None and match(obj, filters):
+                objs.append(obj)
+        return objs
+
+    def __index(self, name, kind, attr=None):
+        """returns the index of type kind of the class name, on attr if
+        given, or None"""
+        for index in self.__indexes.get(name, ()):
+            if isinstance(index, kind) and (attr is None or
+                                            index.attr == attr):
+                return index
+
+    def query(self, cls, filters=None, order_by=None, limit=None,
+              after=None):
+        """returns the objects of cls that satisfy filters
+
+        They are ordered by the order_by attribute, descending if it is
+        prefixed with -, then by id. Only the objects that come after the
+        object whose id is after are returned, and at most limit of them.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        attr, descending = parse_order(order_by)
+        key = sort_key(attr)
+        last = None
+        if after is not None:
+            last = self.get(name, after)
+            if last is None:
+                raise ValueError("Unknown after")
+        index = self.__index(name, SortedIndex, attr)
+        filters = self.__resolve(name, filters or {})
+        if limit is not None and index is not None and index.complete() \
+                and self.__candidates(name, filters) is None:
+            return self.__top(name, index, filters, limit, descending, last)
+        objs = self.__select(name, filters)
+        if last is not None:
+            bound = key(last)
+            objs = [obj for obj in objs
+                    if (key(obj) < bound if descending else key(obj) > bound)]
+        if limit is not None:
+            if descending:
+                return heapq.nlargest(limit, objs, key)
+            return heapq.nsmallest(limit, objs, key)
+        return sorted(objs, key=key, reverse=descending)
+
+    def __top(self, name, index, filters, limit, descending, last):
+        """returns the first limit objects of the class name that satisfy
+        resolved filters, read in the order of a sorted index"""
+        start = None
+        if last is not None:
+            start = (getattr(last, index.attr), "{}.{}".format(name,
+                                                               last.id))
+        objs = []
+        for key in index.ordered(descending, start):
+            obj = self.__objects.get(key)
+            if obj is not None and match(obj, filters):
+                objs.append(obj)
+                if len(objs) == limit:
+                    break
+        return objs
+
+    def nearby(self, lat, lng, radius_km, limit=None):
+        """returns (place, distance in km) pairs for the places within
+        radius_km of a point, nearest first and at most limit of them"""
+        index = self.__index("Place", GridIndex)
+        found = []
+        for key in index.within(*bounding_box(lat, lng, radius_km)):
+            obj = self.__objects.get(key)
+            if obj is None:
+                continue
+            distance = haversine(lat, lng, obj.latitude, obj.longitude)
+            if distance <= radius_km:
+                found.append((distance, obj.id, obj))
+        if limit is not None:
+            found = heapq.nsmallest(limit, found)
+        else:
+            found.sort()
+        return [(obj, distance) for distance, id, obj in found]
+
+    def similar(self, place, limit=None):
+        """returns (place, similarity) pairs for the other places sharing
+        amenities with place, by decreasing Jaccard similarity of their
+        amenities then id, and at most limit of them
+
+        The candidates come from the MinHash index and their similarities
+        are exact, but a place of low similarity may be missed."""
+        index = self.__index("Place", MinHashIndex)
+        found = []
+        for similarity, key in index.similar("Place." + place.id, place):
+            obj = self.__objects.get(key)
+            if obj is not None:
+                found.append((-similarity, obj.id, obj))
+        if limit is not None:
+            found = heapq.nsmallest(limit, found)
+        else:
+            found.sort()
+        return [(obj, -similarity) for similarity, id, obj in found]
+
+    def counts(self, cls, ids):
+        """returns {id: {counter: number}} for the objects of cls whose ids
+        are given, with the number of children of each kind in counted,
+        read from the sizes of the hash indexes on their foreign keys"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        found = {id: {} for id in ids}
+        for counter, (child, key) in counted.get(name, {}).items():
+            index = self.__index(child, HashIndex, key)
+            for id in found:
+                found[id][counter] = index.count([id])
+        return found
+
+    def linked(self, cls, attr, ids):
+        """returns {id: [linked ids]} for the objects of cls whose ids are
+        given, with the ids listed by their attribute attr"""
+        found = {}
+        for id in ids:
+            obj = self.get(cls, id)
+            found[id] = list(getattr(obj, attr, None) or ())
+        return found
+
+    def place_stats(self, city_ids):
+        """returns the number of places in the cities of city_ids, the
+        minimum, percentiles, maximum and average of their price_by_night,
+        the averages of their number_rooms and max_guest and the number of
+        their reviews
+
+        Everything but the reviews is read from the aggregates kept for
+        each city, so only the price percentiles of several cities need
+        their prices to be merged."""
+        city_ids = set(city_ids)
+        index = self.__index("Place", AggregateIndex, "city_id")
+        groups = [group for group in map(index.group, city_ids) if group]
+
+        def average(field):
+            """returns the average of field over the groups"""
+            size = sum(len(group["values"][field]) for group in groups)
+            if not size:
+                return None
+            return sum(group["sums"][field] for group in groups) / size
+
+        prices = [group["values"]["price_by_night"] for group in groups]
+        size = sum(len(values) for values in prices)
+        price = dict.fromkeys(["min"] + list(percentiles) + ["max", "avg"])
+        if size:
+            ranks = [0] + [rank(percent, size)
+                           for percent in percentiles.values()] + [size - 1]
+            price.update(zip(["min"] + list(percentiles) + ["max"],
+                             select_ranks(prices, ranks)))
+            price["avg"] = average("price_by_night")
+        places = self.__index("Place", HashIndex, "city_id").lookup(city_ids)
+        reviews = self.__index("Review", HashIndex, "place_id").count(
+            key[len("Place."):] for key in places)
+        return {"places": sum(group["count"] for group in groups),
+                "price_by_night": price,
+                "avg_rooms": average("number_rooms"),
+                "avg_guests": average("max_guest"),
+                "reviews": reviews}
+
+    def search(self, text, names=None, limit=None):
+        """returns (object, score) pairs for the objects whose searchable
+        text uses words of text, of the classes in names if given, best
+        first and at most limit of them"""
+        terms = tokenize(text)
+        found = []
+        for name in searchable:
+            if names is not None and name not in names:
+                continue
+            for index in self.__indexes[name]:
+                if not isinstance(index, TextIndex):
+                    continue
+                for score, key in index.search(terms, limit):
+                    obj = self.__objects.get(key)
+                    if obj is not None:
+                        found.append((score, key, obj))
+        found.sort(key=lambda item: (-item[0], item[1]))
+        return [(obj, score) for score, key, obj in found[:limit]]
+
+    def complete(self, cls, prefix, limit=None, attr="name"):
+        """returns the objects of cls whose attr starts with prefix,
+        ignoring case, in the order of attr and at most limit of them"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        index = self.__index(name, PrefixIndex, attr)
+        if index is None:
+            prefix = prefix.casefold()
+            objs = [obj for obj in self.all(name).values()
+                    if isinstance(getattr(obj, attr, None), str) and
+                    getattr(obj, attr).casefold().startswith(prefix)]
+            objs.sort(key=lambda obj: (getattr(obj, attr).casefold(),
+                                       obj.id))
+            return objs[:limit]
+        objs = []
+        for key in index.starting(prefix, limit):
+            obj = self.__objects.get(key)
+            if obj is not None:
+                objs.append(obj)
+        return objs
+
+    def __columns(self, name):
+        """returns the names of the attributes the class name would keep
+        in the columns of its table, leaving out the lists of linked ids"""
+        table = getattr(classes[name], "__table__", None)
+        if table is not None:
+            return set(table.columns.keys())
+        columns = {"id", "created_at", "updated_at"}
+        for base in classes[name].__mro__:
+            columns.update(attr for attr, value in vars(base).items()
+                           if not attr.startswith("_") and
+                           not callable(value) and
+                           not isinstance(value, (classmethod, property,
+                                                  staticmethod)))
+        return columns - set(links.get(name, {}))
+
+    def __check(self, name, filters, values=()):
+        """raises ValueError for an attribute of filters or values that
+        DBStorage would not find among the columns of the class name"""
+        columns = self.__columns(name)
+        derived = set(parents.get(name, {})) | set(links.get(name, {}))
+        for attr in filters or {}:
+            if attr not in columns and attr not in derived:
+                raise ValueError("Unknown attribute {}".format(attr))
+        for attr in values:
+            if attr not in columns:
+                raise ValueError("Unknown attribute {}".format(attr))
+
+    def update_where(self, cls, filters, values):
+        """sets values on every object of cls that satisfies filters in a
+        single pass and a single save, and returns how many were updated
+
+        Raises ValueError, as DBStorage does, if filters or values name an
+        attribute that is not a column of cls."""
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__check(name, filters, values)
+        objs = self.__select(cls, filters)
+        now = datetime.utcnow()
+        for obj in objs:
+            for key, value in values.items():
+                setattr(obj, key, value)
+            obj.updated_at = now
+            obj.version += 1
+            self.new(obj)
+        if objs:
+            self.save()
+        return len(objs)
+
+    def insert_many(self, cls, records):
+        """creates an object of cls from each record dictionary, saves them
+        all at once and returns how many were created
+
+        Passwords in the records are expected to be hashed already. Raises
+        ValueError, creating none of them, if a record has the id of an
+        existing object or of another record."""
+        cls = classes.get(cls, cls)
+        ids = set()
+        for record in records:
+            id = record.get("id")
+            if id is None:
+                continue
+            if id in ids or cls.__name__ + "." + id in self.__objects:
+                raise ValueError("Duplicate id {}".format(id))
+            ids.add(id)
+        count = 0
+        for record in records:
+            obj = cls(**{key: value for key, value in record.items()
+                         if key != "password"})
+            if "password" in record:
+                object.__setattr__(obj, "password", record["password"])
+            self.new(obj)
+            count += 1
+        self.save()
+        return count
+
+    def delete_where(self, cls, filters):
+        """deletes every object of cls that satisfies filters, along with
+        the objects that cascade from them, in a single pass and a single
+        save, and returns how many objects of cls were deleted
+
+        As in DBStorage, the children listed in children are deleted with
+        their parents and deleted amenities are unlinked from the places.
+        Raises ValueError if filters name an attribute that is not a column
+        of cls."""
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__check(name, filters)
+        objs = self.__select(cls, filters)
+        self.__delete_all(name, objs)
+        if objs:
+            self.save()
+        return len(objs)
+
+    def __delete_all(self, name, objs):
+        """deletes objs, of the class name, with the objects that cascade
+        from them"""
+        ids = [obj.id for obj in objs]
+        if not ids:
+            return
+        for child, key in children.get(name, []):
+            self.__delete_all(child, self.__select(child, {key: ids}))
+        for obj in objs:
+            self.delete(obj)
+        if name == "Amenity":
+            for id in ids:
+                for place in self.__select("Place", {"amenity_ids": [id]}):
+                    place.amenity_ids = [other for other in place.amenity_ids
+                                         if other != id]
+                    self.new(place)
 
     def get(self, cls, id):
         """Returns an object based on the class and its ID"""
-        objs = self.all(cls)
-        for obj in objs.values():
-            if id == obj.id:
-                return obj
-        return
+        if cls is None or id is None:
+            return
+        name = cls if isinstance(cls, str) else cls.__name__
+        return self.__objects.get("{}.{}".format(name, id))
 
     def count(self, cls=None):
         """Returns the number of objects in storage matching the given class.
@@ -80,5 +630,12 @@ class FileStorage:
         return len(objs)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
+        """call reload() method for deserializing the JSON file to objects
+
+        The reload is skipped when the file has the modification time and
+        size it had when it was last read or written and no change is
+        pending, as it would only rebuild the same objects and indexes."""
+        if self.__stat is not None and not self.pending() and \
+                self.__stat == self.__file_stat():
+            return
         self.reload()
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""
+Contains the distance helpers shared by the storage engines
+
+Points are (latitude, longitude) pairs in degrees and distances are great
+circle distances in kilometers.
+"""
+
+from math import asin, cos, degrees, radians, sin, sqrt
+
+# mean radius of the Earth in kilometers
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """returns the distance in km between two points"""
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    h = sin((lat2 - lat1) / 2) ** 2 + \
+        cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1, sqrt(h)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """returns the (min_lat, max_lat, min_lng, max_lng) box holding every
+    point within radius_km of a point, with the whole longitude range when
+    the circle reaches a pole or the antimeridian"""
+    angle = radius_km / EARTH_RADIUS_KM
+    min_lat, max_lat = lat - degrees(angle), lat + degrees(angle)
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), -180, 180
+    spread = sin(angle) / cos(radians(lat))
+    if spread >= 1:
+        return min_lat, max_lat, -180, 180
+    dlng = degrees(asin(spread))
+    if lng - dlng < -180 or lng + dlng > 180:
+        return min_lat, max_lat, -180, 180
+    return min_lat, max_lat, lng - dlng, lng + dlng
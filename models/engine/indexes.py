@@ -0,0 +1,782 @@
+#!/usr/bin/python3
+"""
+Contains the in-memory secondary indexes of FileStorage
+
+An index is kept up to date by FileStorage, which calls add() whenever an
+object is added or saved through new() and remove() when it is deleted.
+Lookups return the keys of the matching objects in FileStorage.__objects.
+
+BitsetIndex stores its rows in a NumPy array when NumPy is installed and
+falls back to one Python integer per row otherwise. TextIndex and
+select_ranks() use NumPy the same way.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from hashlib import blake2b
+import heapq
+from itertools import repeat
+from math import floor, log
+import random
+from models.engine.query import tokenize
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class HashIndex:
+    """maps each value of an attribute to the keys of the objects that
+    have it, to answer equality and membership filters"""
+
+    def __init__(self, attr):
+        """Instantiate a HashIndex object"""
+        self.attr = attr
+        self.__keys = {}
+        self.__values = {}
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous value"""
+        value = getattr(obj, self.attr, None)
+        if key in self.__values:
+            if self.__values[key] == value:
+                return
+            self.remove(key)
+        try:
+            self.__keys.setdefault(value, set()).add(key)
+        except TypeError:
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        keys = self.__keys[value]
+        keys.discard(key)
+        if not keys:
+            del self.__keys[value]
+
+    def clear(self):
+        """forgets every object"""
+        self.__keys.clear()
+        self.__values.clear()
+
+    def lookup(self, values):
+        """returns the set of the keys of the objects whose attribute is
+        one of values"""
+        keys = set()
+        for value in values:
+            keys.update(self.__keys.get(value, ()))
+        return keys
+
+    def count(self, values):
+        """returns the number of the objects whose attribute is one of
+        values"""
+        empty = ()
+        return sum(map(len, map(self.__keys.get, set(values),
+                                repeat(empty))))
+
+
+class Last:
+    """sorts after every key, to bisect past all the entries of a value"""
+
+    def __lt__(self, other):
+        """nothing is greater"""
+        return False
+
+    def __gt__(self, other):
+        """everything else is smaller"""
+        return True
+
+
+def is_number(value):
+    """returns True if value is a number, other than NaN"""
+    return isinstance(value, (int, float)) and value == value
+
+
+class SortedIndex:
+    """keeps the keys of the objects sorted by an attribute holding values
+    of some types, numbers by default, to answer range filters and to read
+    the objects in order"""
+
+    def __init__(self, attr, types=(int, float)):
+        """Instantiate a SortedIndex object"""
+        self.attr = attr
+        self.types = types
+        self.__entries = []
+        self.__values = {}
+        self.__others = set()
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous value"""
+        value = getattr(obj, self.attr, None)
+        if not self.accepts(value):
+            self.remove(key)
+            self.__others.add(key)
+            return
+        if key in self.__values and self.__values[key] == value:
+            return
+        self.remove(key)
+        insort(self.__entries, (value, key))
+        self.__values[key] = value
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        self.__others.discard(key)
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        del self.__entries[bisect_left(self.__entries, (value, key))]
+
+    def clear(self):
+        """forgets every object"""
+        self.__entries.clear()
+        self.__values.clear()
+        self.__others.clear()
+
+    def accepts(self, value):
+        """returns True if value is of the types kept by the index"""
+        return isinstance(value, self.types) and value == value
+
+    def complete(self):
+        """returns True if every object has a value of the types of the
+        index, so that it holds all of them"""
+        return not self.__others
+
+    def range(self, bounds):
+        """returns the set of the keys of the objects whose value satisfies
+        a dictionary of bounds such as {"gte": 10, "lt": 100}"""
+        low, high = 0, len(self.__entries)
+        for op, bound in bounds.items():
+            if op == "gt":
+                low = max(low, bisect_right(self.__entries, (bound, Last())))
+            elif op == "gte":
+                low = max(low, bisect_left(self.__entries, (bound,)))
+            elif op == "lt":
+                high = min(high, bisect_left(self.__entries, (bound,)))
+            elif op == "lte":
+                high = min(high,
+                           bisect_right(self.__entries, (bound, Last())))
+        return {key for value, key in self.__entries[low:high]}
+
+    def ordered(self, descending=False, start=None):
+        """yields the keys in the order of the values then of the keys,
+        from the one after the (value, key) entry start if given"""
+        if descending:
+            i = len(self.__entries) if start is None else \
+                bisect_left(self.__entries, start)
+            while i > 0:
+                i -= 1
+                yield self.__entries[i][1]
+        else:
+            i = 0 if start is None else bisect_right(self.__entries, start)
+            while i < len(self.__entries):
+                yield self.__entries[i][1]
+                i += 1
+
+
+class PrefixIndex:
+    """keeps the keys of the objects sorted by a text attribute, compared
+    without case, to find the objects whose value starts with a prefix"""
+
+    def __init__(self, attr):
+        """Instantiate a PrefixIndex object"""
+        self.attr = attr
+        self.__entries = []
+        self.__values = {}
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous value"""
+        value = getattr(obj, self.attr, None)
+        if not isinstance(value, str):
+            self.remove(key)
+            return
+        value = value.casefold()
+        if key in self.__values and self.__values[key] == value:
+            return
+        self.remove(key)
+        insort(self.__entries, (value, key))
+        self.__values[key] = value
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        del self.__entries[bisect_left(self.__entries, (value, key))]
+
+    def clear(self):
+        """forgets every object"""
+        self.__entries.clear()
+        self.__values.clear()
+
+    def starting(self, prefix, limit=None):
+        """returns the keys of the objects whose value starts with prefix,
+        in the order of the values, at most limit of them"""
+        prefix = prefix.casefold()
+        keys = []
+        i = bisect_left(self.__entries, (prefix,))
+        while i < len(self.__entries) and (limit is None or
+                                           len(keys) < limit):
+            value, key = self.__entries[i]
+            if not value.startswith(prefix):
+                break
+            keys.append(key)
+            i += 1
+        return keys
+
+
+class GridIndex:
+    """buckets objects by latitude and longitude into square cells of
+    cell_size degrees, to answer bounding box queries"""
+
+    def __init__(self, lat_attr="latitude", lng_attr="longitude",
+                 cell_size=0.5):
+        """Instantiate a GridIndex object"""
+        self.lat_attr = lat_attr
+        self.lng_attr = lng_attr
+        self.cell_size = cell_size
+        self.__keys = {}
+        self.__cells = {}
+
+    def __cell(self, lat, lng):
+        """returns the cell holding a point"""
+        return (floor(lat / self.cell_size), floor(lng / self.cell_size))
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous position"""
+        lat = getattr(obj, self.lat_attr, None)
+        lng = getattr(obj, self.lng_attr, None)
+        try:
+            cell = self.__cell(lat, lng)
+        except (TypeError, ValueError, OverflowError):
+            self.remove(key)
+            return
+        if self.__cells.get(key) == cell:
+            return
+        self.remove(key)
+        self.__keys.setdefault(cell, set()).add(key)
+        self.__cells[key] = cell
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__cells:
+            return
+        cell = self.__cells.pop(key)
+        keys = self.__keys[cell]
+        keys.discard(key)
+        if not keys:
+            del self.__keys[cell]
+
+    def clear(self):
+        """forgets every object"""
+        self.__keys.clear()
+        self.__cells.clear()
+
+    def within(self, min_lat, max_lat, min_lng, max_lng):
+        """returns the set of the keys of the objects in the cells that
+        overlap a box, a superset of the objects inside it"""
+        low_lat, low_lng = self.__cell(min_lat, min_lng)
+        high_lat, high_lng = self.__cell(max_lat, max_lng)
+        keys = set()
+        if (high_lat - low_lat + 1) * (high_lng - low_lng + 1) > \
+                len(self.__keys):
+            for (i, j), found in self.__keys.items():
+                if low_lat <= i <= high_lat and low_lng <= j <= high_lng:
+                    keys.update(found)
+            return keys
+        for i in range(low_lat, high_lat + 1):
+            for j in range(low_lng, high_lng + 1):
+                keys.update(self.__keys.get((i, j), ()))
+        return keys
+
+
+class BitsetIndex:
+    """keeps one row of bits per object, with one bit for each id held in
+    a list attribute, to find the objects holding all of some ids at once
+
+    An id keeps the bit it was given first, even after every object
+    holding it is removed.
+    """
+
+    def __init__(self, attr):
+        """Instantiate a BitsetIndex object"""
+        self.attr = attr
+        self.__bits = {}
+        self.__rows = {}
+        self.__held = {}
+        self.__keys = []
+        self.__free = []
+        if numpy is None:
+            self.__masks = []
+        else:
+            self.__masks = numpy.zeros((0, 1), dtype=numpy.uint64)
+
+    def __words(self, mask, count):
+        """returns mask split into count 64 bit words"""
+        return numpy.array([(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF
+                            for i in range(count)], dtype=numpy.uint64)
+
+    def __set(self, row, mask):
+        """stores the bits of mask in row"""
+        if numpy is None:
+            self.__masks[row] = mask
+            return
+        count = max(1, (mask.bit_length() + 63) // 64)
+        rows, words = self.__masks.shape
+        if count > words:
+            wider = numpy.zeros((rows, count), dtype=numpy.uint64)
+            wider[:, :words] = self.__masks
+            self.__masks = wider
+            words = count
+        self.__masks[row] = self.__words(mask, words)
+
+    def __row(self, key):
+        """returns a free row for key"""
+        if self.__free:
+            row = self.__free.pop()
+        else:
+            row = len(self.__keys)
+            self.__keys.append(None)
+            if numpy is None:
+                self.__masks.append(0)
+            elif row >= self.__masks.shape[0]:
+                grown = numpy.zeros((max(16, 2 * row),
+                                     self.__masks.shape[1]),
+                                    dtype=numpy.uint64)
+                grown[:row] = self.__masks
+                self.__masks = grown
+        self.__keys[row] = key
+        self.__rows[key] = row
+        return row
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous ids"""
+        try:
+            held = frozenset(getattr(obj, self.attr, None) or ())
+        except TypeError:
+            self.remove(key)
+            return
+        if key in self.__held and self.__held[key] == held:
+            return
+        row = self.__rows[key] if key in self.__rows else self.__row(key)
+        mask = 0
+        for value in held:
+            if value not in self.__bits:
+                self.__bits[value] = len(self.__bits)
+            mask |= 1 << self.__bits[value]
+        self.__held[key] = held
+        self.__set(row, mask)
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__rows:
+            return
+        row = self.__rows.pop(key)
+        del self.__held[key]
+        self.__set(row, 0)
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def clear(self):
+        """forgets every object"""
+        self.__rows.clear()
+        self.__held.clear()
+        self.__keys.clear()
+        self.__free.clear()
+        if numpy is None:
+            self.__masks.clear()
+        else:
+            self.__masks = numpy.zeros((0, self.__masks.shape[1]),
+                                       dtype=numpy.uint64)
+
+    def lookup(self, values):
+        """returns the set of the keys of the objects holding every one of
+        values"""
+        mask = 0
+        for value in values:
+            if value not in self.__bits:
+                return set()
+            mask |= 1 << self.__bits[value]
+        if numpy is None:
+            rows = [row for row, bits in enumerate(self.__masks)
+                    if bits & mask == mask]
+        else:
+            used = self.__masks[:len(self.__keys)]
+            words = self.__words(mask, used.shape[1])
+            columns = numpy.flatnonzero(words)
+            if len(columns):
+                used = used[:, columns] & words[columns]
+                rows = numpy.flatnonzero((used == words[columns]).
+                                         all(axis=1))
+            else:
+                rows = range(len(self.__keys))
+        return {self.__keys[row] for row in rows
+                if self.__keys[row] is not None}
+
+
+class TextIndex:
+    """maps each word of a text attribute to the rows of the objects using
+    it and how many times, to rank the objects matching some words with
+    BM25
+
+    Each object gets a row, reused once it is removed. The postings of a
+    word are two columns, the rows and the counts, kept as NumPy arrays
+    so a search scores every posting of its words at once.
+    """
+
+    # BM25 term frequency saturation and length normalization
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, attr):
+        """Instantiate a TextIndex object"""
+        self.attr = attr
+        self.__texts = {}
+        self.__rows = {}
+        self.__keys = []
+        self.__free = []
+        self.__postings = {}
+        self.__total = 0
+        if numpy is None:
+            self.__lengths = []
+        else:
+            self.__lengths = numpy.zeros(0)
+
+    def __row(self, key, length):
+        """returns a free row for key, with the number of words of its
+        text"""
+        if self.__free:
+            row = self.__free.pop()
+        else:
+            row = len(self.__keys)
+            self.__keys.append(None)
+            if numpy is None:
+                self.__lengths.append(0)
+            elif row >= len(self.__lengths):
+                grown = numpy.zeros(max(16, 2 * row))
+                grown[:row] = self.__lengths
+                self.__lengths = grown
+        self.__keys[row] = key
+        self.__rows[key] = row
+        self.__lengths[row] = length
+        return row
+
+    def __append(self, posting, row, count):
+        """adds a row using a word count times to its postings"""
+        rows, counts, size = posting
+        if numpy is None:
+            rows.append(row)
+            counts.append(count)
+        else:
+            if size == len(rows):
+                posting[0] = numpy.zeros(max(4, 2 * size), dtype=numpy.int64)
+                posting[0][:size] = rows
+                posting[1] = numpy.zeros(max(4, 2 * size))
+                posting[1][:size] = counts
+            posting[0][size] = row
+            posting[1][size] = count
+        posting[2] = size + 1
+
+    def __discard(self, posting, row):
+        """removes a row from the postings of a word, moving the last
+        posting to its place"""
+        rows, counts, size = posting
+        if numpy is None:
+            i = rows.index(row)
+        else:
+            i = int(numpy.flatnonzero(rows[:size] == row)[0])
+        size -= 1
+        rows[i], counts[i] = rows[size], counts[size]
+        if numpy is None:
+            rows.pop()
+            counts.pop()
+        posting[2] = size
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous text"""
+        text = getattr(obj, self.attr, None)
+        if key in self.__texts and self.__texts[key] == text:
+            return
+        self.remove(key)
+        if not isinstance(text, str):
+            return
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        row = self.__row(key, length)
+        for term, count in counts.items():
+            if term not in self.__postings:
+                if numpy is None:
+                    self.__postings[term] = [[], [], 0]
+                else:
+                    self.__postings[term] = [numpy.zeros(0, numpy.int64),
+                                             numpy.zeros(0), 0]
+            self.__append(self.__postings[term], row, count)
+        self.__total += length
+        self.__texts[key] = text
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__texts:
+            return
+        row = self.__rows.pop(key)
+        for term in set(tokenize(self.__texts.pop(key))):
+            posting = self.__postings[term]
+            self.__discard(posting, row)
+            if not posting[2]:
+                del self.__postings[term]
+        self.__total -= self.__lengths[row]
+        self.__keys[row] = None
+        self.__free.append(row)
+
+    def clear(self):
+        """forgets every object"""
+        self.__texts.clear()
+        self.__rows.clear()
+        self.__keys.clear()
+        self.__free.clear()
+        self.__postings.clear()
+        self.__total = 0
+        if numpy is None:
+            self.__lengths.clear()
+        else:
+            self.__lengths = numpy.zeros(0)
+
+    def search(self, terms, limit=None):
+        """returns the (score, key) pairs of the objects using any of
+        terms, best first and at most limit of them"""
+        count = len(self.__rows)
+        if not count:
+            return []
+        average = self.__total / count or 1
+        idfs = {}
+        for term in set(terms):
+            if term in self.__postings:
+                size = self.__postings[term][2]
+                idfs[term] = log(1 + (count - size + 0.5) / (size + 0.5))
+        if numpy is None:
+            scores = {}
+            for term, idf in idfs.items():
+                rows, counts, size = self.__postings[term]
+                for row, frequency in zip(rows, counts):
+                    norm = 1 - self.b + self.b * self.__lengths[row] / average
+                    scores[row] = scores.get(row, 0) + idf * frequency * \
+                        (self.k1 + 1) / (frequency + self.k1 * norm)
+            found = [(-score, self.__keys[row])
+                     for row, score in scores.items()]
+        else:
+            parts = []
+            for term, idf in idfs.items():
+                rows, counts, size = self.__postings[term]
+                rows, counts = rows[:size], counts[:size]
+                norm = 1 - self.b + self.b * self.__lengths[rows] / average
+                parts.append((rows, idf * counts * (self.k1 + 1) /
+                              (counts + self.k1 * norm)))
+            if sum(len(rows) for rows, weights in parts) * 8 < \
+                    len(self.__keys):
+                # few postings: sum them without touching every row
+                rows, inverse = numpy.unique(numpy.concatenate(
+                    [rows for rows, weights in parts] + [[]]).astype(
+                        numpy.int64), return_inverse=True)
+                scores = numpy.bincount(inverse, numpy.concatenate(
+                    [weights for rows, weights in parts] + [[]]))
+            else:
+                scores = numpy.zeros(len(self.__keys))
+                for rows, weights in parts:
+                    scores[rows] += weights
+                rows = numpy.flatnonzero(scores)
+                scores = scores[rows]
+            if limit is not None and len(rows) > limit:
+                lowest = -numpy.partition(-scores, limit - 1)[limit - 1]
+                rows, scores = rows[scores >= lowest], scores[scores >= lowest]
+            found = [(-float(score), self.__keys[row])
+                     for row, score in zip(rows, scores)]
+        if limit is not None:
+            return [(-score, key) for score, key in
+                    heapq.nsmallest(limit, found)]
+        return [(-score, key) for score, key in sorted(found)]
+
+
+class MinHashIndex:
+    """keeps a MinHash signature of the ids held in a list attribute of
+    each object, split into bands hashed into buckets, to find the objects
+    holding similar ids without comparing against every object
+
+    Two objects whose sets of ids have a Jaccard similarity of s share a
+    bucket with probability 1 - (1 - s ** rows) ** bands. The candidates
+    are then checked against their exact sets, so none is reported with a
+    wrong similarity, but a similar object may be missed.
+    """
+
+    # modulus of the hash functions, a Mersenne prime above 2 ** 60
+    prime = (1 << 61) - 1
+
+    def __init__(self, attr, bands=32, rows=3, seed=1):
+        """Instantiate a MinHashIndex object"""
+        self.attr = attr
+        self.bands = bands
+        self.rows = rows
+        draw = random.Random(seed)
+        self.__functions = [(draw.randrange(1, self.prime),
+                             draw.randrange(self.prime))
+                            for i in range(bands * rows)]
+        self.__hashes = {}
+        self.__held = {}
+        self.__buckets = {}
+        self.__signatures = {}
+
+    def __hash(self, value):
+        """returns the hashes of value, the same in every process"""
+        if value not in self.__hashes:
+            x = int.from_bytes(blake2b(str(value).encode(),
+                                       digest_size=8).digest(), "big")
+            self.__hashes[value] = [(a * x + b) % self.prime
+                                    for a, b in self.__functions]
+        return self.__hashes[value]
+
+    def __bands(self, held):
+        """returns the bucket of each band of the signature of held"""
+        signature = [min(column) for column in
+                     zip(*[self.__hash(value) for value in held])]
+        return [(band, tuple(signature[band * self.rows:
+                                       (band + 1) * self.rows]))
+                for band in range(self.bands)]
+
+    def __read(self, obj):
+        """returns the set of the ids held by obj, or None if it has none"""
+        try:
+            return frozenset(getattr(obj, self.attr, None) or ()) or None
+        except TypeError:
+            return None
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous ids"""
+        held = self.__read(obj)
+        if key in self.__held and self.__held[key] == held:
+            return
+        self.remove(key)
+        if held is None:
+            return
+        self.__held[key] = held
+        self.__signatures[key] = self.__bands(held)
+        for bucket in self.__signatures[key]:
+            self.__buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__held:
+            return
+        del self.__held[key]
+        for bucket in self.__signatures.pop(key):
+            keys = self.__buckets[bucket]
+            keys.discard(key)
+            if not keys:
+                del self.__buckets[bucket]
+
+    def clear(self):
+        """forgets every object"""
+        self.__held.clear()
+        self.__buckets.clear()
+        self.__signatures.clear()
+
+    def similar(self, key, obj):
+        """returns (similarity, key) pairs for the other objects sharing a
+        bucket with obj, stored under key, with the exact Jaccard
+        similarity of their ids"""
+        held = self.__read(obj)
+        if held is None:
+            return []
+        if self.__held.get(key) == held:
+            buckets = self.__signatures[key]
+        else:
+            buckets = self.__bands(held)
+        candidates = set()
+        for bucket in buckets:
+            candidates.update(self.__buckets.get(bucket, ()))
+        candidates.discard(key)
+        found = []
+        for other in candidates:
+            shared = len(held & self.__held[other])
+            found.append((shared / (len(held) + len(self.__held[other]) -
+                                    shared), other))
+        return found
+
+
+class AggregateIndex:
+    """keeps, for each value of a grouping attribute, the number of objects
+    and the sorted values and sum of some numeric attributes, to summarize
+    a group without reading its objects"""
+
+    def __init__(self, attr, fields):
+        """Instantiate an AggregateIndex object"""
+        self.attr = attr
+        self.fields = fields
+        self.__groups = {}
+        self.__entries = {}
+
+    def add(self, key, obj):
+        """indexes obj under key, replacing its previous values"""
+        entry = (getattr(obj, self.attr, None),
+                 tuple(getattr(obj, field, None) for field in self.fields))
+        if self.__entries.get(key) == entry:
+            return
+        self.remove(key)
+        try:
+            group = self.__groups.setdefault(entry[0], {
+                "count": 0,
+                "sums": {field: 0 for field in self.fields},
+                "values": {field: [] for field in self.fields}})
+        except TypeError:
+            return
+        group["count"] += 1
+        for field, value in zip(self.fields, entry[1]):
+            if is_number(value):
+                insort(group["values"][field], value)
+                group["sums"][field] += value
+        self.__entries[key] = entry
+
+    def remove(self, key):
+        """forgets the object stored under key"""
+        if key not in self.__entries:
+            return
+        value, values = self.__entries.pop(key)
+        group = self.__groups[value]
+        group["count"] -= 1
+        if not group["count"]:
+            del self.__groups[value]
+            return
+        for field, value in zip(self.fields, values):
+            if is_number(value):
+                held = group["values"][field]
+                del held[bisect_left(held, value)]
+                group["sums"][field] -= value
+
+    def clear(self):
+        """forgets every object"""
+        self.__groups.clear()
+        self.__entries.clear()
+
+    def group(self, value):
+        """returns the summary of the objects whose attribute is value, a
+        dictionary of their count and of the sorted values and the sum of
+        each field, or None if there is none; it must not be modified"""
+        try:
+            return self.__groups.get(value)
+        except TypeError:
+            return None
+
+
+def select_ranks(lists, ranks):
+    """returns the values at the positions ranks of the merge of sorted
+    lists, partitioning them at once with NumPy when it is installed"""
+    lists = [values for values in lists if values]
+    if len(lists) == 1:
+        return [lists[0][i] for i in ranks]
+    if numpy is None:
+        merged = list(heapq.merge(*lists))
+        return [merged[i] for i in ranks]
+    merged = numpy.partition(numpy.concatenate(lists), list(ranks))
+    return [merged[i].item() for i in ranks]
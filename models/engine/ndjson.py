@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+"""
+Streams the objects of a storage to and from newline delimited JSON
+
+Each line holds the dictionary of one object, with its __class__.
+Classes are exported parents first, so that an export can be imported
+into an empty storage of either type:
+
+    python3 -m models.engine.ndjson export dump.ndjson [<class name> ...]
+    python3 -m models.engine.ndjson import dump.ndjson
+"""
+
+import json
+import models
+from models.base_model import BaseModel
+import sys
+from time import perf_counter
+
+# parents before the children that reference them
+order = ["BaseModel", "State", "City", "User", "Amenity", "Place", "Review"]
+
+# attributes a record must have, as the POST routes of the API require
+required = {"State": ["name"], "City": ["state_id", "name"],
+            "Amenity": ["name"], "User": ["email", "password"],
+            "Place": ["city_id", "user_id", "name"],
+            "Review": ["place_id", "user_id", "text"]}
+
+
+def record(obj):
+    """returns the dictionary exported for obj
+
+    Unlike to_dict(), it keeps the password hash, replaces the amenities
+    of a place by their ids and leaves out the relationships."""
+    data = obj.to_dict()
+    for key, value in list(data.items()):
+        if isinstance(value, BaseModel) or (isinstance(value, list) and any(
+                isinstance(item, BaseModel) for item in value)):
+            del data[key]
+    if "password" not in data and getattr(obj, "password", None):
+        data["password"] = obj.password
+    if models.storage_t == "db" and data["__class__"] == "Place":
+        data["amenity_ids"] = [amenity.id for amenity in obj.amenities]
+    return data
+
+
+def dump(stream, classes=None, storage=None):
+    """writes the objects of the given class names (all of them by
+    default) to stream, one per line, and returns how many were written"""
+    if storage is None:
+        storage = models.storage
+    count = 0
+    for name in order:
+        if classes and name not in classes:
+            continue
+        for batch in storage.iter(name):
+            stream.write("".join(json.dumps(record(obj)) + "\n"
+                                 for obj in batch))
+            count += len(batch)
+    return count
+
+
+def validate(data, known):
+    """returns why the record data can't be imported, or None"""
+    if type(data) is not dict or data.get("__class__") not in known:
+        return "Unknown class"
+    for name in required.get(data["__class__"], []):
+        if name not in data:
+            return "Missing " + name
+
+
+def insert(storage, batch, numbers):
+    """inserts the records of batch, read from the lines numbers, and
+    returns how many were inserted and the (line number, reason) pairs of
+    the records the storage rejected
+
+    A batch the storage rejects, as it does a duplicate id, is inserted
+    again one record at a time to tell which lines were rejected."""
+    name = batch[0]["__class__"]
+    try:
+        return storage.insert_many(name, batch), []
+    except ValueError as error:
+        if len(batch) == 1:
+            return 0, [(numbers[0], str(error))]
+    count = 0
+    rejected = []
+    for data, number in zip(batch, numbers):
+        inserted, errors = insert(storage, [data], [number])
+        count += inserted
+        rejected += errors
+    return count, rejected
+
+
+def load(stream, batch_size=1000, storage=None, max_errors=None):
+    """reads objects from stream and inserts them batch_size at a time
+
+    stream can yield str or bytes lines, and is read one line at a time.
+    Each batch is saved on its own, so that neither the objects nor the
+    changes tracked by the storage pile up until the end of the stream.
+    Returns the number of objects inserted, the number of lines skipped
+    and the (line number, reason) pairs of the first max_errors of them."""
+    if storage is None:
+        storage = models.storage
+    known = [name for name in order
+             if models.storage_t != "db" or name != "BaseModel"]
+    count = 0
+    skipped = 0
+    errors = []
+    batch = []
+    numbers = []
+
+    def report(rejected):
+        """counts and notes the (line number, reason) pairs of rejected"""
+        nonlocal skipped
+        skipped += len(rejected)
+        if max_errors is not None:
+            rejected = rejected[:max(0, max_errors - len(errors))]
+        errors.extend(rejected)
+
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+            reason = "Not a JSON"
+        else:
+            reason = validate(data, known)
+        if reason is not None:
+            report([(number, reason)])
+            continue
+        if batch and (len(batch) >= batch_size or
+                      batch[0]["__class__"] != data["__class__"]):
+            inserted, rejected = insert(storage, batch, numbers)
+            count += inserted
+            report(rejected)
+            batch = []
+            numbers = []
+        batch.append(data)
+        numbers.append(number)
+    if batch:
+        inserted, rejected = insert(storage, batch, numbers)
+        count += inserted
+        report(rejected)
+    return count, skipped, errors
+
+
+def report(action, count, seconds):
+    """returns a one line summary of an export or an import"""
+    rate = count / seconds if seconds > 0 else count
+    return "{} {} objects in {:.2f}s ({:.0f} objects/s)".format(
+        action, count, seconds, rate)
+
+
+def main(argv):
+    """runs the export or import command described by argv"""
+    if len(argv) < 2 or argv[0] not in ("export", "import"):
+        print("Usage: python3 -m models.engine.ndjson export <file> "
+              "[<class name> ...]\n"
+              "       python3 -m models.engine.ndjson import <file>",
+              file=sys.stderr)
+        return 2
+    start = perf_counter()
+    if argv[0] == "export":
+        if argv[1] == "-":
+            count = dump(sys.stdout, argv[2:])
+        else:
+            with open(argv[1], "w") as f:
+                count = dump(f, argv[2:])
+        print(report("Exported", count, perf_counter() - start),
+              file=sys.stderr)
+        return 0
+    if argv[1] == "-":
+        count, skipped, errors = load(sys.stdin)
+    else:
+        with open(argv[1], "r") as f:
+            count, skipped, errors = load(f)
+    for number, reason in errors:
+        print("line {}: {}".format(number, reason), file=sys.stderr)
+    print(report("Imported", count, perf_counter() - start), file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Contains the filter helpers shared by the storage engines
+
+A filter is a dictionary mapping an attribute name to the value it must
+equal, to a list, tuple or set of the values it may take, or to a
+dictionary of bounds such as {"gte": 10, "lt": 100}. An attribute holding
+a list of ids, such as Place.amenity_ids, is filtered by a list of the ids
+it must all hold.
+"""
+
+from math import ceil
+import operator
+import re
+
+# filters on an attribute of a parent class, resolved through the foreign
+# key that points to the parent: {class: {attribute: (foreign key, parent)}}
+parents = {
+    "Place": {"state_id": ("city_id", "City")},
+    "Review": {"city_id": ("place_id", "Place"),
+               "state_id": ("place_id", "Place")},
+}
+
+# children deleted along with their parent, as the ORM cascades do
+children = {
+    "State": [("City", "state_id")],
+    "City": [("Place", "city_id")],
+    "Place": [("Review", "place_id")],
+}
+
+# children counted for each parent, through the foreign key pointing to
+# it: {class: {counter: (child class, foreign key)}}
+counted = {
+    "City": {"places": ("Place", "city_id")},
+    "Place": {"reviews": ("Review", "place_id")},
+    "State": {"cities": ("City", "state_id")},
+    "User": {"places": ("Place", "user_id"), "reviews": ("Review", "user_id")},
+}
+
+# attributes listing the ids of linked objects, stored in the database as
+# rows of a link table: {class: {attribute: (table, key, linked key)}}
+links = {
+    "Place": {"amenity_ids": ("place_amenity", "place_id", "amenity_id")},
+}
+
+# text attributes of each class that can be searched for words
+searchable = {"Place": ["description"], "Review": ["text"]}
+
+# text attributes of each class that can be completed from a prefix
+completable = {"Amenity": ["name"], "City": ["name"], "State": ["name"]}
+
+# percentiles reported by the place statistics: {name: percent}
+percentiles = {"p25": 25, "p50": 50, "p75": 75, "p90": 90}
+
+# comparison operators allowed in a bounds dictionary
+bounds = {"lt": operator.lt, "lte": operator.le,
+          "gt": operator.gt, "gte": operator.ge}
+
+
+def is_many(value):
+    """returns True if a filter value lists several allowed values"""
+    return isinstance(value, (list, tuple, set, frozenset))
+
+
+def is_range(value):
+    """returns True if a filter value is a dictionary of bounds, and
+    raises ValueError if it holds an unknown operator"""
+    if not isinstance(value, dict):
+        return False
+    for name in value:
+        if name not in bounds:
+            raise ValueError("Unknown operator {}".format(name))
+    return True
+
+
+def match(obj, filters):
+    """returns True if obj satisfies every filter"""
+    for name, value in filters.items():
+        current = getattr(obj, name, None)
+        if isinstance(current, list) and is_many(value):
+            if not set(value) <= set(current):
+                return False
+        elif is_many(value):
+            if current not in value:
+                return False
+        elif is_range(value):
+            if current is None:
+                return False
+            try:
+                for op, bound in value.items():
+                    if not bounds[op](current, bound):
+                        return False
+            except TypeError:
+                return False
+        elif current != value:
+            return False
+    return True
+
+
+def tokenize(text):
+    """returns the lowercase words of text"""
+    if not isinstance(text, str):
+        return []
+    return re.findall(r"\w+", text.lower())
+
+
+def rank(percent, count):
+    """returns the position of the nearest rank percentile in count sorted
+    values"""
+    return max(0, ceil(percent * count / 100) - 1)
+
+
+def parse_order(order_by):
+    """returns the attribute and the direction of an order_by argument
+    such as "name" or "-price_by_night" (descending)"""
+    if not order_by:
+        return "id", False
+    if order_by.startswith("-"):
+        return order_by[1:], True
+    return order_by, False
+
+
+def sort_key(attr):
+    """returns a sort key function ordering objects by attr then by id,
+    with missing values first as SQL orders NULL"""
+    def key(obj):
+        """returns the sort key of obj"""
+        value = getattr(obj, attr, None)
+        return (value is not None, value if value is not None else 0,
+                obj.id)
+    return key
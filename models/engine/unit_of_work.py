@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+"""
+Contains the unit_of_work context manager
+"""
+
+from contextlib import contextmanager
+import models
+
+
+@contextmanager
+def unit_of_work(storage=None):
+    """groups every storage.save() made inside the block into one save
+
+    The deferred save runs when the outermost block exits normally and
+    is rolled back if it exits with an exception. It can also be used as
+    a decorator: @unit_of_work()
+    """
+    if storage is None:
+        storage = models.storage
+    storage.begin()
+    try:
+        yield storage
+    except BaseException:
+        storage.end(commit=False)
+        raise
+    storage.end()
@@ -0,0 +1,30 @@
+#!/usr/bin/python
+""" holds class Tombstone"""
+import models
+from datetime import timedelta
+from models.base_model import BaseModel, Base
+from os import getenv
+import sqlalchemy
+from sqlalchemy import Column, String
+
+# how long the tombstones are kept before the storage engines prune them
+max_age = timedelta(days=int(getenv("HBNB_TOMBSTONE_DAYS", 30)))
+
+
+class Tombstone(BaseModel, Base):
+    """Representation of a deleted object, kept by the storage engines so
+    that the clients syncing a collection learn about the deletion
+
+    Its id is the id of the deleted object and its updated_at the time of
+    the deletion. Tombstones are not among the classes of the storage
+    engines: they are only read through their deleted() method, and
+    pruned once older than max_age."""
+    if models.storage_t == 'db':
+        __tablename__ = 'tombstones'
+        class_name = Column(String(60), nullable=False, index=True)
+    else:
+        class_name = ""
+
+    def __init__(self, *args, **kwargs):
+        """initializes Tombstone"""
+        super().__init__(*args, **kwargs)
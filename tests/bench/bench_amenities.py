@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Benchmark of the matching of the places holding every required amenity
+
+Compares the per-row loop places_search used to run, a set-based loop and
+the BitsetIndex of FileStorage, with and without NumPy, on generated
+places. It is not collected by the test runners; run it from the root of
+the repository with:
+
+    python3 -m tests.bench.bench_amenities [places]
+"""
+
+import random
+import sys
+import time
+from types import SimpleNamespace
+from unittest import mock
+from models.engine import indexes
+
+# number of amenities, amenities held by each place and amenities required
+AMENITIES = 60
+HELD = 8
+REQUIRED = 3
+# number of times each search is repeated
+REPEAT = 10
+
+
+def make_places(count, seed=0):
+    """returns count (key, place) pairs of places holding random
+    amenities, and the ids of the amenities"""
+    draw = random.Random(seed)
+    ids = ["amenity-{}".format(i) for i in range(AMENITIES)]
+    places = [("Place.{}".format(i),
+               SimpleNamespace(amenity_ids=draw.sample(ids, HELD)))
+              for i in range(count)]
+    return places, ids
+
+
+def timed(search):
+    """returns the result of search and its average duration in ms"""
+    start = time.perf_counter()
+    for i in range(REPEAT):
+        found = search()
+    return found, (time.perf_counter() - start) / REPEAT * 1000
+
+
+def per_row(places, required):
+    """checks each required amenity against the list of each place"""
+    return {key for key, place in places
+            if all(id in place.amenity_ids for id in required)}
+
+
+def set_based(places, required):
+    """checks the required amenities against the set of each place"""
+    required = set(required)
+    return {key for key, place in places
+            if required.issubset(place.amenity_ids)}
+
+
+def main(count=100000):
+    """prints the duration of each way of matching the amenities"""
+    places, ids = make_places(count)
+    required = ids[:REQUIRED]
+    print("{} places, {} of {} amenities each, {} required".format(
+        count, HELD, AMENITIES, REQUIRED))
+    expected, duration = timed(lambda: per_row(places, required))
+    print("{:<16} {:9.2f} ms  {} places".format("per-row loop", duration,
+                                                len(expected)))
+    found, duration = timed(lambda: set_based(places, required))
+    assert found == expected
+    print("{:<16} {:9.2f} ms".format("set-based loop", duration))
+    backends = [("bitset numpy", indexes.numpy), ("bitset int", None)]
+    for name, numpy in backends:
+        if name == "bitset numpy" and numpy is None:
+            print("{:<16} NumPy is not installed".format(name))
+            continue
+        with mock.patch.object(indexes, "numpy", numpy):
+            index = indexes.BitsetIndex("amenity_ids")
+            for key, place in places:
+                index.add(key, place)
+            found, duration = timed(lambda: index.lookup(required))
+        assert found == expected
+        print("{:<16} {:9.2f} ms".format(name, duration))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Benchmark of the similar places found through the MinHashIndex
+
+Measures the recall at 10 and the latency of the MinHashIndex FileStorage
+keeps on Place.amenity_ids against a brute force Jaccard ranking of every
+place, on generated places. It is not collected by the test runners; run
+it from the root of the repository with:
+
+    python3 -m tests.bench.bench_similar [places]
+"""
+
+import random
+import sys
+import time
+from types import SimpleNamespace
+from models.engine.indexes import MinHashIndex
+
+# number of amenities, and fewest and most amenities held by a place
+AMENITIES = 60
+FEWEST = 3
+MOST = 12
+# number of places queried and of neighbors ranked for each
+QUERIES = 200
+LIMIT = 10
+
+
+def make_places(count, seed=7):
+    """returns count (key, place) pairs of places holding random
+    amenities"""
+    draw = random.Random(seed)
+    ids = ["amenity-{}".format(i) for i in range(AMENITIES)]
+    return [("Place.{}".format(i), SimpleNamespace(
+        amenity_ids=draw.sample(ids, draw.randint(FEWEST, MOST))))
+        for i in range(count)]
+
+
+def brute_force(places, key, place):
+    """returns the (similarity, key) pairs of the LIMIT places most
+    similar to place, compared against every other place"""
+    held = set(place.amenity_ids)
+    found = []
+    for other_key, other in places:
+        if other_key == key:
+            continue
+        shared = len(held.intersection(other.amenity_ids))
+        found.append((shared / (len(held) + len(other.amenity_ids) -
+                                shared), other_key))
+    found.sort(key=lambda pair: (-pair[0], pair[1]))
+    return found[:LIMIT]
+
+
+def minhash(index, key, place):
+    """returns the (similarity, key) pairs of the LIMIT places most
+    similar to place among the candidates of the index"""
+    found = index.similar(key, place)
+    found.sort(key=lambda pair: (-pair[0], pair[1]))
+    return found[:LIMIT]
+
+
+def recall(exact, found):
+    """returns the number of the exact neighbors matched by found
+
+    Neighbors tied at the similarity of the last exact one are
+    interchangeable, so any place found at that similarity or above
+    counts."""
+    cut = exact[-1][0]
+    return min(len(exact), len([pair for pair in found if pair[0] >= cut]))
+
+
+def main(count=20000, bands=32, rows=3):
+    """prints the recall at LIMIT and the latency of the index"""
+    places = make_places(count)
+    start = time.perf_counter()
+    index = MinHashIndex("amenity_ids", bands=bands, rows=rows)
+    for key, place in places:
+        index.add(key, place)
+    print("{} places, MinHashIndex(bands={}, rows={}) built in {:.1f} s"
+          .format(count, bands, rows, time.perf_counter() - start))
+    queries = random.Random(1).sample(places, QUERIES)
+    hits = total = 0
+    exact_time = index_time = 0.0
+    for key, place in queries:
+        start = time.perf_counter()
+        exact = brute_force(places, key, place)
+        exact_time += time.perf_counter() - start
+        start = time.perf_counter()
+        found = minhash(index, key, place)
+        index_time += time.perf_counter() - start
+        hits += recall(exact, found)
+        total += len(exact)
+    print("recall@{} {:.3f}".format(LIMIT, hits / total))
+    print("brute force {:.2f} ms/query, minhash {:.2f} ms/query".format(
+        exact_time / QUERIES * 1000, index_time / QUERIES * 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
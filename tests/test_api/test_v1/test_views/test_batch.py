@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""
+Contains the TestBatchDocs and TestBatch classes
+"""
+
+from api.v1.app import app
+from api.v1.views import batch
+import inspect
+from models import storage
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the batch module"""
+    def test_pep8_conformance_batch(self):
+        """Test that api/v1/views/batch.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/batch.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_batch_docstrings(self):
+        """Test for the presence of docstrings in the batch module"""
+        self.assertTrue(len(batch.__doc__) >= 1)
+        for name, func in inspect.getmembers(batch, inspect.isfunction):
+            if func.__module__ == batch.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestBatch(unittest.TestCase):
+    """Test the POST /batch route"""
+    def setUp(self):
+        """Creates a test client"""
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Removes the states created by the tests"""
+        storage.close()
+        for state in storage.query(State, {"name": ["Batched", "Kept"]}):
+            storage.delete(state)
+        storage.save()
+        storage.close()
+
+    def post(self, operations, **options):
+        """Posts a batch and returns its response"""
+        options["operations"] = operations
+        return self.client.post("/api/v1/batch", json=options)
+
+    def names(self):
+        """Returns the names of the stored states created by the tests"""
+        storage.close()
+        return [state.name for state in
+                storage.query(State, {"name": ["Batched", "Kept"]})]
+
+    def test_operations(self):
+        """Test that each operation gets the response of its route"""
+        response = self.post([
+            {"method": "POST", "path": "/states", "body": {"name": "Kept"}},
+            {"method": "GET", "path": "status"}])
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual([result["status"] for result in results],
+                         [201, 200])
+        self.assertEqual(results[0]["body"]["name"], "Kept")
+        self.assertEqual(results[1]["body"], {"status": "OK"})
+        self.assertEqual(self.names(), ["Kept"])
+
+    def test_atomic_failure(self):
+        """Test that a failed atomic batch returns 409 and keeps nothing"""
+        response = self.post([
+            {"method": "POST", "path": "/states",
+             "body": {"name": "Batched"}},
+            {"method": "POST", "path": "/states", "body": {}},
+            {"method": "POST", "path": "/states",
+             "body": {"name": "Batched"}}], atomic=True)
+        self.assertEqual(response.status_code, 409)
+        results = response.get_json()["results"]
+        self.assertEqual([result["status"] for result in results],
+                         [201, 400])
+        self.assertEqual(self.names(), [])
+
+    def test_partial_success(self):
+        """Test that a batch that is not atomic keeps the operations that
+        succeeded"""
+        response = self.post([
+            {"method": "POST", "path": "/states",
+             "body": {"name": "Batched"}},
+            {"method": "GET", "path": "/states/missing"},
+            {"method": "POST", "path": "/states", "body": {"name": "Kept"}}])
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual([result["status"] for result in results],
+                         [201, 404, 201])
+        self.assertEqual(results[1]["body"], {"error": "Not found"})
+        self.assertEqual(sorted(self.names()), ["Batched", "Kept"])
+
+    def test_nested_batch(self):
+        """Test that a batch cannot run another batch"""
+        response = self.post([
+            {"method": "POST", "path": "/batch",
+             "body": {"operations": [
+                 {"method": "POST", "path": "/states",
+                  "body": {"name": "Batched"}}]}}])
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()["results"][0]
+        self.assertEqual(result["status"], 400)
+        self.assertEqual(result["body"], {"error": "Nested batch"})
+        self.assertEqual(self.names(), [])
+
+    def test_unknown_route_and_method(self):
+        """Test that each operation gets the 404 or 405 of its route"""
+        response = self.post([
+            {"method": "GET", "path": "/unknown"},
+            {"method": "PATCH", "path": "/states"},
+            {"method": "GET", "path": "/status"},
+            "not an operation"])
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual([result["status"] for result in results],
+                         [404, 405, 200, 400])
+
+    def test_max_operations(self):
+        """Test that a batch holds at most MAX_OPERATIONS operations"""
+        operation = {"method": "GET", "path": "/status"}
+        with mock.patch.object(batch, "MAX_OPERATIONS", 3):
+            response = self.post([operation] * 4)
+            self.assertEqual(response.status_code, 400)
+            response = self.post([operation] * 3)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_json()["results"]), 3)
+        self.assertEqual(batch.MAX_OPERATIONS, 1000)
+        response = self.post([operation] * 1001)
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_batch(self):
+        """Test that a batch without a list of operations gets 400"""
+        response = self.client.post("/api/v1/batch", data="not json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/v1/batch",
+                                    json={"operations": "GET /status"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+"""
+Contains the TestCachingDocs, TestResponseCache and TestConditionalRequests
+classes
+"""
+
+from api.v1.app import app
+from api.v1.views import caching
+import inspect
+from models import storage
+from models.engine.cache import LRUCache
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestCachingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the caching module"""
+    def test_pep8_conformance_caching(self):
+        """Test that api/v1/views/caching.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/caching.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_caching.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_caching_docstrings(self):
+        """Test for the presence of docstrings in the caching module"""
+        self.assertTrue(len(caching.__doc__) >= 1)
+        for name, func in inspect.getmembers(caching, inspect.isfunction):
+            if func.__module__ == caching.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the response cache of the read-only routes"""
+    def setUp(self):
+        """Enables the response cache and creates a state"""
+        patcher = mock.patch.object(caching, "responses", LRUCache(100))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+        self.state = State(name="Cached")
+        storage.new(self.state)
+        storage.save()
+
+    def tearDown(self):
+        """Removes the states created by the tests"""
+        names = ["Cached", "Ghost", "Fresh"]
+        for state in storage.query(State, {"name": names}):
+            storage.delete(state)
+        storage.save()
+        storage.close()
+
+    def names(self, states):
+        """Returns the names of the states of a list of dictionaries"""
+        return {state["name"] for state in states}
+
+    def test_hit(self):
+        """Test that a repeated GET is served from the cache"""
+        first = self.client.get("/api/v1/states")
+        second = self.client.get("/api/v1/states")
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(first.get_json(), second.get_json())
+
+    def test_invalidation(self):
+        """Test that a saved change invalidates the cached responses"""
+        self.client.get("/api/v1/states")
+        self.client.post("/api/v1/states", json={"name": "Fresh"})
+        response = self.client.get("/api/v1/states")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertIn("Fresh", self.names(response.get_json()))
+
+    def test_atomic_rollback(self):
+        """Test that a rolled back batch leaves nothing in the cache"""
+        response = self.client.post("/api/v1/batch", json={
+            "atomic": True,
+            "operations": [
+                {"method": "POST", "path": "/states",
+                 "body": {"name": "Ghost"}},
+                {"method": "GET", "path": "/states"},
+                {"method": "PUT", "path": "/states/nope",
+                 "body": {"name": "x"}}]})
+        self.assertEqual(response.status_code, 409)
+        response = self.client.get("/api/v1/states")
+        self.assertNotIn("Ghost", self.names(response.get_json()))
+        self.assertIn("Cached", self.names(response.get_json()))
+
+    def test_read_your_writes(self):
+        """Test that a batch reads the changes of its earlier operations"""
+        self.client.get("/api/v1/states")
+        response = self.client.post("/api/v1/batch", json=[
+            {"method": "POST", "path": "/states", "body": {"name": "Fresh"}},
+            {"method": "GET", "path": "/states"}])
+        results = response.get_json()["results"]
+        self.assertIn("Fresh", self.names(results[1]["body"]))
+        response = self.client.get("/api/v1/states")
+        self.assertIn("Fresh", self.names(response.get_json()))
+
+    def test_writes_of_other_processes(self):
+        """Test that a write the change log of this process does not see
+        still changes the collection ETag and misses the cache"""
+        with mock.patch.object(storage.changes, "version", return_value=0):
+            etag = self.client.get("/api/v1/states").headers["ETag"]
+            self.state.name = "Fresh"
+            self.state.save()
+            response = self.client.get("/api/v1/states",
+                                       headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertIn("Fresh", self.names(response.get_json()))
+
+
+class TestConditionalRequests(unittest.TestCase):
+    """Test the ETags, If-None-Match and If-Match headers"""
+    def setUp(self):
+        """Creates a state"""
+        self.client = app.test_client()
+        self.state = State(name="Tagged")
+        storage.new(self.state)
+        storage.save()
+        self.url = "/api/v1/states/" + self.state.id
+
+    def tearDown(self):
+        """Removes the state"""
+        state = storage.get(State, self.state.id)
+        if state is not None:
+            storage.delete(state)
+            storage.save()
+        storage.close()
+
+    def test_not_modified(self):
+        """Test that a current If-None-Match gets an empty 304"""
+        etag = self.client.get(self.url).headers["ETag"]
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_collection_not_modified(self):
+        """Test that a collection ETag changes with its class"""
+        etag = self.client.get("/api/v1/states").headers["ETag"]
+        response = self.client.get("/api/v1/states",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.client.put(self.url, json={"name": "Retagged"})
+        response = self.client.get("/api/v1/states",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_if_match(self):
+        """Test that a PUT or DELETE with a stale If-Match gets 412"""
+        etag = self.client.get(self.url).headers["ETag"]
+        self.client.put(self.url, json={"name": "First"})
+        response = self.client.put(self.url, json={"name": "Second"},
+                                   headers={"If-Match": etag})
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.url, headers={"If-Match": etag})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.get(self.url).get_json()["name"],
+                         "First")
+
+    def test_put_get_round_trip(self):
+        """Test that the ETag of a PUT matches the next GET and the next
+        If-Match"""
+        etag = self.client.get(self.url).headers["ETag"]
+        response = self.client.put(self.url, json={"name": "Once"},
+                                   headers={"If-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        put_etag = response.headers["ETag"]
+        self.assertNotEqual(put_etag, etag)
+        storage.close()
+        response = self.client.get(self.url)
+        self.assertEqual(response.headers["ETag"], put_etag)
+        response = self.client.put(self.url, json={"name": "Twice"},
+                                   headers={"If-Match": put_etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], put_etag)
+        response = self.client.delete(self.url, headers={"If-Match": "*"})
+        self.assertEqual(response.status_code, 200)
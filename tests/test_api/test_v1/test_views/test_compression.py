@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+"""
+Contains the TestCompressionDocs and TestCompression classes
+"""
+
+from api.v1.app import app
+from api.v1.views import caching, compression
+import gzip
+import inspect
+from models import storage
+from models.engine.cache import LRUCache
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestCompressionDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the compression
+    module"""
+    def test_pep8_conformance_compression(self):
+        """Test that api/v1/views/compression.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/compression.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_compression.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_compression_docstrings(self):
+        """Test for the presence of docstrings in the compression module"""
+        self.assertTrue(len(compression.__doc__) >= 1)
+        for name, func in inspect.getmembers(compression,
+                                             inspect.isfunction):
+            if func.__module__ == compression.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestCompression(unittest.TestCase):
+    """Test the negotiation and the compression of the responses"""
+    def setUp(self):
+        """Compresses every body, with a fake br encoder, and creates a
+        state"""
+        self.gzip = mock.Mock(side_effect=compression.encoders["gzip"])
+        self.br = mock.Mock(side_effect=lambda body: b"br:" + body)
+        patchers = [mock.patch.object(compression, "min_bytes", 0),
+                    mock.patch.dict(compression.encoders,
+                                    {"br": self.br, "gzip": self.gzip})]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+        self.state = State(name="Compressed")
+        storage.new(self.state)
+        storage.save()
+        self.url = "/api/v1/states/" + self.state.id
+
+    def tearDown(self):
+        """Removes the state"""
+        storage.delete(storage.get(State, self.state.id))
+        storage.save()
+        storage.close()
+
+    def get(self, encoding, **headers):
+        """Gets the state with an Accept-Encoding header"""
+        if encoding is not None:
+            headers["Accept-Encoding"] = encoding
+        return self.client.get(self.url, headers=headers)
+
+    def test_gzip(self):
+        """Test that a client accepting gzip gets a gzip body"""
+        plain = self.get(None)
+        self.assertNotIn("Content-Encoding", plain.headers)
+        response = self.get("gzip")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_br(self):
+        """Test that br is chosen when the client prefers it"""
+        response = self.get("gzip;q=0.5, br")
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertTrue(response.data.startswith(b"br:"))
+        response = self.get("br;q=0.5, gzip")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_refused_encodings(self):
+        """Test that encodings with q=0 and identity are not used"""
+        response = self.get("br;q=0, gzip")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        for encoding in ["br;q=0, gzip;q=0", "identity", "deflate"]:
+            response = self.get(encoding)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.get_json()["name"], "Compressed")
+
+    def test_min_bytes(self):
+        """Test that bodies below the threshold are sent uncompressed"""
+        size = len(self.get(None).data)
+        with mock.patch.object(compression, "min_bytes", size + 1):
+            response = self.get("gzip")
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertIn("Accept-Encoding", response.vary)
+        with mock.patch.object(compression, "min_bytes", size):
+            response = self.get("gzip")
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_vary(self):
+        """Test that compressible responses vary on Accept-Encoding"""
+        for encoding in [None, "gzip", "br"]:
+            self.assertIn("Accept-Encoding", self.get(encoding).vary)
+        response = self.client.get("/api/v1/states/missing",
+                                   headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_etag_suffix(self):
+        """Test that compressed responses get their own ETag, which the
+        conditional requests accept"""
+        etag = self.get(None).headers["ETag"]
+        gzip_etag = self.get("gzip").headers["ETag"]
+        self.assertEqual(gzip_etag, etag[:-1] + '-gzip"')
+        for tag in [etag, gzip_etag]:
+            response = self.get("gzip", **{"If-None-Match": tag})
+            self.assertEqual(response.status_code, 304)
+        response = self.client.put(self.url, json={"name": "Compressed"},
+                                   headers={"If-Match": gzip_etag,
+                                            "Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.put(self.url, json={"name": "Compressed"},
+                                   headers={"If-Match": gzip_etag})
+        self.assertEqual(response.status_code, 412)
+
+    def test_cached_body_reused(self):
+        """Test that a response served from the cache is compressed once
+        per encoding"""
+        with mock.patch.object(caching, "responses", LRUCache(100)):
+            first = self.get("gzip")
+            second = self.get("gzip")
+            self.assertEqual(first.headers["X-Cache"], "MISS")
+            self.assertEqual(second.headers["X-Cache"], "HIT")
+            self.assertEqual(second.data, first.data)
+            self.assertEqual(second.headers["Content-Encoding"], "gzip")
+            self.assertEqual(self.gzip.call_count, 1)
+            self.get("br")
+            self.get("br")
+            self.assertEqual(self.br.call_count, 1)
+            self.assertEqual(self.gzip.call_count, 1)
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs, TestPlaceListings and TestPlacesNearby
+classes
+"""
+
+from api.v1.app import app
+from api.v1.views import places
+import inspect
+from models import storage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the places module"""
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/views/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_docstrings(self):
+        """Test for the presence of docstrings in the places module"""
+        self.assertTrue(len(places.__doc__) >= 1)
+        for name, func in inspect.getmembers(places, inspect.isfunction):
+            if func.__module__ == places.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestPlaceListings(unittest.TestCase):
+    """Test the GET /states/<state_id>/places and /users/<user_id>/places
+    routes"""
+    def setUp(self):
+        """Creates a state with two cities holding three places of a user,
+        an empty state and a user without places"""
+        self.client = app.test_client()
+        self.state = State(name="Listed")
+        self.empty_state = State(name="Empty")
+        self.user = User(email="listed@hbnb.io", password="pwd")
+        self.idle_user = User(email="idle@hbnb.io", password="pwd")
+        self.cities = [City(name="City {}".format(i), state_id=self.state.id)
+                       for i in range(2)]
+        self.places = [Place(name="Place {}".format(i), user_id=self.user.id,
+                             city_id=self.cities[i % 2].id)
+                       for i in range(3)]
+        self.objs = [self.state, self.empty_state, self.user,
+                     self.idle_user] + self.cities + self.places
+        for obj in self.objs:
+            storage.new(obj)
+        storage.save()
+        self.ids = sorted(place.id for place in self.places)
+
+    def tearDown(self):
+        """Removes the objects created by the tests"""
+        for obj in reversed(self.objs):
+            obj = storage.get(type(obj), obj.id)
+            if obj is not None:
+                storage.delete(obj)
+        storage.save()
+        storage.close()
+
+    def get_ids(self, url):
+        """Returns the IDs of the places listed by a route"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [place["id"] for place in response.get_json()]
+
+    def test_state_places(self):
+        """Test that the places of every city of a state are listed"""
+        url = "/api/v1/states/{}/places".format(self.state.id)
+        self.assertEqual(self.get_ids(url), self.ids)
+
+    def test_user_places(self):
+        """Test that the places of a user are listed"""
+        url = "/api/v1/users/{}/places".format(self.user.id)
+        self.assertEqual(self.get_ids(url), self.ids)
+
+    def test_unknown_parent(self):
+        """Test that an unknown state or user gets 404"""
+        for url in ["/api/v1/states/missing/places",
+                    "/api/v1/users/missing/places"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.get_json(), {"error": "Not found"})
+
+    def test_empty(self):
+        """Test that a state or user without places gets an empty list"""
+        self.assertEqual(self.get_ids("/api/v1/states/{}/places".format(
+            self.empty_state.id)), [])
+        self.assertEqual(self.get_ids("/api/v1/users/{}/places".format(
+            self.idle_user.id)), [])
+
+    def test_paging(self):
+        """Test that limit and after page through the places"""
+        for url in ["/api/v1/states/{}/places".format(self.state.id),
+                    "/api/v1/users/{}/places".format(self.user.id)]:
+            self.assertEqual(self.get_ids(url + "?limit=2"), self.ids[:2])
+            self.assertEqual(self.get_ids(url + "?limit=2&after=" +
+                                          self.ids[1]), self.ids[2:])
+            self.assertEqual(self.get_ids(url + "?after=" + self.ids[2]),
+                             [])
+            response = self.client.get(url + "?limit=0")
+            self.assertEqual(response.status_code, 400)
+
+
+class TestPlacesNearby(unittest.TestCase):
+    """Test the GET /places_nearby route"""
+    def setUp(self):
+        """Creates a place in Paris"""
+        self.client = app.test_client()
+        self.state = State(name="Nearby")
+        self.city = City(name="Paris", state_id=self.state.id)
+        self.user = User(email="nearby@hbnb.io", password="pwd")
+        self.place = Place(name="Louvre", city_id=self.city.id,
+                           user_id=self.user.id, latitude=48.8606,
+                           longitude=2.3376)
+        self.objs = [self.state, self.city, self.user, self.place]
+        for obj in self.objs:
+            storage.new(obj)
+        storage.save()
+
+    def tearDown(self):
+        """Removes the objects created by the tests"""
+        for obj in reversed(self.objs):
+            obj = storage.get(type(obj), obj.id)
+            if obj is not None:
+                storage.delete(obj)
+        storage.save()
+        storage.close()
+
+    def test_nearby(self):
+        """Test that the places within the radius are listed"""
+        response = self.client.get("/api/v1/places_nearby?lat=48.8584&"
+                                   "lng=2.2945&radius_km=5")
+        self.assertEqual(response.status_code, 200)
+        found = [place for place in response.get_json()
+                 if place["id"] == self.place.id]
+        self.assertEqual(len(found), 1)
+        self.assertAlmostEqual(found[0]["distance_km"], 3.2, delta=0.2)
+        response = self.client.get("/api/v1/places_nearby?lat=48.8584&"
+                                   "lng=2.2945&radius_km=1")
+        self.assertNotIn(self.place.id, [place["id"] for place in
+                                         response.get_json()])
+
+    def test_invalid_parameters(self):
+        """Test that missing, malformed or out of range parameters get 400
+        instead of a default"""
+        cases = [("lat=48&lng=2&radius_km=abc", "radius_km"),
+                 ("lat=48&lng=2&radius_km=nan", "radius_km"),
+                 ("lat=48&lng=2&radius_km=0", "radius_km"),
+                 ("lat=48&lng=2&radius_km=", "radius_km"),
+                 ("lat=abc&lng=2", "lat"), ("lng=2", "lat"),
+                 ("lat=91&lng=2", "lat"), ("lat=48&lng=east", "lng"),
+                 ("lat=48", "lng")]
+        for query, name in cases:
+            with self.subTest(query=query):
+                response = self.client.get("/api/v1/places_nearby?" +
+                                           query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("Invalid " + name,
+                              response.get_data(as_text=True))
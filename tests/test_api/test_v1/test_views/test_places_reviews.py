@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesReviewsDocs and TestUserReviews classes
+"""
+
+from api.v1.app import app
+from api.v1.views import places_reviews
+import inspect
+from models import storage
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestPlacesReviewsDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the places_reviews
+    module"""
+    def test_pep8_conformance_places_reviews(self):
+        """Test that api/v1/views/places_reviews.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places_reviews.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_places_reviews.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_reviews_docstrings(self):
+        """Test for the presence of docstrings in the places_reviews
+        module"""
+        self.assertTrue(len(places_reviews.__doc__) >= 1)
+        for name, func in inspect.getmembers(places_reviews,
+                                             inspect.isfunction):
+            if func.__module__ == places_reviews.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestUserReviews(unittest.TestCase):
+    """Test the GET /users/<user_id>/reviews route"""
+    def setUp(self):
+        """Creates a user with three reviews and a user without any"""
+        self.client = app.test_client()
+        self.user = User(email="reviewer@hbnb.io", password="pwd")
+        self.idle_user = User(email="quiet@hbnb.io", password="pwd")
+        state = State(name="Reviewed")
+        city = City(name="Reviewed", state_id=state.id)
+        place = Place(name="Reviewed", city_id=city.id, user_id=self.user.id)
+        self.reviews = [Review(text="Review {}".format(i), place_id=place.id,
+                               user_id=self.user.id) for i in range(3)]
+        self.objs = [self.user, self.idle_user, state, city,
+                     place] + self.reviews
+        for obj in self.objs:
+            storage.new(obj)
+        storage.save()
+        self.ids = sorted(review.id for review in self.reviews)
+        self.url = "/api/v1/users/{}/reviews".format(self.user.id)
+
+    def tearDown(self):
+        """Removes the objects created by the tests"""
+        for obj in reversed(self.objs):
+            obj = storage.get(type(obj), obj.id)
+            if obj is not None:
+                storage.delete(obj)
+        storage.save()
+        storage.close()
+
+    def get_ids(self, url):
+        """Returns the IDs of the reviews listed by a route"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [review["id"] for review in response.get_json()]
+
+    def test_user_reviews(self):
+        """Test that the reviews of a user are listed"""
+        self.assertEqual(self.get_ids(self.url), self.ids)
+
+    def test_unknown_user(self):
+        """Test that an unknown user gets 404"""
+        response = self.client.get("/api/v1/users/missing/reviews")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {"error": "Not found"})
+
+    def test_empty(self):
+        """Test that a user without reviews gets an empty list"""
+        self.assertEqual(self.get_ids("/api/v1/users/{}/reviews".format(
+            self.idle_user.id)), [])
+
+    def test_paging(self):
+        """Test that limit and after page through the reviews"""
+        self.assertEqual(self.get_ids(self.url + "?limit=2"), self.ids[:2])
+        self.assertEqual(self.get_ids(self.url + "?limit=2&after=" +
+                                      self.ids[1]), self.ids[2:])
+        self.assertEqual(self.get_ids(self.url + "?after=" + self.ids[2]),
+                         [])
+        response = self.client.get(self.url + "?limit=0")
+        self.assertEqual(response.status_code, 400)
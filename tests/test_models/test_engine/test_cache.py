@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Contains the TestLRUCacheDocs and TestLRUCache classes
+"""
+
+import inspect
+from models.engine import cache
+import pep8
+import unittest
+from unittest import mock
+LRUCache = cache.LRUCache
+
+
+class TestLRUCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of LRUCache class"""
+    def test_pep8_conformance_cache(self):
+        """Test that models/engine/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/cache.py',
+                                    'tests/test_models/test_engine/\
+test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_docstrings(self):
+        """Test for the presence of docstrings in the cache module"""
+        self.assertTrue(len(cache.__doc__) >= 1)
+        self.assertTrue(len(LRUCache.__doc__) >= 1)
+        for name, func in inspect.getmembers(LRUCache, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} method needs a docstring".format(name))
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test the LRUCache class"""
+    def test_hit_and_miss(self):
+        """Test that stored values are returned and counted"""
+        lru = LRUCache(2)
+        self.assertIs(lru.get("a"), cache.MISSING)
+        lru.set("a", 1)
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.info()["hits"], 1)
+        self.assertEqual(lru.info()["misses"], 1)
+
+    def test_hit_rate(self):
+        """Test that the hit rate is the share of lookups that hit"""
+        lru = LRUCache(2)
+        self.assertIsNone(lru.info()["hit_rate"])
+        lru.set("a", 1)
+        for key in "aaab":
+            lru.get(key)
+        self.assertEqual(lru.info()["hit_rate"], 0.75)
+
+    def test_negative_entries(self):
+        """Test that None can be cached to remember misses"""
+        lru = LRUCache(2)
+        lru.set("a", None)
+        self.assertIsNone(lru.get("a"))
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        lru = LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(len(lru), 2)
+        self.assertIs(lru.get("b"), cache.MISSING)
+        self.assertEqual(lru.get("a"), 1)
+
+    def test_ttl(self):
+        """Test that entries expire after ttl seconds"""
+        lru = LRUCache(2, ttl=10)
+        with mock.patch.object(cache, "monotonic", return_value=100):
+            lru.set("a", 1)
+        with mock.patch.object(cache, "monotonic", return_value=105):
+            self.assertEqual(lru.get("a"), 1)
+        with mock.patch.object(cache, "monotonic", return_value=111):
+            self.assertIs(lru.get("a"), cache.MISSING)
+
+    def test_pop_and_clear(self):
+        """Test that entries can be invalidated"""
+        lru = LRUCache(4)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.pop("a")
+        self.assertIs(lru.get("a"), cache.MISSING)
+        lru.clear()
+        self.assertEqual(len(lru), 0)
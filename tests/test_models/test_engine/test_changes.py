@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Contains the TestChangeLogDocs and TestChangeLog classes
+"""
+
+import inspect
+from models.engine import changes
+import pep8
+import threading
+import unittest
+ChangeLog = changes.ChangeLog
+
+
+class TestChangeLogDocs(unittest.TestCase):
+    """Tests to check the documentation and style of ChangeLog class"""
+    def test_pep8_conformance_changes(self):
+        """Test that models/engine/changes.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/changes.py',
+                                    'tests/test_models/test_engine/\
+test_changes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_changes_docstrings(self):
+        """Test for the presence of docstrings in the changes module"""
+        self.assertTrue(len(changes.__doc__) >= 1)
+        self.assertTrue(len(ChangeLog.__doc__) >= 1)
+        for name, func in inspect.getmembers(ChangeLog, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} method needs a docstring".format(name))
+
+
+class TestChangeLog(unittest.TestCase):
+    """Test the ChangeLog class"""
+    def test_record(self):
+        """Test that changes are numbered by offset and class version"""
+        log = ChangeLog()
+        log.record([("State", "a", "new"), ("City", "b", "new"),
+                    ("State", "a", "update")])
+        self.assertEqual(log.offset(), 3)
+        self.assertEqual(log.version("State"), 2)
+        self.assertEqual(log.version("User"), 0)
+        found, complete = log.since(1)
+        self.assertTrue(complete)
+        self.assertEqual(found, [
+            {"offset": 2, "class": "City", "id": "b", "operation": "new",
+             "version": 1},
+            {"offset": 3, "class": "State", "id": "a",
+             "operation": "update", "version": 2}])
+        self.assertEqual(log.since(3), ([], True))
+
+    def test_dropped(self):
+        """Test that readers are told when changes were dropped"""
+        log = ChangeLog(2)
+        log.record([("State", str(i), "new") for i in range(5)])
+        found, complete = log.since(1)
+        self.assertFalse(complete)
+        self.assertEqual([change["offset"] for change in found], [4, 5])
+        self.assertTrue(log.since(3)[1])
+
+    def test_wait(self):
+        """Test that since waits for the next change"""
+        log = ChangeLog()
+        timer = threading.Timer(0.05, log.record, [[("User", "u", "new")]])
+        timer.start()
+        found, complete = log.since(0, 5)
+        timer.join()
+        self.assertEqual([change["id"] for change in found], ["u"])
+        self.assertEqual(log.since(1, 0.01), ([], True))
@@ -3,10 +3,10 @@
 Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import inspect
 import models
-from models.engine import db_storage
+from models.engine import db_storage, file_storage
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -17,8 +17,12 @@ from models.user import User
 import json
 import os
 import pep8
+from sqlalchemy import create_engine
+import tempfile
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
+FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
 
@@ -103,3 +107,563 @@ class TestFileStorage(unittest.TestCase):
         self.state.save()
         cls_count_finish = models.storage.count()
         self.assertNotEqual(cls_count_start, cls_count_finish)
+
+
+class TestDBStorageIndexes(unittest.TestCase):
+    """Test that the hot queries are answered from secondary indexes"""
+    def explain(self, query):
+        """Returns the plan chosen by the database for query as a string"""
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + query)
+                return " ".join(str(row[-1]) for row in rows)
+            rows = conn.exec_driver_sql("EXPLAIN " + query).mappings()
+            return " ".join(str(row["key"]) for row in rows)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_foreign_key_lookups_use_indexes(self):
+        """Test that relationship traversals search an index"""
+        lookups = {"cities": "state_id", "places": "city_id",
+                   "reviews": "place_id"}
+        for table, column in lookups.items():
+            with self.subTest(table=table):
+                plan = self.explain("SELECT id FROM {} WHERE {} = 'x'"
+                                    .format(table, column))
+                self.assertIn("ix_{}_{}".format(table, column), plan)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_user_lookups_use_indexes(self):
+        """Test that lookups by user and by email search an index"""
+        plan = self.explain("SELECT id FROM users WHERE email = 'x'")
+        self.assertIn("ix_users_email", plan)
+        plan = self.explain("SELECT id FROM reviews WHERE user_id = 'x'")
+        self.assertIn("ix_reviews_user_id", plan)
+        plan = self.explain("SELECT id FROM places WHERE user_id = 'x'")
+        self.assertIn("ix_places_user_id", plan)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_sort_by_name_uses_index(self):
+        """Test that sorting by name walks the name index"""
+        plan = self.explain("SELECT name FROM states ORDER BY name")
+        self.assertIn("ix_states_name", plan)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migrate_creates_missing_indexes(self):
+        """Test that migrate adds dropped indexes back"""
+        engine = models.storage._DBStorage__engine
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_states_name ON states"
+                                 if engine.dialect.name == "mysql" else
+                                 "DROP INDEX ix_states_name")
+        self.assertIn("ix_states_name", models.storage.migrate())
+        self.assertEqual(models.storage.migrate(), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migrate_adds_missing_columns(self):
+        """Test that migrate adds the version column to older tables"""
+        with tempfile.TemporaryDirectory() as tmp:
+            url = "sqlite:///" + os.path.join(tmp, "old.db")
+            old = create_engine(url)
+            with old.begin() as conn:
+                conn.exec_driver_sql("CREATE TABLE states (id VARCHAR(60) "
+                                     "PRIMARY KEY, created_at DATETIME, "
+                                     "updated_at DATETIME, name VARCHAR(128))")
+                conn.exec_driver_sql("INSERT INTO states VALUES ('s', "
+                                     "'2020-01-01', '2020-01-01', 'Old')")
+            old.dispose()
+            with mock.patch.dict(os.environ, {"HBNB_DB_URL": url,
+                                              "HBNB_ENV": "dev"}):
+                storage = DBStorage()
+            self.assertIn("states.version", storage.migrate())
+            storage.reload()
+            self.assertEqual(storage.get(State, "s").version, 1)
+            self.assertNotIn("states.version", storage.migrate())
+            storage.close()
+            storage._DBStorage__engine.dispose()
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageReplicas(unittest.TestCase):
+    """Test the routing of reads to replicas against two SQLite files"""
+    def setUp(self):
+        """Creates a storage with one primary and one replica database"""
+        self.tmp = tempfile.TemporaryDirectory()
+        primary = "sqlite:///" + os.path.join(self.tmp.name, "primary.db")
+        replica = "sqlite:///" + os.path.join(self.tmp.name, "replica.db")
+        self.replica = create_engine(replica)
+        models.base_model.Base.metadata.create_all(self.replica)
+        env = {"HBNB_DB_URL": primary, "HBNB_DB_REPLICAS": replica,
+               "HBNB_ENV": "test"}
+        with mock.patch.dict(os.environ, env):
+            self.storage = DBStorage()
+        self.storage.reload()
+        self.primary = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """Closes the storage and removes the databases"""
+        self.storage.close()
+        self.primary.dispose()
+        self.replica.dispose()
+        self.tmp.cleanup()
+
+    def insert_state(self, engine, id, name):
+        """Inserts a state row directly into one of the databases"""
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO states (id, name, created_at, updated_at) "
+                "VALUES ('{}', '{}', '2017-09-28 21:05:54', "
+                "'2017-09-28 21:05:54')".format(id, name))
+
+    def test_reads_go_to_replica(self):
+        """Test that all, get and count read from the replica"""
+        self.insert_state(self.replica, "on-replica", "Texas")
+        self.assertIn("State.on-replica", self.storage.all(State))
+        self.assertIsNotNone(self.storage.get(State, "on-replica"))
+        self.assertEqual(self.storage.count(State), 1)
+
+    def test_read_your_writes(self):
+        """Test that reads stay on the primary after a write"""
+        self.insert_state(self.replica, "on-replica", "Texas")
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertIsNotNone(self.storage.get(State, state.id))
+        self.assertIsNone(self.storage.get(State, "on-replica"))
+        self.storage.close()
+        self.assertIsNotNone(self.storage.get(State, "on-replica"))
+
+    def test_updates_go_to_primary(self):
+        """Test that changes to objects read from a replica are written
+        to the primary"""
+        self.insert_state(self.primary, "shared", "Texas")
+        self.insert_state(self.replica, "shared", "Texas")
+        state = self.storage.get(State, "shared")
+        state.name = "Nevada"
+        self.storage.save()
+        with self.primary.connect() as conn:
+            name = conn.exec_driver_sql(
+                "SELECT name FROM states WHERE id = 'shared'").scalar()
+        self.assertEqual(name, "Nevada")
+        with self.replica.connect() as conn:
+            name = conn.exec_driver_sql(
+                "SELECT name FROM states WHERE id = 'shared'").scalar()
+        self.assertEqual(name, "Texas")
+
+    def test_linked_objects_go_to_primary(self):
+        """Test that objects read from a replica and linked to a written
+        object are moved to the primary along with it"""
+        for engine in [self.primary, self.replica]:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "INSERT INTO places (id, city_id, user_id, name, "
+                    "number_rooms, number_bathrooms, max_guest, "
+                    "price_by_night, created_at, updated_at) VALUES "
+                    "('p', 'c', 'u', 'Home', 0, 0, 0, 0, "
+                    "'2017-09-28 21:05:54', '2017-09-28 21:05:54')")
+                conn.exec_driver_sql(
+                    "INSERT INTO amenities (id, name, created_at, "
+                    "updated_at) VALUES ('a', 'Wifi', "
+                    "'2017-09-28 21:05:54', '2017-09-28 21:05:54')")
+        place = self.storage.get(Place, "p")
+        amenity = self.storage.get(Amenity, "a")
+        place.amenities.append(amenity)
+        self.storage.new(place)
+        self.storage.save()
+        with self.primary.connect() as conn:
+            links = conn.exec_driver_sql(
+                "SELECT place_id, amenity_id FROM place_amenity").all()
+        self.assertEqual([tuple(link) for link in links], [("p", "a")])
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageCache(unittest.TestCase):
+    """Test the read-through object cache of DBStorage"""
+    def setUp(self):
+        """Creates a storage caching State objects"""
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {"HBNB_DB_URL": "sqlite:///" + os.path.join(self.tmp.name,
+                                                          "cache.db"),
+               "HBNB_CACHE_SIZE": "8", "HBNB_CACHE_CLASSES": "State",
+               "HBNB_ENV": "test"}
+        with mock.patch.dict(os.environ, env):
+            self.storage = DBStorage()
+        self.storage.reload()
+        self.state = State(name="Texas")
+        self.storage.new(self.state)
+        self.storage.save()
+        self.storage.close()
+
+    def tearDown(self):
+        """Closes the storage and removes the database"""
+        self.storage.close()
+        self.storage._DBStorage__engine.dispose()
+        self.tmp.cleanup()
+
+    def test_hits_across_sessions(self):
+        """Test that a second request is answered from the cache"""
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Texas")
+        self.storage.close()
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.name, "Texas")
+        self.assertEqual(state.cities, [])
+        self.assertEqual(self.storage.cache_info()["hits"], 1)
+
+    def test_negative_caching(self):
+        """Test that misses are remembered"""
+        self.assertIsNone(self.storage.get(State, "nope"))
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, "nope"))
+        self.assertEqual(self.storage.cache_info()["hits"], 1)
+
+    def test_invalidation_on_save(self):
+        """Test that saved changes are not served stale"""
+        self.storage.get(State, self.state.id)
+        self.storage.close()
+        state = self.storage.get(State, self.state.id)
+        state.name = "Nevada"
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Nevada")
+
+    def test_invalidation_on_delete(self):
+        """Test that deleted objects are not served from the cache"""
+        self.storage.get(State, self.state.id)
+        self.storage.close()
+        self.storage.delete(self.storage.get(State, self.state.id))
+        self.storage.save()
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, self.state.id))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageBulk(unittest.TestCase):
+    """Test the set based update_where and delete_where methods"""
+    def setUp(self):
+        """Creates a state with two places and one review"""
+        self.state = State(name="Texas")
+        self.city = City(name="Austin", state_id=self.state.id)
+        self.user = User(email="a@b.c", password="pwd")
+        self.places = [Place(name=name, city_id=self.city.id,
+                             user_id=self.user.id) for name in "ab"]
+        self.review = Review(text="ok", place_id=self.places[0].id,
+                             user_id=self.user.id)
+        for obj in [self.state, self.city, self.user] + self.places + \
+                [self.review]:
+            models.storage.new(obj)
+        models.storage.save()
+
+    def tearDown(self):
+        """Removes the objects created by setUp"""
+        models.storage.delete_where(State, {"id": self.state.id})
+        models.storage.delete_where(User, {"id": self.user.id})
+        models.storage.close()
+
+    def test_update_where(self):
+        """Test that update_where patches the matching rows only"""
+        count = models.storage.update_where(Place, {"state_id": self.state.id},
+                                            {"price_by_night": 99})
+        self.assertEqual(count, 2)
+        models.storage.close()
+        place = models.storage.get(Place, self.places[0].id)
+        self.assertEqual(place.price_by_night, 99)
+
+    def test_update_where_unknown_attribute(self):
+        """Test that unknown attributes are rejected"""
+        with self.assertRaises(ValueError):
+            models.storage.update_where(Place, {"nope": 1}, {"name": "x"})
+
+    def test_delete_where_cascades(self):
+        """Test that delete_where also deletes the dependent rows"""
+        count = models.storage.delete_where(City, {"state_id": self.state.id})
+        self.assertEqual(count, 1)
+        models.storage.close()
+        self.assertIsNone(models.storage.get(Place, self.places[1].id))
+        self.assertIsNone(models.storage.get(Review, self.review.id))
+
+    def test_query(self):
+        """Test that query filters, orders and pages the rows"""
+        found = models.storage.query(Place, {"state_id": self.state.id},
+                                     order_by="-name")
+        self.assertEqual([place.name for place in found], ["b", "a"])
+        found = models.storage.query("Place", {"city_id": self.city.id},
+                                     order_by="name", limit=1,
+                                     after=self.places[0].id)
+        self.assertEqual([place.name for place in found], ["b"])
+        found = models.storage.query(Place, {"city_id": self.city.id,
+                                             "number_rooms": {"gte": 1}})
+        self.assertEqual(found, [])
+        with self.assertRaises(ValueError):
+            models.storage.query(Place, after="nope")
+
+    def test_query_ranges(self):
+        """Test that query answers range filters in order"""
+        models.storage.update_where(Place, {"id": self.places[0].id},
+                                    {"price_by_night": 30})
+        models.storage.update_where(Place, {"id": self.places[1].id},
+                                    {"price_by_night": 20})
+        found = models.storage.query(Place, {"city_id": self.city.id,
+                                             "price_by_night": {"gte": 15}},
+                                     order_by="price_by_night")
+        self.assertEqual([place.price_by_night for place in found], [20, 30])
+        found = models.storage.query(Place, {"city_id": self.city.id},
+                                     order_by="-price_by_night", limit=1)
+        self.assertEqual([place.price_by_night for place in found], [30])
+
+    def test_query_amenities(self):
+        """Test that query finds the places holding all of some amenities"""
+        amenities = [Amenity(name=str(i)) for i in range(2)]
+        self.places[0].amenities.extend(amenities)
+        self.places[1].amenities.append(amenities[0])
+        models.storage.save()
+        ids = [amenity.id for amenity in amenities]
+        found = models.storage.query(Place, {"amenity_ids": ids})
+        self.assertEqual([place.id for place in found], [self.places[0].id])
+        found = models.storage.query(Place, {"amenity_ids": ids[:1]})
+        self.assertEqual(len(found), 2)
+        models.storage.delete_where(Amenity, {"id": ids})
+
+    def test_counts(self):
+        """Test that counts returns the number of children of parents"""
+        counts = models.storage.counts(Place, [place.id for place
+                                               in self.places])
+        self.assertEqual(counts, {self.places[0].id: {"reviews": 1},
+                                  self.places[1].id: {"reviews": 0}})
+        counts = models.storage.counts("User", [self.user.id])
+        self.assertEqual(counts[self.user.id], {"places": 2, "reviews": 1})
+        models.storage.delete_where(Review, {"id": self.review.id})
+        counts = models.storage.counts(State, [self.state.id])
+        self.assertEqual(counts, {self.state.id: {"cities": 1}})
+        counts = models.storage.counts(City, [self.city.id])
+        self.assertEqual(counts[self.city.id], {"places": 2})
+        counts = models.storage.counts(Place, [self.places[0].id])
+        self.assertEqual(counts[self.places[0].id], {"reviews": 0})
+
+    def test_linked(self):
+        """Test that linked returns the ids linked through a link table"""
+        amenities = [Amenity(name=str(i)) for i in range(2)]
+        self.places[0].amenities.extend(amenities)
+        models.storage.save()
+        found = models.storage.linked(Place, "amenity_ids",
+                                      [place.id for place in self.places])
+        self.assertEqual(sorted(found[self.places[0].id]),
+                         sorted(amenity.id for amenity in amenities))
+        self.assertEqual(found[self.places[1].id], [])
+        models.storage.delete_where(Amenity, {"id": [amenity.id for amenity
+                                                     in amenities]})
+
+    def test_delete_tombstones(self):
+        """Test that deletions, cascaded or not, leave tombstones"""
+        models.storage.delete(self.places[0])
+        models.storage.save()
+        found = models.storage.deleted(Review, self.state.created_at)
+        self.assertEqual([obj.id for obj in found], [self.review.id])
+        self.assertNotIn("Tombstone." + self.review.id, models.storage.all())
+        since = datetime.utcnow()
+        models.storage.delete_where(City, {"id": self.city.id})
+        models.storage.close()
+        found = models.storage.deleted(Place, since) + \
+            models.storage.deleted(City, since)
+        self.assertEqual({obj.id for obj in found},
+                         {self.city.id, self.places[1].id})
+
+    def test_prune_tombstones(self):
+        """Test that deletions prune the tombstones older than their
+        retention"""
+        since = self.state.created_at
+        models.storage.delete(self.review)
+        models.storage.save()
+        with mock.patch("models.engine.db_storage.max_age", timedelta(0)):
+            models.storage.delete(self.places[1])
+            models.storage.save()
+        self.assertEqual(models.storage.deleted(Review, since), [])
+
+    def test_changes(self):
+        """Test that saved and bulk changes are recorded in the change log"""
+        offset = models.storage.changes.offset()
+        self.places[0].name = "c"
+        models.storage.delete(self.review)
+        models.storage.save()
+        models.storage.update_where(Place, {"id": self.places[1].id},
+                                    {"price_by_night": 5})
+        models.storage.delete_where(City, {"id": self.city.id})
+        found, complete = models.storage.changes.since(offset)
+        self.assertTrue(complete)
+        found = [(change["class"], change["id"], change["operation"])
+                 for change in found]
+        self.assertEqual(found[:3], [("Place", self.places[0].id, "update"),
+                                     ("Review", self.review.id, "delete"),
+                                     ("Place", self.places[1].id, "update")])
+        self.assertEqual(set(found[3:]),
+                         {("Place", self.places[0].id, "delete"),
+                          ("Place", self.places[1].id, "delete"),
+                          ("City", self.city.id, "delete")})
+
+    def test_place_stats(self):
+        """Test that place_stats summarizes the places of some cities"""
+        for place, price in zip(self.places, [40, 10]):
+            models.storage.update_where(Place, {"id": place.id},
+                                        {"price_by_night": price,
+                                         "number_rooms": 3})
+        stats = models.storage.place_stats([self.city.id])
+        self.assertEqual(stats["places"], 2)
+        self.assertEqual(stats["price_by_night"],
+                         {"min": 10, "p25": 10, "p50": 10, "p75": 40,
+                          "p90": 40, "max": 40, "avg": 25})
+        self.assertEqual(stats["avg_rooms"], 3)
+        self.assertEqual(stats["reviews"], 1)
+        stats = models.storage.place_stats([])
+        self.assertEqual(stats["places"], 0)
+        self.assertIsNone(stats["price_by_night"]["p50"])
+
+    def test_similar(self):
+        """Test that similar ranks places by the overlap of amenities"""
+        amenities = [Amenity(name=str(i)) for i in range(3)]
+        self.places[0].amenities.extend(amenities[:2])
+        self.places[1].amenities.extend(amenities)
+        models.storage.save()
+        found = models.storage.similar(self.places[0])
+        self.assertEqual([(place.id, round(similarity, 3))
+                          for place, similarity in found],
+                         [(self.places[1].id, 0.667)])
+        self.assertEqual(models.storage.similar(self.places[1], 1)[0][0].id,
+                         self.places[0].id)
+        models.storage.delete_where(Amenity, {"id": [amenity.id for amenity
+                                                     in amenities]})
+
+    def test_search(self):
+        """Test that search ranks places and reviews by relevance"""
+        word = "w" + self.state.id.replace("-", "")
+        models.storage.update_where(Place, {"id": self.places[0].id},
+                                    {"description": word + " loft big"})
+        models.storage.update_where(Review, {"id": self.review.id},
+                                    {"text": word + " loft"})
+        found = models.storage.search(word + " loft")
+        self.assertEqual({obj.id for obj, score in found},
+                         {self.review.id, self.places[0].id})
+        found = models.storage.search(word, ["Place"])
+        self.assertEqual([obj.id for obj, score in found],
+                         [self.places[0].id])
+
+    def test_complete(self):
+        """Test that complete returns the objects whose name starts with
+        a prefix, in order"""
+        prefix = "x" + self.state.id.replace("-", "")
+        cities = [City(name=prefix + suffix, state_id=self.state.id)
+                  for suffix in ["b", "a", "%"]]
+        for city in cities:
+            models.storage.new(city)
+        models.storage.save()
+        found = models.storage.complete(City, prefix, 2)
+        self.assertEqual([city.id for city in found],
+                         [cities[2].id, cities[1].id])
+        found = models.storage.complete(City, prefix + "%")
+        self.assertEqual([city.id for city in found], [cities[2].id])
+
+    def test_nearby(self):
+        """Test that nearby returns the places in the radius, nearest
+        first"""
+        models.storage.update_where(Place, {"id": self.places[0].id},
+                                    {"latitude": 48.85, "longitude": 2.35})
+        models.storage.update_where(Place, {"id": self.places[1].id},
+                                    {"latitude": 48.0, "longitude": 2.0})
+        found = models.storage.nearby(48.8566, 2.3522, 10)
+        self.assertEqual([place.id for place, distance in found],
+                         [self.places[0].id])
+        self.assertLess(found[0][1], 1)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestBulkParity(unittest.TestCase):
+    """Test that update_where and delete_where do the same in FileStorage
+    as in DBStorage"""
+    def setUp(self):
+        """Creates the same objects in the database and in an empty
+        FileStorage writing to a temporary file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        state = {"_FileStorage__file_path":
+                 os.path.join(self.tmp.name, "file.json"),
+                 "_FileStorage__objects": {}, "_FileStorage__keys": {},
+                 "_FileStorage__indexes": {}, "_FileStorage__tombstones": {}}
+        for name, value in state.items():
+            patcher = mock.patch.object(FileStorage, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.storages = {"db": models.storage, "file": FileStorage()}
+        self.objs = {engine: self.create(storage)
+                     for engine, storage in self.storages.items()}
+
+    def tearDown(self):
+        """Removes the objects created in the database"""
+        objs = self.objs["db"]
+        models.storage.delete_where(State, {"id": objs["state"].id})
+        models.storage.delete_where(User, {"id": objs["user"].id})
+        models.storage.close()
+        self.tmp.cleanup()
+
+    def create(self, storage):
+        """Creates a state, its city, two places and a review in storage"""
+        objs = {"state": State(name="Texas"),
+                "user": User(email="a@b.c", password="pwd")}
+        objs["city"] = City(name="Austin", state_id=objs["state"].id)
+        objs["places"] = [Place(name=name, city_id=objs["city"].id,
+                                user_id=objs["user"].id, version=1)
+                          for name in "ab"]
+        objs["review"] = Review(text="ok", place_id=objs["places"][0].id,
+                                user_id=objs["user"].id)
+        for obj in [objs["state"], objs["user"], objs["city"],
+                    objs["review"]] + objs["places"]:
+            storage.new(obj)
+        storage.save()
+        return objs
+
+    def test_unknown_attribute(self):
+        """Test that both engines reject the same unknown attributes"""
+        for engine, storage in self.storages.items():
+            with self.subTest(engine=engine):
+                with self.assertRaises(ValueError):
+                    storage.update_where(Place, {}, {"nope": 1})
+                with self.assertRaises(ValueError):
+                    storage.update_where(Place, {"nope": 1}, {"name": "x"})
+                with self.assertRaises(ValueError):
+                    storage.delete_where(Place, {"nope": 1})
+                with self.assertRaises(ValueError):
+                    storage.update_where(Place, {}, {"reviews": []})
+
+    def test_same_results(self):
+        """Test that both engines update, delete and cascade alike"""
+        found = {}
+        for engine, storage in self.storages.items():
+            objs = self.objs[engine]
+            updated = storage.update_where(
+                Place, {"state_id": objs["state"].id},
+                {"price_by_night": 99})
+            deleted = storage.delete_where(City, {"state_id":
+                                                  objs["state"].id})
+            found[engine] = (updated, deleted,
+                             storage.get(State, objs["state"].id) is None,
+                             [storage.get(Place, place.id) is None
+                              for place in objs["places"]],
+                             storage.get(Review, objs["review"].id) is None)
+        self.assertEqual(found["file"], found["db"])
+        self.assertEqual(found["db"], (2, 1, False, [True, True], True))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageIter(unittest.TestCase):
+    """Test the batched iter method"""
+    def test_iter(self):
+        """Test that iter yields every object of a class in id order"""
+        amenities = [Amenity(name=str(i)) for i in range(5)]
+        for amenity in amenities:
+            models.storage.new(amenity)
+        models.storage.save()
+        batches = list(models.storage.iter(Amenity, 2))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        ids = [obj.id for batch in batches for obj in batch]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), models.storage.count(Amenity))
+        models.storage.delete_where(Amenity, {"id": [amenity.id for amenity
+                                                     in amenities]})
@@ -3,10 +3,11 @@
 Contains the TestFileStorageDocs classes
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import inspect
 import models
 from models.engine import file_storage
+from models.engine.geo import haversine
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -18,6 +19,7 @@ import json
 import os
 import pep8
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -104,9 +106,12 @@ class TestFileStorage(unittest.TestCase):
             instance_key = instance.__class__.__name__ + "." + instance.id
             new_dict[instance_key] = instance
         save = FileStorage._FileStorage__objects
+        tombstones = FileStorage._FileStorage__tombstones
         FileStorage._FileStorage__objects = new_dict
+        FileStorage._FileStorage__tombstones = {}
         storage.save()
         FileStorage._FileStorage__objects = save
+        FileStorage._FileStorage__tombstones = tombstones
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
         string = json.dumps(new_dict)
@@ -114,6 +119,30 @@ class TestFileStorage(unittest.TestCase):
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_unchanged_file(self):
+        """Test that close only reloads a file changed since it was last
+        read or written"""
+        state = State(name="Texas")
+        models.storage.new(state)
+        models.storage.save()
+        with mock.patch.object(FileStorage, "reload") as reload:
+            models.storage.close()
+            reload.assert_not_called()
+        with open("file.json", "r") as f:
+            jo = json.load(f)
+        jo["State." + state.id]["name"] = "Lone Star"
+        with open("file.json", "w") as f:
+            json.dump(jo, f)
+        models.storage.close()
+        self.assertEqual(models.storage.get(State, state.id).name,
+                         "Lone Star")
+        with mock.patch.object(FileStorage, "reload") as reload:
+            models.storage.close()
+            reload.assert_not_called()
+        models.storage.delete(models.storage.get(State, state.id))
+        models.storage.save()
+
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_get(self):
         """Tests if the get method works as intended"""
@@ -130,3 +159,382 @@ class TestFileStorage(unittest.TestCase):
         self.state.save()
         cls_count_finish = models.storage.count()
         self.assertNotEqual(cls_count_start, cls_count_finish)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_update_where(self):
+        """Test that update_where patches the matching objects only"""
+        state = State(name="Texas")
+        other = State(name="Nevada")
+        cities = [City(name="Austin", state_id=state.id),
+                  City(name="Dallas", state_id=state.id),
+                  City(name="Reno", state_id=other.id)]
+        places = [Place(name="Loft", city_id=city.id, price_by_night=10)
+                  for city in cities]
+        for obj in [state, other] + cities + places:
+            models.storage.new(obj)
+        count = models.storage.update_where(Place, {"state_id": state.id},
+                                            {"price_by_night": 99})
+        self.assertEqual(count, 2)
+        self.assertEqual([place.price_by_night for place in places],
+                         [99, 99, 10])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_delete_where(self):
+        """Test that delete_where deletes the matching objects only"""
+        states = [State(name="Texas"), State(name="Nevada")]
+        for state in states:
+            models.storage.new(state)
+        count = models.storage.delete_where("State", {"id": [states[0].id]})
+        self.assertEqual(count, 1)
+        self.assertIsNone(models.storage.get(State, states[0].id))
+        self.assertIsNotNone(models.storage.get(State, states[1].id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_update_where_unknown_attribute(self):
+        """Test that attributes that are not columns are rejected"""
+        place = Place(name="Loft")
+        models.storage.new(place)
+        for filters, values in [({}, {"nope": 1}), ({"nope": 1}, {}),
+                                ({}, {"amenity_ids": []})]:
+            with self.assertRaises(ValueError):
+                models.storage.update_where(Place, filters, values)
+        with self.assertRaises(ValueError):
+            models.storage.delete_where(Place, {"nope": 1})
+        self.assertEqual(models.storage.update_where(
+            Place, {"id": place.id, "amenity_ids": []},
+            {"number_rooms": 2}), 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_delete_where_cascades(self):
+        """Test that delete_where deletes the children of the objects and
+        unlinks deleted amenities, as DBStorage does"""
+        state = State(name="Texas")
+        city = City(name="Austin", state_id=state.id)
+        amenities = [Amenity(name="Wifi"), Amenity(name="Pool")]
+        places = [Place(name="Loft", city_id=city.id),
+                  Place(name="Barn", city_id="elsewhere",
+                        amenity_ids=[amenity.id for amenity in amenities])]
+        review = Review(text="ok", place_id=places[0].id)
+        for obj in [state, city, review] + amenities + places:
+            models.storage.new(obj)
+        count = models.storage.delete_where(State, {"id": state.id})
+        self.assertEqual(count, 1)
+        for cls, obj in [(City, city), (Place, places[0]), (Review, review)]:
+            self.assertIsNone(models.storage.get(cls, obj.id))
+        self.assertIsNotNone(models.storage.get(Place, places[1].id))
+        models.storage.delete_where(Amenity, {"id": [amenities[0].id]})
+        self.assertEqual(places[1].amenity_ids, [amenities[1].id])
+        self.assertEqual(models.storage.query(
+            Place, {"amenity_ids": [amenities[0].id]}), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter(self):
+        """Test that iter yields every object of a class in id order"""
+        for i in range(5):
+            models.storage.new(Amenity(name=str(i)))
+        batches = list(models.storage.iter(Amenity, 2))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        ids = [obj.id for batch in batches for obj in batch]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(sorted(ids), sorted(obj.id for obj in
+                                             models.storage.all(Amenity).
+                                             values()))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_skips_deleted(self):
+        """Test that objects deleted during iter are not yielded"""
+        amenities = [Amenity(name=str(i)) for i in range(3)]
+        for amenity in amenities:
+            models.storage.new(amenity)
+        batches = models.storage.iter(Amenity, 1)
+        first = next(batches)[0]
+        for amenity in amenities:
+            if amenity is not first:
+                models.storage.delete(amenity)
+        remaining = [obj for batch in batches for obj in batch]
+        self.assertFalse(any(obj in amenities for obj in remaining))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query(self):
+        """Test that query filters, orders and pages the objects"""
+        state = State(name="Texas")
+        cities = [City(name=name, state_id=state.id) for name in "cab"]
+        cities.append(City(name="d", state_id="other"))
+        for obj in [state] + cities:
+            models.storage.new(obj)
+        found = models.storage.query(City, {"state_id": state.id},
+                                     order_by="name")
+        self.assertEqual([city.name for city in found], ["a", "b", "c"])
+        found = models.storage.query("City", {"state_id": state.id},
+                                     order_by="-name", limit=2)
+        self.assertEqual([city.name for city in found], ["c", "b"])
+        found = models.storage.query(City, {"state_id": state.id},
+                                     order_by="name", after=cities[1].id)
+        self.assertEqual([city.name for city in found], ["b", "c"])
+        with self.assertRaises(ValueError):
+            models.storage.query(City, after="nope")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query_reindexes(self):
+        """Test that query sees changed and deleted objects"""
+        city = City(name="Austin", state_id="a")
+        models.storage.new(city)
+        city.state_id = "b"
+        city.save()
+        self.assertEqual(models.storage.query(City, {"state_id": "a"}), [])
+        self.assertEqual(models.storage.query(City, {"state_id": "b"}),
+                         [city])
+        models.storage.delete(city)
+        self.assertEqual(models.storage.query(City, {"state_id": "b"}), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_nearby(self):
+        """Test that nearby returns the places in the radius, nearest
+        first"""
+        far = Place(name="far", latitude=48.0, longitude=2.0)
+        near = Place(name="near", latitude=48.85, longitude=2.35)
+        nearer = Place(name="nearer", latitude=48.856, longitude=2.352)
+        places = [far, near, nearer]
+        for place in places:
+            models.storage.new(place)
+        found = [(place, distance) for place, distance in
+                 models.storage.nearby(48.8566, 2.3522, 10)
+                 if place in places]
+        self.assertEqual([place for place, distance in found],
+                         [nearer, near])
+        self.assertTrue(found[0][1] < found[1][1] < 10)
+        found = models.storage.nearby(48.8566, 2.3522, 10, limit=1)
+        self.assertEqual(len(found), 1)
+        self.assertLessEqual(found[0][1], haversine(48.8566, 2.3522,
+                                                    48.856, 2.352))
+        for place in places:
+            models.storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query_ranges(self):
+        """Test that query answers range filters and reads in order"""
+        city = City(name="Austin", state_id="a")
+        places = [Place(name=city.id + str(price), city_id=city.id,
+                        price_by_night=price) for price in [30, 10, 20]]
+        for place in places:
+            models.storage.new(place)
+        found = models.storage.query(Place, {"city_id": city.id,
+                                             "price_by_night": {"gte": 15}},
+                                     order_by="price_by_night")
+        self.assertEqual(found, [places[2], places[0]])
+        names = [place.name for place in places]
+        found = models.storage.query(Place, {"name": names},
+                                     order_by="-price_by_night", limit=2)
+        self.assertEqual(found, [places[0], places[2]])
+        found = models.storage.query(Place, {"name": names},
+                                     order_by="-price_by_night", limit=2,
+                                     after=places[2].id)
+        self.assertEqual(found, [places[1]])
+        for place in places:
+            models.storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query_amenities(self):
+        """Test that query finds the places holding all of some amenities"""
+        amenities = [Amenity(name=str(i)) for i in range(3)]
+        both = Place(amenity_ids=[amenities[0].id, amenities[1].id])
+        one = Place(amenity_ids=[amenities[0].id])
+        for obj in amenities + [both, one]:
+            models.storage.new(obj)
+        ids = [amenity.id for amenity in amenities]
+        found = models.storage.query(Place, {"amenity_ids": ids[:2]})
+        self.assertEqual(found, [both])
+        self.assertEqual(models.storage.query(Place, {"amenity_ids": ids}),
+                         [])
+        one.amenity_ids.append(ids[1])
+        one.save()
+        self.assertEqual(len(models.storage.query(Place,
+                                                  {"amenity_ids": ids[:2]})),
+                         2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_similar(self):
+        """Test that similar ranks places by the overlap of amenities"""
+        ids = [Amenity().id for i in range(4)]
+        place = Place(amenity_ids=ids[:3])
+        same = Place(amenity_ids=list(reversed(ids[:3])))
+        close = Place(amenity_ids=ids)
+        other = Place(amenity_ids=[Amenity().id])
+        for obj in [place, same, close, other]:
+            models.storage.new(obj)
+        found = models.storage.similar(place)
+        self.assertEqual(found, [(same, 1.0), (close, 0.75)])
+        self.assertEqual(models.storage.similar(place, 1), [(same, 1.0)])
+        models.storage.delete(same)
+        close.amenity_ids = ids[:3]
+        close.save()
+        self.assertEqual(models.storage.similar(place), [(close, 1.0)])
+        for obj in [place, close, other]:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_counts(self):
+        """Test that counts follows the children created and deleted"""
+        user = User()
+        places = [Place(user_id=user.id), Place(user_id=user.id)]
+        review = Review(place_id=places[0].id, user_id=user.id)
+        for obj in places + [review]:
+            models.storage.new(obj)
+        counts = models.storage.counts(User, [user.id])
+        self.assertEqual(counts, {user.id: {"places": 2, "reviews": 1}})
+        counts = models.storage.counts("Place", [obj.id for obj in places])
+        self.assertEqual(counts[places[0].id], {"reviews": 1})
+        self.assertEqual(counts[places[1].id], {"reviews": 0})
+        self.assertEqual(models.storage.counts(Amenity, ["x"]), {"x": {}})
+        for obj in places + [review]:
+            models.storage.delete(obj)
+        models.storage.save()
+        counts = models.storage.counts(User, [user.id])
+        self.assertEqual(counts, {user.id: {"places": 0, "reviews": 0}})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_linked(self):
+        """Test that linked returns the ids listed by an attribute"""
+        place = Place(amenity_ids=["a", "b"])
+        models.storage.new(place)
+        found = models.storage.linked("Place", "amenity_ids",
+                                      [place.id, "nope"])
+        self.assertEqual(found, {place.id: ["a", "b"], "nope": []})
+        models.storage.delete(place)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_delete_tombstone(self):
+        """Test that delete leaves a Tombstone found by deleted only"""
+        since = datetime.utcnow()
+        state = State(name="Gone")
+        models.storage.new(state)
+        count = models.storage.count()
+        models.storage.delete(state)
+        models.storage.save()
+        self.assertEqual(models.storage.count(), count - 1)
+        for obj in models.storage.all().values():
+            self.assertIsInstance(obj, tuple(classes.values()))
+        models.storage.reload()
+        found = models.storage.deleted("State", since)
+        self.assertEqual([(obj.id, obj.class_name) for obj in found],
+                         [(state.id, "State")])
+        self.assertEqual(models.storage.deleted(State, datetime.utcnow()),
+                         [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_prune_tombstones(self):
+        """Test that save prunes the tombstones older than their retention"""
+        since = datetime.utcnow()
+        state = State(name="Gone")
+        models.storage.new(state)
+        models.storage.delete(state)
+        with mock.patch("models.engine.file_storage.max_age", timedelta(0)):
+            models.storage.save()
+        self.assertEqual(models.storage.deleted("State", since), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_changes(self):
+        """Test that save records the changes made since the last one"""
+        offset = models.storage.changes.offset()
+        state = State(name="Changed")
+        models.storage.new(state)
+        models.storage.new(state)
+        models.storage.delete(state)
+        self.assertEqual(models.storage.changes.offset(), offset)
+        models.storage.save()
+        found, complete = models.storage.changes.since(offset)
+        self.assertTrue(complete)
+        self.assertEqual([(change["id"], change["operation"])
+                          for change in found],
+                         [(state.id, "new"), (state.id, "update"),
+                          (state.id, "delete")])
+        self.assertEqual(found[-1]["version"],
+                         models.storage.changes.version("State"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_query_updated_since(self):
+        """Test that query finds the objects updated after a time"""
+        state = State(name="Old")
+        models.storage.new(state)
+        since = datetime.utcnow()
+        newer = State(name="New")
+        models.storage.new(newer)
+        found = models.storage.query(State, {"updated_at": {"gt": since}},
+                                     "updated_at")
+        self.assertIn(newer, found)
+        self.assertNotIn(state, found)
+        state.save()
+        found = models.storage.query(State, {"updated_at": {"gt": since}},
+                                     "updated_at")
+        self.assertEqual(found[-2:], [newer, state])
+        for obj in [state, newer]:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_place_stats(self):
+        """Test that place_stats summarizes the places of some cities"""
+        cities = [City(), City()]
+        places = [Place(city_id=cities[i % 2].id, price_by_night=price,
+                        number_rooms=i, max_guest=2)
+                  for i, price in enumerate([40, 10, 30, 20])]
+        review = Review(place_id=places[0].id)
+        for obj in places + [review]:
+            models.storage.new(obj)
+        stats = models.storage.place_stats([city.id for city in cities])
+        self.assertEqual(stats["places"], 4)
+        self.assertEqual(stats["price_by_night"],
+                         {"min": 10, "p25": 10, "p50": 20, "p75": 30,
+                          "p90": 40, "max": 40, "avg": 25})
+        self.assertEqual(stats["avg_rooms"], 1.5)
+        self.assertEqual(stats["avg_guests"], 2)
+        self.assertEqual(stats["reviews"], 1)
+        places[0].city_id = cities[1].id
+        places[0].save()
+        stats = models.storage.place_stats([cities[0].id])
+        self.assertEqual(stats["places"], 1)
+        self.assertEqual(stats["price_by_night"]["max"], 30)
+        self.assertEqual(stats["reviews"], 0)
+        for obj in places + [review]:
+            models.storage.delete(obj)
+        models.storage.save()
+        stats = models.storage.place_stats([cities[0].id])
+        self.assertEqual(stats["places"], 0)
+        self.assertIsNone(stats["price_by_night"]["p50"])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search(self):
+        """Test that search ranks places and reviews by relevance"""
+        word = "w" + City().id.replace("-", "")
+        place = Place(description="{} {} loft".format(word, word))
+        review = Review(text="{} and more words".format(word))
+        models.storage.new(place)
+        models.storage.new(review)
+        other = Place(description=word + " and more words")
+        models.storage.new(other)
+        found = models.storage.search(word.upper())
+        self.assertEqual(len(found), 3)
+        found = models.storage.search(word, ["Place"])
+        self.assertEqual([obj for obj, score in found], [place, other])
+        self.assertEqual(models.storage.search(word, ["Review"])[0][0],
+                         review)
+        self.assertEqual(len(models.storage.search(word, limit=1)), 1)
+        models.storage.delete(place)
+        models.storage.delete(other)
+        self.assertEqual(models.storage.search(word, ["Place"]), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_complete(self):
+        """Test that complete returns the objects whose name starts with
+        a prefix, in order"""
+        prefix = "x" + City().id.replace("-", "")
+        cities = [City(name=prefix + suffix) for suffix in ["b", "A", "c"]]
+        for city in cities:
+            models.storage.new(city)
+        found = models.storage.complete(City, prefix.upper())
+        self.assertEqual(found, [cities[1], cities[0], cities[2]])
+        self.assertEqual(models.storage.complete("City", prefix, 1),
+                         [cities[1]])
+        self.assertEqual(models.storage.complete(Place, prefix), [])
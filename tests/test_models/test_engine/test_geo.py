@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+"""
+Contains the TestGeoDocs and TestGeo classes
+"""
+
+import inspect
+from models.engine import geo
+import pep8
+import unittest
+
+
+class TestGeoDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the geo module"""
+    def test_pep8_conformance_geo(self):
+        """Test that models/engine/geo.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/geo.py',
+                                    'tests/test_models/test_engine/\
+test_geo.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_geo_docstrings(self):
+        """Test for the presence of docstrings in the geo module"""
+        self.assertTrue(len(geo.__doc__) >= 1)
+        for name, func in inspect.getmembers(geo, inspect.isfunction):
+            if func.__module__ == geo.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestGeo(unittest.TestCase):
+    """Test the distance helpers"""
+    def test_haversine(self):
+        """Test the distance between two known points"""
+        self.assertEqual(geo.haversine(10, 20, 10, 20), 0)
+        paris_london = geo.haversine(48.8566, 2.3522, 51.5074, -0.1278)
+        self.assertAlmostEqual(paris_london, 343.5, delta=1)
+
+    def test_bounding_box(self):
+        """Test that the box holds the circle around the point"""
+        min_lat, max_lat, min_lng, max_lng = geo.bounding_box(45, 10, 100)
+        self.assertAlmostEqual(geo.haversine(45, 10, max_lat, 10), 100)
+        self.assertAlmostEqual(geo.haversine(45, 10, min_lat, 10), 100)
+        self.assertTrue(min_lng < 10 < max_lng)
+        self.assertGreaterEqual(geo.haversine(45, 10, 45, max_lng), 100)
+
+    def test_bounding_box_wraps(self):
+        """Test that boxes reaching a pole or the antimeridian span every
+        longitude"""
+        self.assertEqual(geo.bounding_box(89.9, 0, 100)[1:], (90, -180, 180))
+        self.assertEqual(geo.bounding_box(0, 179.9, 100)[2:], (-180, 180))
@@ -0,0 +1,325 @@
+#!/usr/bin/python3
+"""
+Contains the TestIndexesDocs and TestHashIndex classes
+"""
+
+from datetime import datetime
+import inspect
+from models.engine import indexes
+from models.place import Place
+from models.review import Review
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestIndexesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the indexes module"""
+    def test_pep8_conformance_indexes(self):
+        """Test that models/engine/indexes.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/indexes.py',
+                                    'tests/test_models/test_engine/\
+test_indexes.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_indexes_docstrings(self):
+        """Test for the presence of docstrings in the indexes module"""
+        self.assertTrue(len(indexes.__doc__) >= 1)
+        for name, cls in inspect.getmembers(indexes, inspect.isclass):
+            if cls.__module__ != indexes.__name__:
+                continue
+            self.assertTrue(len(cls.__doc__) >= 1,
+                            "{:s} needs a docstring".format(name))
+            for name, func in inspect.getmembers(cls, inspect.isfunction):
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestHashIndex(unittest.TestCase):
+    """Test the HashIndex class"""
+    def test_lookup(self):
+        """Test that lookup returns the keys of the matching objects"""
+        index = indexes.HashIndex("name")
+        index.add("a", State(name="Texas"))
+        index.add("b", State(name="Nevada"))
+        index.add("c", State(name="Texas"))
+        self.assertEqual(index.lookup(["Texas"]), {"a", "c"})
+        self.assertEqual(index.lookup(["Texas", "Nevada"]), {"a", "b", "c"})
+        self.assertEqual(index.lookup(["Utah"]), set())
+
+    def test_add_replaces(self):
+        """Test that adding an object again moves it to its new value"""
+        index = indexes.HashIndex("name")
+        state = State(name="Texas")
+        index.add("a", state)
+        state.name = "Nevada"
+        index.add("a", state)
+        self.assertEqual(index.lookup(["Texas"]), set())
+        self.assertEqual(index.lookup(["Nevada"]), {"a"})
+
+    def test_remove(self):
+        """Test that removed and cleared objects are forgotten"""
+        index = indexes.HashIndex("name")
+        index.add("a", State(name="Texas"))
+        index.add("b", State(name="Texas"))
+        index.remove("a")
+        index.remove("nope")
+        self.assertEqual(index.lookup(["Texas"]), {"b"})
+        index.clear()
+        self.assertEqual(index.lookup(["Texas"]), set())
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Test the PrefixIndex class"""
+    def test_starting(self):
+        """Test that starting returns the keys of the matching values in
+        order, ignoring case"""
+        index = indexes.PrefixIndex("name")
+        for key, name in zip("abcd", ["San Jose", "Santa Fe", "Salem",
+                                      "san Diego"]):
+            index.add(key, State(name=name))
+        self.assertEqual(index.starting("SAN"), ["d", "a", "b"])
+        self.assertEqual(index.starting("san", 2), ["d", "a"])
+        self.assertEqual(index.starting("x"), [])
+
+    def test_add_remove(self):
+        """Test that renamed and removed objects are reindexed"""
+        index = indexes.PrefixIndex("name")
+        state = State(name="Texas")
+        index.add("a", state)
+        state.name = "Utah"
+        index.add("a", state)
+        self.assertEqual(index.starting("t"), [])
+        self.assertEqual(index.starting("u"), ["a"])
+        index.remove("a")
+        self.assertEqual(index.starting("u"), [])
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test the GridIndex class"""
+    def test_within(self):
+        """Test that within returns the objects of the overlapping cells"""
+        index = indexes.GridIndex("latitude", "longitude", cell_size=1)
+        index.add("a", Place(latitude=10.5, longitude=20.5))
+        index.add("b", Place(latitude=-10.5, longitude=20.5))
+        index.add("c", Place(latitude=None, longitude=None))
+        self.assertEqual(index.within(10, 11, 20, 21), {"a"})
+        self.assertEqual(index.within(-90, 90, -180, 180), {"a", "b"})
+        self.assertEqual(index.within(0, 1, 0, 1), set())
+
+    def test_add_moves(self):
+        """Test that adding an object again moves it to its new cell"""
+        index = indexes.GridIndex("latitude", "longitude", cell_size=1)
+        place = Place(latitude=10.5, longitude=20.5)
+        index.add("a", place)
+        place.latitude = 30.5
+        index.add("a", place)
+        self.assertEqual(index.within(10, 11, 20, 21), set())
+        self.assertEqual(index.within(30, 31, 20, 21), {"a"})
+        index.remove("a")
+        self.assertEqual(index.within(30, 31, 20, 21), set())
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test the SortedIndex class"""
+    def setUp(self):
+        """Indexes four places by price"""
+        self.index = indexes.SortedIndex("price_by_night")
+        for key, price in zip("abcd", [30, 10, 20, 10]):
+            self.index.add(key, Place(price_by_night=price))
+
+    def test_range(self):
+        """Test that range returns the keys of the values in the bounds"""
+        self.assertEqual(self.index.range({"gte": 10, "lt": 30}),
+                         {"b", "c", "d"})
+        self.assertEqual(self.index.range({"gt": 10, "lte": 30}), {"a", "c"})
+        self.assertEqual(self.index.range({"gt": 30}), set())
+
+    def test_ordered(self):
+        """Test that ordered yields the keys by value then by key"""
+        self.assertEqual(list(self.index.ordered()), ["b", "d", "c", "a"])
+        self.assertEqual(list(self.index.ordered(True)),
+                         ["a", "c", "d", "b"])
+        self.assertEqual(list(self.index.ordered(start=(10, "d"))),
+                         ["c", "a"])
+        self.assertEqual(list(self.index.ordered(True, (10, "d"))), ["b"])
+
+    def test_add_remove(self):
+        """Test that objects are moved, forgotten and tracked when they
+        have no numeric value"""
+        self.index.add("a", Place(price_by_night=5))
+        self.index.remove("c")
+        self.assertEqual(list(self.index.ordered()), ["a", "b", "d"])
+        self.assertTrue(self.index.complete())
+        self.index.add("e", Place(price_by_night=None))
+        self.assertFalse(self.index.complete())
+        self.index.remove("e")
+        self.assertTrue(self.index.complete())
+
+    def test_types(self):
+        """Test an index of datetimes, which leaves numbers out"""
+        index = indexes.SortedIndex("updated_at", (datetime,))
+        for key, value in zip("abc", [datetime(2020, 1, 2),
+                                      datetime(2020, 1, 1), 3]):
+            place = Place()
+            place.updated_at = value
+            index.add(key, place)
+        self.assertEqual(list(index.ordered()), ["b", "a"])
+        self.assertEqual(index.range({"gt": datetime(2020, 1, 1)}), {"a"})
+        self.assertTrue(index.accepts(datetime(2020, 1, 1)))
+        self.assertFalse(index.accepts(3))
+        self.assertFalse(index.complete())
+
+
+class TestBitsetIndex(unittest.TestCase):
+    """Test the BitsetIndex class, with NumPy when it is installed and
+    with the Python integer fallback"""
+    def check(self):
+        """Tests lookups after adds, moves and removes"""
+        index = indexes.BitsetIndex("amenity_ids")
+        index.add("a", Place(amenity_ids=["x", "y"]))
+        index.add("b", Place(amenity_ids=["y"]))
+        index.add("c", Place(amenity_ids=[str(i) for i in range(100)]))
+        self.assertEqual(index.lookup(["y"]), {"a", "b"})
+        self.assertEqual(index.lookup(["x", "y"]), {"a"})
+        self.assertEqual(index.lookup(["z"]), set())
+        self.assertEqual(index.lookup(["1", "99"]), {"c"})
+        self.assertEqual(index.lookup([]), {"a", "b", "c"})
+        index.add("b", Place(amenity_ids=["x", "y"]))
+        index.remove("a")
+        self.assertEqual(index.lookup(["x", "y"]), {"b"})
+        index.add("d", Place(amenity_ids=["x"]))
+        self.assertEqual(index.lookup(["x"]), {"b", "d"})
+        index.clear()
+        self.assertEqual(index.lookup(["x"]), set())
+
+    @unittest.skipIf(indexes.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """Test the index backed by a NumPy array"""
+        self.check()
+
+    def test_fallback(self):
+        """Test the index backed by Python integers"""
+        with mock.patch.object(indexes, "numpy", None):
+            self.check()
+
+
+class TestMinHashIndex(unittest.TestCase):
+    """Test the MinHashIndex class"""
+    def test_similar(self):
+        """Tests the candidates and their exact similarities"""
+        index = indexes.MinHashIndex("amenity_ids")
+        place = Place(amenity_ids=["x", "y", "z", "w"])
+        index.add("a", place)
+        index.add("b", Place(amenity_ids=["w", "z", "y", "x"]))
+        index.add("c", Place(amenity_ids=["p", "q"]))
+        index.add("d", Place(amenity_ids=["x", "y", "z", "v"]))
+        self.assertEqual(sorted(index.similar("a", place)),
+                         [(0.6, "d"), (1.0, "b")])
+        self.assertEqual(index.similar("e", Place(amenity_ids=[])), [])
+
+    def test_add_remove(self):
+        """Tests that the buckets follow changes and removes"""
+        index = indexes.MinHashIndex("amenity_ids")
+        place = Place(amenity_ids=["x", "y"])
+        index.add("a", place)
+        index.add("b", Place(amenity_ids=["x", "y"]))
+        index.add("c", Place(amenity_ids=["p", "q"]))
+        index.add("b", Place(amenity_ids=["p", "q"]))
+        self.assertEqual(index.similar("a", place), [])
+        self.assertEqual(index.similar("c", Place(amenity_ids=["p", "q"])),
+                         [(1.0, "b")])
+        index.remove("b")
+        index.add("c", Place(amenity_ids=["x", "y"]))
+        self.assertEqual(index.similar("a", place), [(1.0, "c")])
+        index.clear()
+        self.assertEqual(index.similar("a", place), [])
+
+
+class TestAggregateIndex(unittest.TestCase):
+    """Test the AggregateIndex class and the select_ranks function"""
+    def test_group(self):
+        """Tests the summaries after adds, moves and removes"""
+        index = indexes.AggregateIndex("city_id", ["price_by_night"])
+        index.add("a", Place(city_id="x", price_by_night=30))
+        index.add("b", Place(city_id="x", price_by_night=10))
+        index.add("c", Place(city_id="y", price_by_night=20))
+        index.add("d", Place(city_id="x", price_by_night=None))
+        group = index.group("x")
+        self.assertEqual(group["count"], 3)
+        self.assertEqual(group["values"]["price_by_night"], [10, 30])
+        self.assertEqual(group["sums"]["price_by_night"], 40)
+        index.add("a", Place(city_id="y", price_by_night=30))
+        index.remove("b")
+        self.assertEqual(index.group("y")["values"]["price_by_night"],
+                         [20, 30])
+        self.assertEqual(index.group("x")["sums"]["price_by_night"], 0)
+        index.remove("d")
+        self.assertIsNone(index.group("x"))
+        index.clear()
+        self.assertIsNone(index.group("y"))
+
+    def check_select_ranks(self):
+        """Tests the values selected from merged lists"""
+        lists = [[1, 4, 9], [], [2, 3, 10, 11]]
+        self.assertEqual(indexes.select_ranks(lists, [0, 3, 6]), [1, 4, 11])
+        self.assertEqual(indexes.select_ranks([[5, 7]], [1]), [7])
+
+    @unittest.skipIf(indexes.numpy is None, "NumPy is not installed")
+    def test_select_ranks_numpy(self):
+        """Test select_ranks with NumPy"""
+        self.check_select_ranks()
+
+    def test_select_ranks_fallback(self):
+        """Test select_ranks without NumPy"""
+        with mock.patch.object(indexes, "numpy", None):
+            self.check_select_ranks()
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class, with NumPy when it is installed and
+    with the Python list fallback"""
+    def check(self):
+        """Tests searches after adds, changes and removes"""
+        index = indexes.TextIndex("text")
+        index.add("a", Review(text="Quiet loft, quiet street"))
+        index.add("b", Review(text="Loud but central loft"))
+        index.add("c", Review(text="Great view of the bay"))
+        found = [key for score, key in index.search(["quiet", "loft"])]
+        self.assertEqual(found, ["a", "b"])
+        self.assertEqual(index.search(["loft"], 1)[0][1], "a")
+        self.assertEqual(index.search(["street", "loft"], 1)[0][1], "a")
+        self.assertEqual(index.search(["nope"]), [])
+        index.add("c", Review(text="A quiet bay"))
+        index.remove("a")
+        found = [key for score, key in index.search(["quiet"])]
+        self.assertEqual(found, ["c"])
+        index.add("a", Review(text="quiet quiet"))
+        self.assertEqual(index.search(["quiet"], 1)[0][1], "a")
+        index.clear()
+        self.assertEqual(index.search(["bay"]), [])
+
+    def check_limit(self):
+        """Tests that a limited search ranks like a full search"""
+        index = indexes.TextIndex("text")
+        for i in range(50):
+            words = ["common"] * (i % 7 + 1) + ["filler"] * (i % 5) + \
+                ["rare"] * (i % 11 == 0)
+            index.add(str(i), Review(text=" ".join(words)))
+        for terms in [["common"], ["common", "filler"], ["rare", "common"]]:
+            self.assertEqual(index.search(terms, 3), index.search(terms)[:3])
+
+    @unittest.skipIf(indexes.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """Test the index backed by NumPy arrays"""
+        self.check()
+        self.check_limit()
+
+    def test_fallback(self):
+        """Test the index backed by Python lists"""
+        with mock.patch.object(indexes, "numpy", None):
+            self.check()
+            self.check_limit()
@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+Contains the TestNDJSONDocs and TestNDJSON classes
+"""
+
+import inspect
+from io import StringIO
+import json
+import models
+from models.engine import ndjson
+from models.engine.unit_of_work import unit_of_work
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestNDJSONDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the ndjson module"""
+    def test_pep8_conformance_ndjson(self):
+        """Test that models/engine/ndjson.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/ndjson.py',
+                                    'tests/test_models/test_engine/\
+test_ndjson.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_ndjson_docstrings(self):
+        """Test for the presence of docstrings in the ndjson module"""
+        self.assertTrue(len(ndjson.__doc__) >= 1)
+        for name, func in inspect.getmembers(ndjson, inspect.isfunction):
+            if func.__module__ == ndjson.__name__:
+                self.assertTrue(len(func.__doc__) >= 1,
+                                "{:s} needs a docstring".format(name))
+
+
+class TestNDJSON(unittest.TestCase):
+    """Test the export and import of objects as NDJSON"""
+    def test_round_trip(self):
+        """Test that exported objects are imported back unchanged"""
+        state = State(name="Texas")
+        user = User(email="a@b.c", password="pwd")
+        models.storage.new(state)
+        models.storage.new(user)
+        models.storage.save()
+        stream = StringIO()
+        ndjson.dump(stream, ["State", "User"])
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertIn(state.id, [line["id"] for line in lines])
+        models.storage.delete(state)
+        models.storage.delete(user)
+        models.storage.save()
+
+        stream = StringIO("\n".join(json.dumps(line) for line in lines
+                                    if line["id"] in (state.id, user.id)))
+        self.assertEqual(ndjson.load(stream), (2, 0, []))
+        self.assertEqual(models.storage.get(User, user.id).password,
+                         user.password)
+        models.storage.close()
+        self.assertEqual(models.storage.get(State, state.id).name, "Texas")
+
+    def test_load_errors(self):
+        """Test that invalid lines are skipped and reported"""
+        stream = StringIO('not json\n{"__class__": "Nope"}\n\n'
+                          '{"__class__": "State"}\n')
+        self.assertEqual(ndjson.load(stream),
+                         (0, 3, [(1, "Not a JSON"), (2, "Unknown class"),
+                                 (4, "Missing name")]))
+        stream = StringIO('not json\n' * 3)
+        self.assertEqual(ndjson.load(stream, max_errors=1),
+                         (0, 3, [(1, "Not a JSON")]))
+
+    def test_load_duplicates(self):
+        """Test that records the storage rejects are reported by line while
+        the other records of their batch are inserted"""
+        state = State(name="Texas")
+        models.storage.new(state)
+        models.storage.save()
+        state_id = state.id
+        lines = [{"__class__": "State", "name": "a"},
+                 {"__class__": "State", "name": "b", "id": state_id},
+                 {"__class__": "State", "name": "c"}]
+        stream = StringIO("\n".join(json.dumps(line) for line in lines))
+        count, skipped, errors = ndjson.load(stream)
+        self.assertEqual((count, skipped), (2, 1))
+        self.assertEqual([number for number, reason in errors], [2])
+        models.storage.close()
+        self.assertEqual(models.storage.get(State, state_id).name, "Texas")
+        found = models.storage.query(State, {"name": ["a", "c"]})
+        self.assertEqual(len(found), 2)
+        for obj in found + [models.storage.get(State, state_id)]:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def test_load_duplicates_in_unit_of_work(self):
+        """Test that a duplicate id in a later batch of a unit of work only
+        rejects its own line, keeping the earlier batches"""
+        lines = [{"__class__": "State", "name": "a", "id": "dup-a"}] + \
+            [{"__class__": "State", "name": name} for name in "bcde"] + \
+            [{"__class__": "State", "name": "f", "id": "dup-a"}]
+        stream = StringIO("\n".join(json.dumps(line) for line in lines))
+        with unit_of_work():
+            count, skipped, errors = ndjson.load(stream, batch_size=2)
+        self.assertEqual((count, skipped), (5, 1))
+        self.assertEqual([number for number, reason in errors], [6])
+        models.storage.close()
+        found = models.storage.query(State, {"name": list("abcdef")})
+        self.assertEqual(sorted(obj.name for obj in found), list("abcde"))
+        for obj in found:
+            models.storage.delete(obj)
+        models.storage.save()
+
+    def test_batches(self):
+        """Test that objects are inserted batch_size at a time"""
+        calls = []
+
+        class Recorder:
+            """Storage double recording insert_many calls"""
+            def begin(self):
+                """Starts a unit of work"""
+
+            def end(self, commit=True):
+                """Ends a unit of work"""
+
+            def insert_many(self, cls, records):
+                """Records the size of the batch"""
+                calls.append((cls, len(records)))
+                return len(records)
+        lines = ['{"__class__": "State", "name": "a"}'] * 5 + \
+            ['{"__class__": "City", "name": "b", "state_id": "c"}']
+        count, skipped, errors = ndjson.load(StringIO("\n".join(lines)), 2,
+                                             Recorder())
+        self.assertEqual(count, 6)
+        self.assertEqual(calls, [("State", 2), ("State", 2), ("State", 1),
+                                 ("City", 1)])
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Contains the TestUnitOfWorkDocs and TestUnitOfWork classes
+"""
+
+import models
+from models.engine import unit_of_work
+from models.engine.file_storage import FileStorage
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestUnitOfWorkDocs(unittest.TestCase):
+    """Tests to check the documentation and style of unit_of_work"""
+    def test_pep8_conformance_unit_of_work(self):
+        """Test that models/engine/unit_of_work.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/unit_of_work.py',
+                                    'tests/test_models/test_engine/\
+test_unit_of_work.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_unit_of_work_docstrings(self):
+        """Test for the presence of docstrings in unit_of_work"""
+        self.assertTrue(len(unit_of_work.__doc__) >= 1)
+        self.assertTrue(len(unit_of_work.unit_of_work.__doc__) >= 1)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestUnitOfWork(unittest.TestCase):
+    """Test that saves are coalesced by unit_of_work"""
+    def setUp(self):
+        """Creates the storage under test"""
+        self.storage = FileStorage()
+
+    def writes(self):
+        """Patches open() in file_storage to count the file writes"""
+        return mock.patch("models.engine.file_storage.open",
+                          mock.mock_open(), create=True)
+
+    def test_saves_once(self):
+        """Test that several saves write the file only once"""
+        with self.writes() as opened:
+            with unit_of_work.unit_of_work(self.storage):
+                for name in ["Texas", "Nevada"]:
+                    self.storage.new(State(name=name))
+                    self.storage.save()
+                self.assertEqual(opened.call_count, 0)
+            self.assertEqual(opened.call_count, 1)
+
+    def test_nested(self):
+        """Test that only the outermost block saves"""
+        with self.writes() as opened:
+            with unit_of_work.unit_of_work(self.storage):
+                with unit_of_work.unit_of_work(self.storage):
+                    self.storage.save()
+                self.assertEqual(opened.call_count, 0)
+                self.storage.save()
+            self.assertEqual(opened.call_count, 1)
+
+    def test_decorator(self):
+        """Test that unit_of_work can decorate a function"""
+        @unit_of_work.unit_of_work(self.storage)
+        def create():
+            """Saves twice"""
+            self.storage.save()
+            self.storage.save()
+        with self.writes() as opened:
+            create()
+            create()
+        self.assertEqual(opened.call_count, 2)
+
+    def test_rollback_on_error(self):
+        """Test that a failing block discards its changes"""
+        self.storage.save()
+        state = State(name="Texas")
+        with self.assertRaises(ValueError):
+            with unit_of_work.unit_of_work(self.storage):
+                self.storage.new(state)
+                self.storage.save()
+                raise ValueError
+        self.assertIsNone(self.storage.get(State, state.id))
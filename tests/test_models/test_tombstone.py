@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestTombstoneDocs classes
+"""
+
+from datetime import datetime
+import inspect
+import models
+from models import tombstone
+from models.base_model import BaseModel
+import pep8
+import unittest
+Tombstone = tombstone.Tombstone
+
+
+class TestTombstoneDocs(unittest.TestCase):
+    """Tests to check the documentation and style of Tombstone class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.tombstone_f = inspect.getmembers(Tombstone, inspect.isfunction)
+
+    def test_pep8_conformance_tombstone(self):
+        """Test that models/tombstone.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/tombstone.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_tombstone(self):
+        """Test that tests/test_models/test_tombstone.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_tombstone.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_tombstone_module_docstring(self):
+        """Test for the tombstone.py module docstring"""
+        self.assertIsNot(tombstone.__doc__, None,
+                         "tombstone.py needs a docstring")
+        self.assertTrue(len(tombstone.__doc__) >= 1,
+                        "tombstone.py needs a docstring")
+
+    def test_tombstone_class_docstring(self):
+        """Test for the Tombstone class docstring"""
+        self.assertIsNot(Tombstone.__doc__, None,
+                         "Tombstone class needs a docstring")
+        self.assertTrue(len(Tombstone.__doc__) >= 1,
+                        "Tombstone class needs a docstring")
+
+    def test_tombstone_func_docstrings(self):
+        """Test for the presence of docstrings in Tombstone methods"""
+        for func in self.tombstone_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestTombstone(unittest.TestCase):
+    """Test the Tombstone class"""
+    def test_is_subclass(self):
+        """Test that Tombstone is a subclass of BaseModel"""
+        tombstone = Tombstone()
+        self.assertIsInstance(tombstone, BaseModel)
+        self.assertTrue(hasattr(tombstone, "id"))
+        self.assertTrue(hasattr(tombstone, "created_at"))
+        self.assertTrue(hasattr(tombstone, "updated_at"))
+
+    def test_class_name_attr(self):
+        """Test that Tombstone has attribute class_name, an empty string"""
+        tombstone = Tombstone()
+        self.assertTrue(hasattr(tombstone, "class_name"))
+        if models.storage_t == 'db':
+            self.assertEqual(tombstone.class_name, None)
+        else:
+            self.assertEqual(tombstone.class_name, "")
+
+    def test_to_dict_creates_dict(self):
+        """test to_dict method creates a dictionary with proper attrs"""
+        tomb = Tombstone()
+        new_d = tomb.to_dict()
+        self.assertEqual(type(new_d), dict)
+        self.assertFalse("_sa_instance_state" in new_d)
+        for attr in tomb.__dict__:
+            if attr != "_sa_instance_state":
+                self.assertTrue(attr in new_d)
+        self.assertTrue("__class__" in new_d)
+
+    def test_to_dict_values(self):
+        """test that values in dict returned from to_dict are correct"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        tomb = Tombstone()
+        new_d = tomb.to_dict()
+        self.assertEqual(new_d["__class__"], "Tombstone")
+        self.assertEqual(type(new_d["created_at"]), str)
+        self.assertEqual(type(new_d["updated_at"]), str)
+        self.assertEqual(new_d["created_at"],
+                         tomb.created_at.strftime(t_format))
+        self.assertEqual(new_d["updated_at"],
+                         tomb.updated_at.strftime(t_format))
+
+    def test_str(self):
+        """test that the str method has the correct output"""
+        tombstone = Tombstone()
+        string = "[Tombstone] ({}) {}".format(tombstone.id, tombstone.__dict__)
+        self.assertEqual(string, str(tombstone))